@@ -1,24 +1,26 @@
 import os
-import openpyxl
+import time
+import shutil
+import asyncio
 import re
 from lang import translate_text
 import logging
-from openpyxl import load_workbook
-import sqlite3
 from datetime import datetime
 from aiogram import types
 from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters.state import State, StatesGroup
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from loader import dp, bot
-from config import ADMIN_IDS, DATA_PATH
-from database import (
-    add_firma, check_firma, get_all_firms, save_file, check_file,
-    save_manual_report, get_firma_name, get_user_language, get_firma_info,
-    save_qqs_report, save_yagona_report
-)
-from lang import get_text, get_month_name, translate_text
-from converters import convert_to_cyrillic, convert_to_latin
+from config import ADMIN_IDS, DATA_PATH, BULK_CHUNK_SIZE
+import db
+from cache import all_stats
+from report_parser import parse_excel_file, parse_yagona_excel, parse_qqs_excel, parse_firms_excel, parse_bulk_report, invalidate_workbook, workbook_cache
+from lang import get_text, get_month_name, translate_text, reload_transliteration
+from converters import convert_to_cyrillic, convert_to_latin, search_latin
+from excel_writer import generate_firma_excel, generate_yagona_excel, write_report_files, convert_csv_to_xlsx
+from excel_reader import is_table_file, CSV_EXTENSIONS
+import workers
+from workers import WorkerError
 
 logging.basicConfig(level=logging.INFO, filename="bot.log", encoding="utf-8")
 logger = logging.getLogger(__name__)
@@ -69,150 +71,6 @@ class ManualInput(StatesGroup):
 def is_admin(user_id):
     return user_id in ADMIN_IDS
 
-def parse_excel_file(file_path, lang='uz_latin'):
-    try:
-        workbook = openpyxl.load_workbook(file_path)
-        sheet = workbook.active
-        firms = {}
-        current_stir = None
-        current_oy = None
-        current_firma_nomi = None
-
-        for row in sheet.iter_rows(min_row=2, values_only=True):
-            if not any(row):
-                continue
-            stir = row[0] if row[0] else current_stir
-            oy = row[1] if row[1] else current_oy
-            firma_nomi = row[2] if row[2] else current_firma_nomi
-            lavozim = row[3]
-            ism = row[4]
-            yil_boshidan = row[5]
-            shu_oy = row[6]
-
-            if not stir or not oy or not firma_nomi or not lavozim or not ism or yil_boshidan is None or shu_oy is None:
-                logger.warning(f"Noto'g'ri qator: {row}")
-                continue
-
-            if not isinstance(yil_boshidan, (int, float)) or not isinstance(shu_oy, (int, float)):
-                logger.warning(f"Noto'g'ri maosh formati: {row}")
-                continue
-
-            oy = oy.lower()
-            if oy not in ['yanvar', 'fevral', 'mart', 'aprel', 'may', 'iyun', 'iyul']:
-                logger.warning(f"Noto'g'ri oy: {oy}")
-                continue
-
-            if not re.match(r'^\d{9}$', str(stir)):
-                logger.warning(f"Noto'g'ri STIR: {stir}")
-                continue
-
-            if not check_firma(str(stir)):
-                logger.warning(f"STIR ma'lumotlar bazasida yo'q: {stir}")
-                continue
-
-            current_stir = str(stir)
-            current_oy = oy
-            if lang == 'uz_cyrillic':
-                current_firma_nomi = convert_to_cyrillic(firma_nomi)
-                lavozim = convert_to_cyrillic(lavozim)
-                ism = convert_to_cyrillic(ism)
-            else:
-                current_firma_nomi = translate_text(firma_nomi, lang)
-                lavozim = translate_text(lavozim, lang)
-                ism = translate_text(ism, lang)
-
-            key = (current_stir, current_oy)
-            if key not in firms:
-                firms[key] = {
-                    'stir': current_stir,
-                    'oy': current_oy,
-                    'firma_nomi': current_firma_nomi,
-                    'xodimlar': []
-                }
-
-            firms[key]['xodimlar'].append({
-                'lavozim': lavozim,
-                'ism': ism,
-                'yil_boshidan': int(yil_boshidan),
-                'shu_oy': int(shu_oy)
-            })
-
-        return firms, None
-    except Exception as e:
-        logger.error(f"Excel parsing xatosi: {e}")
-        return None, f"Excel faylni o'qishda xato: {str(e)}"
-    
-
-
-def generate_firma_excel(stir, oy, firma_nomi, xodimlar, dest_path_latin, dest_path_cyrillic):
-    try:
-        # Lotin tilida fayl yaratish
-        workbook_latin = openpyxl.Workbook()
-        sheet_latin = workbook_latin.active
-        sheet_latin.title = "Sheet1"
-        headers_latin = [
-            translate_text("STIR", 'uz_latin'),
-            translate_text("Oy", 'uz_latin'),
-            translate_text("Firma nomi", 'uz_latin'),
-            translate_text("Xodim lavozimi", 'uz_latin'),
-            translate_text("Ism Familyasi", 'uz_latin'),
-            translate_text("Yil boshidan", 'uz_latin'),
-            translate_text("Shu Oy uchun oylik", 'uz_latin')
-        ]
-        sheet_latin.append(headers_latin)
-
-        for i, xodim in enumerate(xodimlar):
-            row = [
-                stir if i == 0 else "",
-                get_month_name('uz_latin', oy) if i == 0 else "",
-                translate_text(firma_nomi, 'uz_latin') if i == 0 else "",
-                translate_text(xodim['lavozim'], 'uz_latin'),
-                translate_text(xodim['ism'], 'uz_latin'),
-                xodim['yil_boshidan'],
-                xodim['shu_oy']
-            ]
-            sheet_latin.append(row)
-
-        os.makedirs(os.path.dirname(dest_path_latin), exist_ok=True)
-        workbook_latin.save(dest_path_latin)
-        logger.info(f"Yangi Excel fayli yaratildi (lotin): {dest_path_latin}")
-
-        # Kirill tilida fayl yaratish
-        workbook_cyrillic = openpyxl.Workbook()
-        sheet_cyrillic = workbook_cyrillic.active
-        sheet_cyrillic.title = "Лист1"
-        headers_cyrillic = [
-            translate_text("STIR", 'uz_cyrillic'),
-            translate_text("Oy", 'uz_cyrillic'),
-            translate_text("Firma nomi", 'uz_cyrillic'),
-            translate_text("Xodim lavozimi", 'uz_cyrillic'),
-            translate_text("Ism Familyasi", 'uz_cyrillic'),
-            translate_text("Yil boshidan", 'uz_cyrillic'),
-            translate_text("Shu Oy uchun oylik", 'uz_cyrillic')
-        ]
-        sheet_cyrillic.append(headers_cyrillic)
-
-        for i, xodim in enumerate(xodimlar):
-            row = [
-                stir if i == 0 else "",
-                get_month_name('uz_cyrillic', oy) if i == 0 else "",
-                translate_text(firma_nomi, 'uz_cyrillic') if i == 0 else "",
-                translate_text(xodim['lavozim'], 'uz_cyrillic'),
-                translate_text(xodim['ism'], 'uz_cyrillic'),
-                xodim['yil_boshidan'],
-                xodim['shu_oy']
-            ]
-            sheet_cyrillic.append(row)
-
-        os.makedirs(os.path.dirname(dest_path_cyrillic), exist_ok=True)
-        workbook_cyrillic.save(dest_path_cyrillic)
-        logger.info(f"Yangi Excel fayli yaratildi (kirill): {dest_path_cyrillic}")
-
-        return True
-    except Exception as e:
-        logger.error(f"Excel faylini yaratishda xato: {e}")
-        return False
-
 def create_paginated_keyboard(items, callback_prefix, page=1, per_page=10, lang='uz_latin'):
     total_items = len(items)
     total_pages = (total_items + per_page - 1) // per_page
@@ -231,22 +89,82 @@ def create_paginated_keyboard(items, callback_prefix, page=1, per_page=10, lang=
 
     nav_buttons = []
     if page > 1:
-        nav_buttons.append(InlineKeyboardButton(translate_text("⬅️ Oldingi", lang), callback_data=f"{callback_prefix}_page_{page-1}"))
+        nav_buttons.append(InlineKeyboardButton(get_text(lang, 'btn_prev'), callback_data=f"{callback_prefix}_page_{page-1}"))
     if page < total_pages:
-        nav_buttons.append(InlineKeyboardButton(translate_text("Keyingi ➡️", lang), callback_data=f"{callback_prefix}_page_{page+1}"))
+        nav_buttons.append(InlineKeyboardButton(get_text(lang, 'btn_next'), callback_data=f"{callback_prefix}_page_{page+1}"))
+    if nav_buttons:
+        keyboard.row(*nav_buttons)
+
+    keyboard.add(InlineKeyboardButton(get_text(lang, 'btn_search'), callback_data=f"{callback_prefix}_search"))
+    keyboard.add(InlineKeyboardButton(get_text(lang, 'btn_back'), callback_data="back_to_admin"))
+
+    return keyboard, page, total_pages
+
+
+def parse_page_callback(data):
+    """"{prefix}_page_{page}_{n|p}{stir}" -> (page, after, before). Kursorsiz eski tugmalar birinchi sahifaga qaytadi."""
+    parts = data.rsplit("_page_", 1)[1].split("_")
+    page, after, before = int(parts[0]), None, None
+    if len(parts) > 1 and parts[1]:
+        if parts[1][0] == 'n':
+            after = parts[1][1:]
+        elif parts[1][0] == 'p':
+            before = parts[1][1:]
+    if not after and not before:
+        page = 1
+    return page, after, before
+
+
+async def create_firms_keyboard(callback_prefix, page=1, after=None, before=None, per_page=10, lang='uz_latin'):
+    """Bazadagi firmalar uchun create_paginated_keyboard: sahifalar keyset usulida o'qiladi."""
+    firms = await db.get_firms_page(per_page, after=after, before=before)
+    if not firms and (after or before):
+        firms, page = await db.get_firms_page(per_page), 1
+    total_items = await db.count_firms()
+    total_pages = max(1, (total_items + per_page - 1) // per_page)
+    page = max(1, min(page, total_pages))
+
+    keyboard = InlineKeyboardMarkup(row_width=2)
+    for stir, name in firms:
+        keyboard.add(InlineKeyboardButton(f"{translate_text(name, lang)} ({stir})", callback_data=f"{callback_prefix}_{stir}"))
+
+    nav_buttons = []
+    if page > 1 and firms:
+        nav_buttons.append(InlineKeyboardButton(get_text(lang, 'btn_prev'), callback_data=f"{callback_prefix}_page_{page-1}_p{firms[0][0]}"))
+    if page < total_pages and firms:
+        nav_buttons.append(InlineKeyboardButton(get_text(lang, 'btn_next'), callback_data=f"{callback_prefix}_page_{page+1}_n{firms[-1][0]}"))
     if nav_buttons:
         keyboard.row(*nav_buttons)
 
-    keyboard.add(InlineKeyboardButton(translate_text("🔍 Qidirish", lang), callback_data=f"{callback_prefix}_search"))
-    keyboard.add(InlineKeyboardButton(translate_text("🔙 Orqaga", lang), callback_data="back_to_admin"))
+    keyboard.add(InlineKeyboardButton(get_text(lang, 'btn_search'), callback_data=f"{callback_prefix}_search"))
+    keyboard.add(InlineKeyboardButton(get_text(lang, 'btn_back'), callback_data="back_to_admin"))
 
     return keyboard, page, total_pages
 
 
+def create_firm_dirs(firms):
+    """Firmalar uchun hisobot papkalarini yaratadi. firms: [(stir, soliq_turi), ...]"""
+    dirs = set()
+    for stir, soliq_turi in firms:
+        dirs.add(os.path.join(DATA_PATH, stir, "daromad"))
+        if soliq_turi == 'ds-ys':
+            dirs.add(os.path.join(DATA_PATH, stir, "yagona"))
+        elif soliq_turi == 'ds-qqs':
+            dirs.add(os.path.join(DATA_PATH, stir, "qqs"))
+        else:
+            logger.warning(f"Noto'g'ri soliq_turi: {soliq_turi} firma uchun {stir}")
+    for path in dirs:
+        try:
+            os.makedirs(path, exist_ok=True)
+        except Exception as e:
+            logger.error(f"Papka yaratishda xato: {e}, path={path}")
+    logger.info(f"Papkalar yaratildi: {len(dirs)} ta, firmalar={len(firms)}")
+
+
 def back_to_admin_keyboard(lang):
     keyboard = InlineKeyboardMarkup(row_width=1)
     keyboard.add(
-        InlineKeyboardButton(translate_text("Admin paneliga qaytish", lang), callback_data="back_to_admin")
+        InlineKeyboardButton(get_text(lang, 'btn_back_to_admin'), callback_data="back_to_admin")
     )
     return keyboard
 
@@ -255,22 +173,19 @@ def back_to_admin_keyboard(lang):
 async def list_firmas(callback_query: types.CallbackQuery):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
-    page = int(callback_query.data.split("_")[-1])
+    lang = await db.get_user_language(user_id)
+    page, after, before = parse_page_callback(callback_query.data)
     per_page = 10
 
     # Ma'lumotlar bazasidan firmalarni olish
-    conn = sqlite3.connect(os.path.join(DATA_PATH, "bot.db"))
-    c = conn.cursor()
-    c.execute("SELECT stir, name FROM firms ORDER BY name LIMIT ? OFFSET ?", (per_page, (page - 1) * per_page))
-    firms = c.fetchall()
-    c.execute("SELECT COUNT(*) FROM firms")
-    total_firms = c.fetchone()[0]
-    conn.close()
+    firms = await db.get_firms_page(per_page, after=after, before=before)
+    if not firms and (after or before):
+        firms, page = await db.get_firms_page(per_page), 1
+    total_firms = await db.count_firms()
 
     if not firms:
         await callback_query.message.edit_text(
-            translate_text("❌ Hozirda hech qanday firma mavjud emas.", lang),
+            get_text(lang, 'err_no_firms_now'),
             reply_markup=back_to_admin_keyboard(lang)
         )
         return
@@ -281,18 +196,18 @@ async def list_firmas(callback_query: types.CallbackQuery):
     total_pages = (total_firms + per_page - 1) // per_page
 
     response = (
-        f"📋 {translate_text('Firmalar ro‘yxati', lang)} ({total_firms} ta):\n\n"
+        f"📋 {get_text(lang, 'label_firms_list')} ({total_firms} ta):\n\n"
         f"{firmalar_text}\n\n"
-        f"📄 {translate_text('Sahifa', lang)}: {page}/{total_pages}"
+        f"📄 {get_text(lang, 'label_page')}: {page}/{total_pages}"
     )
 
     # Navigatsiya tugmalari
     keyboard = InlineKeyboardMarkup(row_width=3)
     if page > 1:
-        keyboard.insert(InlineKeyboardButton("⬅️", callback_data=f"list_firmas_page_{page - 1}"))
+        keyboard.insert(InlineKeyboardButton("⬅️", callback_data=f"list_firmas_page_{page - 1}_p{firms[0][0]}"))
     if page < total_pages:
-        keyboard.insert(InlineKeyboardButton("➡️", callback_data=f"list_firmas_page_{page + 1}"))
-    keyboard.add(InlineKeyboardButton(translate_text("Admin paneliga qaytish", lang), callback_data="back_to_admin"))
+        keyboard.insert(InlineKeyboardButton("➡️", callback_data=f"list_firmas_page_{page + 1}_n{firms[-1][0]}"))
+    keyboard.add(InlineKeyboardButton(get_text(lang, 'btn_back_to_admin'), callback_data="back_to_admin"))
 
     await callback_query.message.edit_text(response, reply_markup=keyboard)
 
@@ -304,23 +219,58 @@ async def back_to_admin_handler(callback_query: types.CallbackQuery, state: FSMC
 @dp.message_handler(commands=['admin'], user_id=ADMIN_IDS)
 async def admin_panel(message: types.Message, state: FSMContext):
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     logger.info(f"Admin panel: user_id={user_id}, lang={lang}")
     keyboard = InlineKeyboardMarkup(row_width=2)
     keyboard.add(
-        InlineKeyboardButton(translate_text("Yangi firma qo'shish", lang), callback_data="add_firma"),
-        InlineKeyboardButton(translate_text("Excel orqali firmalar qo'shish", lang), callback_data="add_firms_excel"),
-        InlineKeyboardButton(translate_text("Firma tahrirlash", lang), callback_data="edit_firma"),
-        InlineKeyboardButton(translate_text("Fayl yuklash", lang), callback_data="upload_files"),
-        InlineKeyboardButton(translate_text("Qo'lda hisobot kiritish", lang), callback_data="manual_input"),
-        InlineKeyboardButton(translate_text("Hisobot o'chirish", lang), callback_data="delete_report"),
-        InlineKeyboardButton(translate_text("Firmalar ro'yxati", lang), callback_data="list_firmas_page_1")
+        InlineKeyboardButton(get_text(lang, 'btn_add_firma'), callback_data="add_firma"),
+        InlineKeyboardButton(get_text(lang, 'btn_add_firms_excel'), callback_data="add_firms_excel"),
+        InlineKeyboardButton(get_text(lang, 'btn_edit_firma'), callback_data="edit_firma"),
+        InlineKeyboardButton(get_text(lang, 'btn_upload_files'), callback_data="upload_files"),
+        InlineKeyboardButton(get_text(lang, 'btn_bulk_upload'), callback_data="bulk_upload"),
+        InlineKeyboardButton(get_text(lang, 'btn_manual_input'), callback_data="manual_input"),
+        InlineKeyboardButton(get_text(lang, 'btn_delete_report'), callback_data="delete_report"),
+        InlineKeyboardButton(get_text(lang, 'btn_list_firmas'), callback_data="list_firmas_page_1")
     )
-    sent_message = await message.answer(translate_text("🔒 Admin paneliga xush kelibsiz!", lang), reply_markup=keyboard)
+    sent_message = await message.answer(get_text(lang, 'admin_welcome'), reply_markup=keyboard)
     await state.update_data(last_message_id=sent_message.message_id)
     await message.delete()
 
 
+@dp.message_handler(commands=['cache_stats'], user_id=ADMIN_IDS)
+async def cache_stats(message: types.Message):
+    lang = await db.get_user_language(message.from_user.id)
+    lines = [get_text(lang, 'cache_stats_title')]
+    for st in all_stats():
+        lines.append(
+            f"{st['name']}: {st['size']}/{st['maxsize']}, hit={st['hits']}, miss={st['misses']}, "
+            f"hit_rate={st['hit_rate']:.1%}"
+        )
+    st = workers.excel_pool.stats()
+    lines.append(
+        f"workers/{st['name']}: {st['in_flight']}/{st['workers']}, navbatda={st['queued']} (maks {st['max_in_flight']}), "
+        f"bajarildi={st['completed']}, xato={st['failed']}, timeout={st['timeouts']}, bekor={st['cancelled']}, "
+        f"rad={st['rejected']}, kutish={st['avg_wait']:.2f} s, ish={st['avg_run']:.2f} s"
+    )
+    await message.answer("\n".join(lines))
+
+
+@dp.message_handler(commands=['reload_translit'], user_id=ADMIN_IDS)
+async def reload_translit(message: types.Message):
+    lang = await db.get_user_language(message.from_user.id)
+    try:
+        to_latin, to_cyrillic = await asyncio.get_running_loop().run_in_executor(None, reload_transliteration)
+    except Exception as e:
+        logger.error(f"Transliteratsiya istisnolarini yuklashda xato: {e}")
+        await message.answer(get_text(lang, 'err_translit_reload'))
+        return
+    # Worker jarayonlari istisnolar faylini ishga tushishda o'qiydi: keyingi ishlar yangi qoidalarni o'qigan yangi jarayonlarga tushadi
+    workers.excel_pool.restart()
+    # Keshdagi jadval qatorlari eski qoidalar bilan o'girilgan
+    workbook_cache.clear()
+    await message.answer(get_text(lang, 'translit_reloaded', to_latin=to_latin, to_cyrillic=to_cyrillic))
+
+
 @dp.callback_query_handler(lambda c: c.data == "back_to_admin", user_id=ADMIN_IDS)
 async def back_to_admin_panel(callback_query: types.CallbackQuery = None, state: FSMContext = None):
     if callback_query:
@@ -335,26 +285,27 @@ async def back_to_admin_panel(callback_query: types.CallbackQuery = None, state:
         else:
             return
 
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     keyboard = InlineKeyboardMarkup(row_width=2)
     keyboard.add(
-        InlineKeyboardButton(translate_text("Yangi firma qo'shish", lang), callback_data="add_firma"),
-        InlineKeyboardButton(translate_text("Excel orqali firmalar qo'shish", lang), callback_data="add_firms_excel"),
-        InlineKeyboardButton(translate_text("Firma tahrirlash", lang), callback_data="edit_firma"),
-        InlineKeyboardButton(translate_text("Fayl yuklash", lang), callback_data="upload_files"),
-        InlineKeyboardButton(translate_text("Qo'lda hisobot kiritish", lang), callback_data="manual_input"),
-        InlineKeyboardButton(translate_text("Hisobot o'chirish", lang), callback_data="delete_report"),
-        InlineKeyboardButton(translate_text("Firmalar ro'yxati", lang), callback_data="list_firmas_page_1")
+        InlineKeyboardButton(get_text(lang, 'btn_add_firma'), callback_data="add_firma"),
+        InlineKeyboardButton(get_text(lang, 'btn_add_firms_excel'), callback_data="add_firms_excel"),
+        InlineKeyboardButton(get_text(lang, 'btn_edit_firma'), callback_data="edit_firma"),
+        InlineKeyboardButton(get_text(lang, 'btn_upload_files'), callback_data="upload_files"),
+        InlineKeyboardButton(get_text(lang, 'btn_bulk_upload'), callback_data="bulk_upload"),
+        InlineKeyboardButton(get_text(lang, 'btn_manual_input'), callback_data="manual_input"),
+        InlineKeyboardButton(get_text(lang, 'btn_delete_report'), callback_data="delete_report"),
+        InlineKeyboardButton(get_text(lang, 'btn_list_firmas'), callback_data="list_firmas_page_1")
     )
 
     try:
         if message:
             await message.delete()  # Avvalgi xabarni o‘chirish
-        sent_message = await bot.send_message(user_id, translate_text("🔒 Admin paneliga xush kelibsiz!", lang), reply_markup=keyboard)
+        sent_message = await bot.send_message(user_id, get_text(lang, 'admin_welcome'), reply_markup=keyboard)
         await state.update_data(last_message_id=sent_message.message_id)
     except Exception as e:
         logger.error(f"Xabar o'chirish/yuborishda xato: {e}")
-        await bot.send_message(user_id, translate_text("❌ Xatolik yuz berdi, qayta urinib ko'ring.", lang))
+        await bot.send_message(user_id, get_text(lang, 'err_try_again'))
 
     if state:
         await state.finish()
@@ -363,7 +314,7 @@ async def back_to_admin_panel(callback_query: types.CallbackQuery = None, state:
 async def some_callback_handler(callback_query: types.CallbackQuery, state: FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     data = await state.get_data()
     last_message_id = data.get('last_message_id')
 
@@ -377,13 +328,13 @@ async def some_callback_handler(callback_query: types.CallbackQuery, state: FSMC
     # InlineKeyboardMarkup obyektini yaratish
     keyboard = InlineKeyboardMarkup(row_width=2)
     keyboard.add(
-        InlineKeyboardButton(translate_text("Orqaga", lang), callback_data="back_to_admin")
+        InlineKeyboardButton(get_text(lang, 'btn_back_plain'), callback_data="back_to_admin")
     )
 
     # Yangi xabar yuborish va ID sini saqlash
     sent_message = await bot.send_message(
         user_id,
-        translate_text("Xabar matni", lang),
+        get_text(lang, 'btn_message_text'),
         reply_markup=keyboard
     )
     await state.update_data(last_message_id=sent_message.message_id)
@@ -394,7 +345,7 @@ async def some_callback_handler(callback_query: types.CallbackQuery, state: FSMC
 async def start_add_firma(callback_query: types.CallbackQuery, state: FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     data = await state.get_data()
     last_message_id = data.get('last_message_id')
 
@@ -406,14 +357,14 @@ async def start_add_firma(callback_query: types.CallbackQuery, state: FSMContext
             logger.warning(f"Xabar o'chirishda xato: {e}, message_id={last_message_id}")
 
     await AddFirma.stir.set()
-    sent_message = await bot.send_message(user_id, translate_text("Yangi firma STIR raqamini kiriting (9 raqam, masalan: 302824863):", lang))
+    sent_message = await bot.send_message(user_id, get_text(lang, 'prompt_new_stir'))
     await state.update_data(last_message_id=sent_message.message_id)
 
 
 @dp.message_handler(commands=['cancel'], user_id=ADMIN_IDS, state='*')
 async def cancel_operation(message: types.Message, state: FSMContext):
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     data = await state.get_data()
     last_message_id = data.get('last_message_id')
     excel_file_path = data.get('excel_file_path')
@@ -439,15 +390,16 @@ async def cancel_operation(message: types.Message, state: FSMContext):
     # Admin panelini qayta chiqarish
     keyboard = InlineKeyboardMarkup(row_width=2)
     keyboard.add(
-        InlineKeyboardButton(translate_text("Yangi firma qo'shish", lang), callback_data="add_firma"),
-        InlineKeyboardButton(translate_text("Excel orqali firmalar qo'shish", lang), callback_data="add_firms_excel"),
-        InlineKeyboardButton(translate_text("Firma tahrirlash", lang), callback_data="edit_firma"),
-        InlineKeyboardButton(translate_text("Fayl yuklash", lang), callback_data="upload_files"),
-        InlineKeyboardButton(translate_text("Qo'lda hisobot kiritish", lang), callback_data="manual_input"),
-        InlineKeyboardButton(translate_text("Hisobot o'chirish", lang), callback_data="delete_report"),
-        InlineKeyboardButton(translate_text("Firmalar ro'yxati", lang), callback_data="list_firmas_page_1")
+        InlineKeyboardButton(get_text(lang, 'btn_add_firma'), callback_data="add_firma"),
+        InlineKeyboardButton(get_text(lang, 'btn_add_firms_excel'), callback_data="add_firms_excel"),
+        InlineKeyboardButton(get_text(lang, 'btn_edit_firma'), callback_data="edit_firma"),
+        InlineKeyboardButton(get_text(lang, 'btn_upload_files'), callback_data="upload_files"),
+        InlineKeyboardButton(get_text(lang, 'btn_bulk_upload'), callback_data="bulk_upload"),
+        InlineKeyboardButton(get_text(lang, 'btn_manual_input'), callback_data="manual_input"),
+        InlineKeyboardButton(get_text(lang, 'btn_delete_report'), callback_data="delete_report"),
+        InlineKeyboardButton(get_text(lang, 'btn_list_firmas'), callback_data="list_firmas_page_1")
     )
-    sent_message = await message.answer(translate_text("✅ Amaliyot bekor qilindi, admin paneldasiz.", lang), reply_markup=keyboard)
+    sent_message = await message.answer(get_text(lang, 'operation_cancelled'), reply_markup=keyboard)
     await state.update_data(last_message_id=sent_message.message_id)
     await message.delete()
     logger.info(f"Cancel operation: user_id={user_id}")
@@ -460,53 +412,44 @@ async def cancel_operation(message: types.Message, state: FSMContext):
 async def process_soliq_turi(message: types.Message, state: FSMContext):
     soliq_turi = message.text.strip().lower()
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     if soliq_turi not in ['ds-ys', 'ds-qqs']:
-        await message.answer(translate_text("❌ Soliq turi 'ds-ys' yoki 'ds-qqs' bo'lishi kerak.", lang))
+        await message.answer(get_text(lang, 'err_bad_soliq_turi'))
         return
     await state.update_data(soliq_turi=soliq_turi)
     await AddFirma.name.set()
-    await message.answer(translate_text("Firma nomini kiriting (kamida 3 belgi):", lang))
+    await message.answer(get_text(lang, 'prompt_firma_name'))
 
 @dp.message_handler(state=AddFirma.stir, user_id=ADMIN_IDS)
 async def process_stir(message: types.Message, state: FSMContext):
     stir = message.text.strip()
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     if not re.match(r'^\d{9}$', stir):
-        await message.answer(translate_text("❌ STIR 9 raqamdan iborat bo'lishi kerak.", lang))
+        await message.answer(get_text(lang, 'err_stir_digits'))
         return
-    if check_firma(stir):
-        await message.answer(translate_text("❌ Bu STIR allaqachon mavjud.", lang))
+    if await db.check_firma(stir):
+        await message.answer(get_text(lang, 'err_stir_exists'))
         return
     await state.update_data(stir=stir)
     await AddFirma.soliq_turi.set()
-    await message.answer(translate_text("Soliq turini kiriting (ds-ys, ds-qqs):", lang))
+    await message.answer(get_text(lang, 'prompt_soliq_turi'))
 
 @dp.message_handler(state=AddFirma.name, user_id=ADMIN_IDS)
 async def process_name(message: types.Message, state: FSMContext):
     name = message.text.strip()
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     if len(name) < 3:
-        await message.answer(translate_text("❌ Firma nomi kamida 3 ta belgidan iborat bo'lishi kerak.", lang))
+        await message.answer(get_text(lang, 'err_firma_name_short'))
         return
     data = await state.get_data()
     stir = data['stir']
     soliq_turi = data['soliq_turi']
-    add_firma(stir, name, soliq_turi=soliq_turi)
-    try:
-        os.makedirs(os.path.join(DATA_PATH, stir, "daromad"), exist_ok=True)
-        if soliq_turi == 'ds-ys':
-            os.makedirs(os.path.join(DATA_PATH, stir, "yagona"), exist_ok=True)
-            logger.info(f"Papka yaratildi: data/{stir}/yagona")
-        elif soliq_turi == 'ds-qqs':
-            os.makedirs(os.path.join(DATA_PATH, stir, "qqs"), exist_ok=True)
-            logger.info(f"Papka yaratildi: data/{stir}/qqs")
-    except Exception as e:
-        logger.error(f"Papka yaratishda xato: {e}")
+    await db.add_firma(stir, name, soliq_turi=soliq_turi)
+    create_firm_dirs([(stir, soliq_turi)])
     await state.finish()
-    await message.answer(translate_text(f"✅ Firma qo'shildi: {name} ({stir})", lang))
+    await message.answer(get_text(lang, 'firma_added', name=translate_text(name, lang), stir=stir))
     logger.info(f"Yangi firma qo'shildi: STIR={stir}, Name={name}, Soliq_turi={soliq_turi}")
 
 
@@ -515,24 +458,22 @@ async def process_name(message: types.Message, state: FSMContext):
 async def start_edit_firma(callback_query: types.CallbackQuery):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
-    firms = get_all_firms()
-    if not firms:
-        await bot.send_message(callback_query.from_user.id, translate_text("❌ Hozircha firmalar mavjud emas.", lang))
+    lang = await db.get_user_language(user_id)
+    if not await db.count_firms():
+        await bot.send_message(callback_query.from_user.id, get_text(lang, 'err_no_firms'))
         return
-    keyboard, page, total_pages = create_paginated_keyboard(firms, "edit_firm", page=1, lang=lang)
-    await bot.send_message(callback_query.from_user.id, translate_text(f"Tahrir qilmoqchi bo'lgan firmani tanlang (Sahifa {page}/{total_pages}):", lang), reply_markup=keyboard)
+    keyboard, page, total_pages = await create_firms_keyboard("edit_firm", lang=lang)
+    await bot.send_message(callback_query.from_user.id, get_text(lang, 'prompt_edit_firma_page', page=page, total_pages=total_pages), reply_markup=keyboard)
 
 @dp.callback_query_handler(lambda c: c.data.startswith("edit_firm_page_"), user_id=ADMIN_IDS)
 async def edit_firma_paginate(callback_query: types.CallbackQuery):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
-    page = int(callback_query.data.split("_")[-1])
-    firms = get_all_firms()
-    keyboard, page, total_pages = create_paginated_keyboard(firms, "edit_firm", page=page, lang=lang)
+    lang = await db.get_user_language(user_id)
+    page, after, before = parse_page_callback(callback_query.data)
+    keyboard, page, total_pages = await create_firms_keyboard("edit_firm", page, after, before, lang=lang)
     await bot.edit_message_text(
-        translate_text(f"Tahrir qilmoqchi bo'lgan firmani tanlang (Sahifa {page}/{total_pages}):", lang),
+        get_text(lang, 'prompt_edit_firma_page', page=page, total_pages=total_pages),
         callback_query.from_user.id,
         callback_query.message.message_id,
         reply_markup=keyboard
@@ -544,65 +485,59 @@ async def edit_firma_paginate(callback_query: types.CallbackQuery):
 async def start_edit_firma_search(callback_query: types.CallbackQuery, state: FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     await state.finish()
     await ManualInput.search.set()
     await state.update_data(search_context="edit_firma")
-    await bot.send_message(callback_query.from_user.id, translate_text("Firma STIR yoki nomini kiriting (qisman moslik uchun):", lang))
+    await bot.send_message(callback_query.from_user.id, get_text(lang, 'prompt_search'))
 
 @dp.callback_query_handler(lambda c: c.data.startswith("edit_firm_"), user_id=ADMIN_IDS)
 async def select_firma_to_edit(callback_query: types.CallbackQuery, state: FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     stir = callback_query.data.split("_", 2)[2]
     await state.update_data(stir=stir)
-    firma_name = get_firma_name(stir)
+    firma_name = await db.get_firma_name(stir)
     await EditFirma.new_name.set()
-    await bot.send_message(callback_query.from_user.id, translate_text(f"Hozirgi firma nomi: {firma_name}\nYangi nomni kiriting (kamida 3 belgi):", lang))
+    await bot.send_message(callback_query.from_user.id, get_text(lang, 'prompt_new_firma_name', firma_name=translate_text(firma_name, lang)))
 
 @dp.message_handler(state=EditFirma.new_name, user_id=ADMIN_IDS)
 async def process_new_name(message: types.Message, state: FSMContext):
     new_name = message.text.strip()
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     if len(new_name) < 3:
-        await message.answer(translate_text("❌ Firma nomi kamida 3 ta belgidan iborat bo'lishi kerak.", lang))
+        await message.answer(get_text(lang, 'err_firma_name_short'))
         return
     data = await state.get_data()
     stir = data['stir']
-    conn = sqlite3.connect(os.path.join(DATA_PATH, "bot.db"))
-    c = conn.cursor()
-    c.execute("UPDATE firms SET name = ? WHERE stir = ?", (new_name, stir))
-    conn.commit()
-    conn.close()
+    await db.update_firma_name(stir, new_name)
     await state.finish()
-    await message.answer(translate_text(f"✅ Firma nomi o'zgartirildi: {new_name} ({stir})", lang))
+    await message.answer(get_text(lang, 'firma_renamed', name=translate_text(new_name, lang), stir=stir))
     logger.info(f"Firma nomi o'zgartirildi: STIR={stir}, Yangi nom={new_name}")
 
 @dp.callback_query_handler(lambda c: c.data == "upload_files", user_id=ADMIN_IDS)
 async def start_upload_files(callback_query: types.CallbackQuery):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
-    firms = get_all_firms()  # await olib tashlandi
-    if not firms:
-        await bot.send_message(callback_query.from_user.id, translate_text("❌ Hozircha firmalar mavjud emas.", lang))
+    lang = await db.get_user_language(user_id)
+    if not await db.count_firms():
+        await bot.send_message(callback_query.from_user.id, get_text(lang, 'err_no_firms'))
         return
-    keyboard, page, total_pages = create_paginated_keyboard(firms, "firm_upload", page=1, lang=lang)
-    await bot.send_message(callback_query.from_user.id, translate_text(f"Fayl yuklash uchun firma tanlang (Sahifa {page}/{total_pages}):", lang), reply_markup=keyboard)
+    keyboard, page, total_pages = await create_firms_keyboard("firm_upload", lang=lang)
+    await bot.send_message(callback_query.from_user.id, get_text(lang, 'prompt_upload_firma_page', page=page, total_pages=total_pages), reply_markup=keyboard)
 
 
 @dp.callback_query_handler(lambda c: c.data.startswith("firm_upload_page_"), user_id=ADMIN_IDS)
 async def upload_files_paginate(callback_query: types.CallbackQuery):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
-    page = int(callback_query.data.split("_")[-1])
-    firms = get_all_firms()  # await olib tashlandi
-    keyboard, page, total_pages = create_paginated_keyboard(firms, "firm_upload", page=page, lang=lang)
+    lang = await db.get_user_language(user_id)
+    page, after, before = parse_page_callback(callback_query.data)
+    keyboard, page, total_pages = await create_firms_keyboard("firm_upload", page, after, before, lang=lang)
     await bot.edit_message_text(
-        translate_text(f"Fayl yuklash uchun firma tanlang (Sahifa {page}/{total_pages}):", lang),
+        get_text(lang, 'prompt_upload_firma_page', page=page, total_pages=total_pages),
         callback_query.from_user.id,
         callback_query.message.message_id,
         reply_markup=keyboard
@@ -612,11 +547,11 @@ async def upload_files_paginate(callback_query: types.CallbackQuery):
 async def start_upload_files_search(callback_query: types.CallbackQuery, state: FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     await state.finish()
     await ManualInput.search.set()
     await state.update_data(search_context="upload_files")
-    await bot.send_message(callback_query.from_user.id, translate_text("Firma STIR yoki nomini kiriting (qisman moslik uchun):", lang))
+    await bot.send_message(callback_query.from_user.id, get_text(lang, 'prompt_search'))
 
 logger = logging.getLogger(__name__)
 
@@ -624,26 +559,22 @@ logger = logging.getLogger(__name__)
 async def select_soliq_turi(callback_query: types.CallbackQuery, state: FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     stir = callback_query.data.split("_", 2)[2]
     await state.update_data(stir=stir)
     logger.info(f"select_soliq_turi boshlandi: user_id={user_id}, stir={stir}, lang={lang}")
 
     # Firma ma'lumotlarini olish
     try:
-        conn = sqlite3.connect(os.path.join(DATA_PATH, "bot.db"))
-        c = conn.cursor()
-        c.execute("SELECT name, rahbar, soliq_turi, ds_stavka, ys_stavka, qqs_stavka FROM firms WHERE stir = ?", (stir,))
-        result = c.fetchone()
-        conn.close()
+        result = await db.get_firma_info(stir)
     except Exception as e:
         logger.error(f"Ma'lumotlar bazasidan xato: {e}, STIR={stir}")
-        await bot.send_message(user_id, translate_text("❌ Ma'lumotlar bazasida xato yuz berdi.", lang), parse_mode='Markdown')
+        await bot.send_message(user_id, get_text(lang, 'err_database'), parse_mode='Markdown')
         return
 
     if not result:
         logger.error(f"Firma topilmadi: STIR={stir}")
-        await bot.send_message(user_id, translate_text("❌ Firma topilmadi.", lang), parse_mode='Markdown')
+        await bot.send_message(user_id, get_text(lang, 'err_firma_not_found'), parse_mode='Markdown')
         return
 
     name, rahbar, soliq_turi, ds_stavka, ys_stavka, qqs_stavka = result
@@ -654,31 +585,31 @@ async def select_soliq_turi(callback_query: types.CallbackQuery, state: FSMConte
     message_text = get_text(lang, 'firma_info',
                             stir=stir,
                             firma_nomi=name,
-                            rahbar=rahbar if rahbar else translate_text("Noma'lum", lang),
+                            rahbar=rahbar if rahbar else get_text(lang, 'label_unknown'),
                             soliq_turi=soliq_turi,
                             ds_stavka=ds_stavka if ds_stavka else "Noma'lum",
                             ys_stavka=ys_stavka if ys_stavka else "Noma'lum",
                             qqs_stavka=qqs_stavka if qqs_stavka else "Noma'lum") + "\n\n" + \
                    f"📊 STIR: {stir}\n" + \
-                   translate_text("Soliq turini tanlang", lang) + ":"
+                   get_text(lang, 'btn_select_tax_type') + ":"
 
     # Soliq turiga qarab tugmalar
     keyboard = InlineKeyboardMarkup(row_width=2)
     if soliq_turi == 'ds-ys':
         keyboard.add(
-            InlineKeyboardButton(text=translate_text("Daromad solig'i", lang), callback_data="upload_daromad"),
-            InlineKeyboardButton(text=translate_text("Yagona soliq", lang), callback_data="upload_yagona")
+            InlineKeyboardButton(text=get_text(lang, 'tax_daromad'), callback_data="upload_daromad"),
+            InlineKeyboardButton(text=get_text(lang, 'tax_yagona'), callback_data="upload_yagona")
         )
     elif soliq_turi == 'ds-qqs':
         keyboard.add(
-            InlineKeyboardButton(text=translate_text("Daromad solig'i", lang), callback_data="upload_daromad"),
-            InlineKeyboardButton(text=translate_text("Qo‘shilgan qiymat solig‘i", lang), callback_data="upload_qqs")
+            InlineKeyboardButton(text=get_text(lang, 'tax_daromad'), callback_data="upload_daromad"),
+            InlineKeyboardButton(text=get_text(lang, 'tax_qqs'), callback_data="upload_qqs")
         )
     else:
         logger.error(f"Noto'g'ri soliq_turi: {soliq_turi} firma uchun {stir}")
         keyboard.add(
-            InlineKeyboardButton(text=translate_text("Daromad solig'i", lang), callback_data="upload_daromad"),
-            InlineKeyboardButton(text=translate_text("Qo‘shilgan qiymat solig‘i", lang), callback_data="upload_qqs")
+            InlineKeyboardButton(text=get_text(lang, 'tax_daromad'), callback_data="upload_daromad"),
+            InlineKeyboardButton(text=get_text(lang, 'tax_qqs'), callback_data="upload_qqs")
         )  # Standart tugmalar
         
 
@@ -690,7 +621,7 @@ async def select_soliq_turi(callback_query: types.CallbackQuery, state: FSMConte
         logger.info(f"Xabar yuborildi: STIR={stir}, tugmalar bilan")
     except Exception as e:
         logger.error(f"Xabar yuborishda xato: {e}")
-        await bot.send_message(user_id, translate_text(f"❌ Xabar yuborishda xato: {str(e)}", lang), parse_mode='Markdown')
+        await bot.send_message(user_id, get_text(lang, 'err_send_message', error=translate_text(str(e), lang)), parse_mode='Markdown')
 
 
 
@@ -698,27 +629,27 @@ async def select_soliq_turi(callback_query: types.CallbackQuery, state: FSMConte
 async def select_month_for_upload(callback_query: types.CallbackQuery, state: FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     soliq_turi = callback_query.data.split("_", 1)[1]
     await state.update_data(soliq_turi=soliq_turi)
     keyboard = InlineKeyboardMarkup(row_width=3)
     oylar = ["yanvar", "fevral", "mart", "aprel", "may", "iyun", "iyul"]
     for oy in oylar:
         keyboard.insert(InlineKeyboardButton(get_month_name(lang, oy), callback_data=f"start_upload_{oy}"))
-    await bot.send_message(callback_query.from_user.id, translate_text("Fayllarni qaysi oy uchun yuklamoqchisiz?", lang), reply_markup=keyboard)
+    await bot.send_message(callback_query.from_user.id, get_text(lang, 'prompt_upload_month'), reply_markup=keyboard)
 
 @dp.callback_query_handler(lambda c: c.data.startswith("start_upload_"), user_id=ADMIN_IDS)
 async def start_file_upload(callback_query: types.CallbackQuery, state: FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     oy = callback_query.data.split("_", 2)[2]
     data = await state.get_data()
     stir = data.get('stir')
     soliq_turi = data.get('soliq_turi')
     
     if not stir:
-        await bot.send_message(callback_query.from_user.id, translate_text("❌ STIR ma'lumoti yo'q. Iltimos, qayta boshlang.", lang))
+        await bot.send_message(callback_query.from_user.id, get_text(lang, 'err_missing_stir'))
         await state.finish()
         return
     await state.update_data(oy=oy)
@@ -726,21 +657,21 @@ async def start_file_upload(callback_query: types.CallbackQuery, state: FSMConte
     # Fayllarni tekshirish
     file_path_latin = os.path.normpath(os.path.join(DATA_PATH, stir, soliq_turi, f"{get_month_name('uz_latin', oy)}1.xlsx"))
     file_path_cyrillic = os.path.normpath(os.path.join(DATA_PATH, stir, soliq_turi, f"{get_month_name('uz_cyrillic', oy)}1.xlsx"))
-    existing_file = check_file(stir, soliq_turi, oy, "excel1_latin") or check_file(stir, soliq_turi, oy, "excel1_cyrillic")
+    existing_file = await db.check_file(stir, soliq_turi, oy, "excel1_latin") or await db.check_file(stir, soliq_turi, oy, "excel1_cyrillic")
     
     if existing_file:
         # Agar May1.xlsx yoki Май1.xlsx fayllari mavjud bo‘lsa
         await UploadFiles.excel2.set()
         await bot.send_message(
             callback_query.from_user.id,
-            translate_text(f"✅ {get_month_name(lang, oy)} uchun 1-Excel fayl allaqachon mavjud. Endi 2-Excel faylni yuklang (.xlsx):", lang)
+            get_text(lang, 'excel1_exists_month', oy=get_month_name(lang, oy))
         )
     else:
         # Agar fayllar mavjud bo‘lmasa, darhol 2-Excel faylni so‘rash
         await UploadFiles.excel2.set()
         await bot.send_message(
             callback_query.from_user.id,
-            translate_text(f"📋 {get_month_name(lang, oy)} uchun 1-Excel fayl topilmadi. Iltimos, 2-Excel faylni yuklang (.xlsx):", lang)
+            get_text(lang, 'excel1_missing_month', oy=get_month_name(lang, oy))
         )
 
     logger.info(f"start_file_upload: user_id={user_id}, stir={stir}, oy={oy}, soliq_turi={soliq_turi}, existing_file={existing_file}")
@@ -750,182 +681,81 @@ async def start_file_upload(callback_query: types.CallbackQuery, state: FSMConte
 async def overwrite_file(callback_query: types.CallbackQuery, state: FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     oy = callback_query.data.split("_", 1)[1]
     await state.update_data(oy=oy)
     await UploadFiles.excel1.set()
-    await bot.send_message(callback_query.from_user.id, translate_text("1-Excel faylni yuklang (.xlsx):", lang))
+    await bot.send_message(callback_query.from_user.id, get_text(lang, 'prompt_excel1'))
 
 
-def parse_yagona_excel(file_path, lang='uz_latin'):
-    try:
-        workbook = openpyxl.load_workbook(file_path)
-        sheet = workbook['Лист1']
-        firms = {}
-        for row in sheet.iter_rows(min_row=2, values_only=True):
-            if not any(row):
-                continue
-            stir, oy, firma_nomi, rahbar, soliq_turi_yagona, yil_boshidan_aylanma, shu_oy_aylanma = row
-            if not stir or not oy or not firma_nomi or not rahbar or not soliq_turi_yagona:
-                logger.warning(f"Noto'g'ri qator: {row}")
-                continue
-            if not re.match(r'^\d{9}$', str(stir)):
-                logger.warning(f"Noto'g'ri STIR: {stir}")
-                continue
-            if not check_firma(str(stir)):
-                logger.warning(f"STIR ma'lumotlar bazasida yo'q: {stir}")
-                continue
-            oy = oy.lower()
-            if oy not in ['yanvar', 'fevral', 'mart', 'aprel', 'may', 'iyun', 'iyul']:
-                logger.warning(f"Noto'g'ri oy: {oy}")
-                continue
-            # Standardize soliq_turi_yagona to string with % for consistency
-            if isinstance(soliq_turi_yagona, (int, float)):
-                soliq_turi_yagona = f"{soliq_turi_yagona}%"
-            if lang == 'uz_cyrillic':
-                firma_nomi = convert_to_cyrillic(firma_nomi)
-                rahbar = convert_to_cyrillic(rahbar)
-            else:
-                firma_nomi = translate_text(firma_nomi, lang)
-                rahbar = translate_text(rahbar, lang)
-            key = (str(stir), oy)
-            firms[key] = {
-                'stir': str(stir),
-                'oy': oy,
-                'firma_nomi': firma_nomi,
-                'rahbar': rahbar,
-                'soliq_turi_yagona': soliq_turi_yagona,
-                'yil_boshidan_aylanma': int(yil_boshidan_aylanma),
-                'shu_oy_aylanma': int(shu_oy_aylanma)
-            }
-        return firms, None
-    except Exception as e:
-        logger.error(f"Yagona Excel parsing xatosi: {e}")
-        return None, f"Yagona Excel faylni o'qishda xato: {str(e)}"
+def upload_progress(status, lang, interval=2.0):
+    """Event loopda chaqiriladigan callback: status xabarini ko'pi bilan interval soniyada bir marta yangilaydi."""
+    last_update = [0.0]
+
+    def callback(rows):
+        now = time.monotonic()
+        if now - last_update[0] < interval:
+            return
+        last_update[0] = now
+        text = f"{get_text(lang, 'upload_reading')} {rows:,}"
+        asyncio.ensure_future(status.edit_text(text))
+
+    return callback
 
-def parse_qqs_excel(file_path, lang='uz_latin'):
-    try:
-        workbook = openpyxl.load_workbook(file_path)
-        sheet = workbook['Лист1']  # Excel faylidagi sahifa nomi
-        firms = {}
-
-        for row in sheet.iter_rows(min_row=2, values_only=True):
-            if not any(row):
-                continue
-            stir, oy, firma_nomi, rahbar, soliq_turi_qqs, yil_boshidan_qqs, shu_oy_qqs = row
-
-            if not stir or not oy or not firma_nomi or not rahbar or not soliq_turi_qqs:
-                logger.warning(f"Noto'g'ri qator: {row}")
-                continue
-            if not re.match(r'^\d{9}$', str(stir)):
-                logger.warning(f"Noto'g'ri STIR: {stir}")
-                continue
-            if not check_firma(str(stir)):
-                logger.warning(f"STIR ma'lumotlar bazasida yo'q: {stir}")
-                continue
-
-            oy = oy.lower()
-            if oy not in ['yanvar', 'fevral', 'mart', 'aprel', 'may', 'iyun', 'iyul']:
-                logger.warning(f"Noto'g'ri oy: {oy}")
-                continue
-
-            # Ma'lumotlarni tilga qarab tarjima qilish
-            if lang == 'uz_cyrillic':
-                firma_nomi = convert_to_cyrillic(firma_nomi)
-                rahbar = convert_to_cyrillic(rahbar)
-            else:
-                firma_nomi = translate_text(firma_nomi, lang)
-                rahbar = translate_text(rahbar, lang)
-
-            key = (str(stir), oy)
-            firms[key] = {
-                'stir': str(stir),
-                'oy': oy,
-                'firma_nomi': firma_nomi,
-                'rahbar': rahbar,
-                'soliq_turi_qqs': soliq_turi_qqs,
-                'yil_boshidan_qqs': int(yil_boshidan_qqs),
-                'shu_oy_qqs': int(shu_oy_qqs)
-            }
-
-        return firms, None
-    except Exception as e:
-        logger.error(f"QQS Excel parsing xatosi: {e}")
-        return None, f"QQS Excel faylni o'qishda xato: {str(e)}"
-    
 
+async def parse_upload(message, lang, parser, file_path, parse_lang=None, check_stirs=True, **kwargs):
+    """Yuklangan faylni worker jarayonida parser bilan o'qiydi, o'qilgan qatorlar soni status xabarida ko'rinib turadi.
 
-def generate_yagona_excel(stir, oy, firma_nomi, rahbar, soliq_turi_yagona, yil_boshidan_aylanma, shu_oy_aylanma, dest_path_latin, dest_path_cyrillic):
+    parse_lang: matnli ustunlar o'giriladigan til (standart — admin tili); kwargs parserga uzatiladi.
+    check_stirs: bazadagi STIRlar shu yerda o'qilib, parserga known_stirs sifatida uzatiladi —
+    worker jarayoni bazaga ulanmaydi. Natija parser bilan bir xil: (ma'lumotlar, xato matni).
+    """
+    status = await message.answer(get_text(lang, 'upload_reading'))
     try:
-        # Lotin tilida fayl yaratish
-        workbook_latin = openpyxl.Workbook()
-        sheet_latin = workbook_latin.active
-        sheet_latin.title = "Sheet1"
-        headers_latin = [
-            translate_text("STIR", 'uz_latin'),
-            translate_text("Oy", 'uz_latin'),
-            translate_text("Firma nomi", 'uz_latin'),
-            translate_text("Raxbar", 'uz_latin'),
-            translate_text("Soliq turi yagona", 'uz_latin'),
-            translate_text("Yil boshidan aylanma", 'uz_latin'),
-            translate_text("Shu oy uchun aylanma", 'uz_latin')
-        ]
-        sheet_latin.append(headers_latin)
-        row = [
-            stir,
-            get_month_name('uz_latin', oy),
-            translate_text(firma_nomi, 'uz_latin'),
-            translate_text(rahbar, 'uz_latin'),
-            soliq_turi_yagona,
-            yil_boshidan_aylanma,
-            shu_oy_aylanma
-        ]
-        sheet_latin.append(row)
-
-        os.makedirs(os.path.dirname(dest_path_latin), exist_ok=True)
-        workbook_latin.save(dest_path_latin)
-        logger.info(f"Yagona Excel fayli yaratildi (lotin): {dest_path_latin}")
-
-        # Kirill tilida fayl yaratish
-        workbook_cyrillic = openpyxl.Workbook()
-        sheet_cyrillic = workbook_cyrillic.active
-        sheet_cyrillic.title = "Лист1"
-        headers_cyrillic = [
-            translate_text("STIR", 'uz_cyrillic'),
-            translate_text("Oy", 'uz_cyrillic'),
-            translate_text("Firma nomi", 'uz_cyrillic'),
-            translate_text("Raxbar", 'uz_cyrillic'),
-            translate_text("Soliq turi yagona", 'uz_cyrillic'),
-            translate_text("Yil boshidan aylanma", 'uz_cyrillic'),
-            translate_text("Shu oy uchun aylanma", 'uz_cyrillic')
-        ]
-        sheet_cyrillic.append(headers_cyrillic)
-        row = [
-            stir,
-            get_month_name('uz_cyrillic', oy),
-            translate_text(firma_nomi, 'uz_cyrillic'),
-            translate_text(rahbar, 'uz_cyrillic'),
-            soliq_turi_yagona,
-            yil_boshidan_aylanma,
-            shu_oy_aylanma
-        ]
-        sheet_cyrillic.append(row)
+        if check_stirs:
+            kwargs['known_stirs'] = await db.get_all_stirs()
+        progress = upload_progress(status, lang)
+        return await workers.excel_pool.submit(parser, file_path, parse_lang or lang, progress=progress, **kwargs)
+    except WorkerError as e:
+        logger.error(f"Faylni o'qish workerda bajarilmadi: {e}, fayl: {file_path}")
+        return None, str(e)
+    finally:
+        try:
+            await status.delete()
+        except Exception as e:
+            logger.warning(f"Status xabarini o'chirishda xato: {e}")
 
-        os.makedirs(os.path.dirname(dest_path_cyrillic), exist_ok=True)
-        workbook_cyrillic.save(dest_path_cyrillic)
-        logger.info(f"Yagona Excel fayli yaratildi (kirill): {dest_path_cyrillic}")
 
-        return True
-    except Exception as e:
-        logger.error(f"Yagona Excel faylini yaratishda xato: {e}")
+async def generate_excel(generator, *args):
+    """generate_firma_excel / generate_yagona_excel ni worker jarayonida bajaradi; muvaffaqiyatli bo'lsa True."""
+    try:
+        return await workers.excel_pool.submit(generator, *args)
+    except WorkerError as e:
+        logger.error(f"Excel yaratish workerda bajarilmadi: {e}, {generator.__name__}")
         return False
 
+
+def upload_extension(message):
+    """Yuklangan fayl kengaytmasi (.xlsx, .csv, .tsv): vaqtinchalik fayl shu kengaytma bilan saqlanadi."""
+    return os.path.splitext(message.document.file_name)[1].lower()
+
+
+async def archive_upload(temp_path, file_path_latin, file_path_cyrillic):
+    """Yuklangan faylni arxivga nusxalaydi; CSV/TSV fayllar arxivda .xlsx ga o'giriladi."""
+    if temp_path.endswith(CSV_EXTENSIONS):
+        if await generate_excel(convert_csv_to_xlsx, temp_path, file_path_latin, file_path_cyrillic):
+            return
+        raise RuntimeError(f"CSV faylni Excelga o'girib bo'lmadi: {temp_path}")
+    shutil.copy(temp_path, file_path_latin)
+    shutil.copy(temp_path, file_path_cyrillic)
+
+
 @dp.message_handler(content_types=['document'], state=UploadFiles.excel1, user_id=ADMIN_IDS)
 async def process_excel1(message: types.Message, state: FSMContext):
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
-    if not message.document.file_name.endswith('.xlsx'):
-        await message.answer(translate_text("❌ Faqat .xlsx fayllarni yuklang.", lang))
+    lang = await db.get_user_language(user_id)
+    if not is_table_file(message.document.file_name):
+        await message.answer(get_text(lang, 'err_only_table'))
         logger.warning(f"Noto'g'ri fayl formati: {message.document.file_name}")
         return
     data = await state.get_data()
@@ -937,45 +767,48 @@ async def process_excel1(message: types.Message, state: FSMContext):
     file_path_cyrillic = os.path.normpath(os.path.join(DATA_PATH, stir, soliq_turi, f"{get_month_name('uz_cyrillic', oy)}1.xlsx"))
     os.makedirs(os.path.dirname(file_path_latin), exist_ok=True)
 
-    temp_path = os.path.normpath(os.path.join(DATA_PATH, "temp", f"excel1_{user_id}_{int(datetime.now().timestamp())}.xlsx"))
+    temp_path = os.path.normpath(os.path.join(DATA_PATH, "temp", f"excel1_{user_id}_{int(datetime.now().timestamp())}{upload_extension(message)}"))
     os.makedirs(os.path.dirname(temp_path), exist_ok=True)
 
     try:
         await message.document.download(destination_file=temp_path)
         if soliq_turi == 'yagona':
-            firms, error = parse_yagona_excel(temp_path, lang)
+            # Bazaga nomlar admin tilidan qat'i nazar lotinda yoziladi
+            firms, error = await parse_upload(message, lang, parse_yagona_excel, temp_path, parse_lang='uz_latin')
             if error or not firms:
-                await message.answer(translate_text(f"❌ Faylni o'qishda xato: {error}", lang))
+                await message.answer(get_text(lang, 'err_file_read', error=translate_text(str(error), lang)))
                 logger.error(f"Yagona faylni o'qishda xato: {error}, temp_path={temp_path}")
                 return
+            # Fayldagi barcha firmalar va oylar bitta tranzaksiyada saqlanadi
+            await db.bulk_upsert_reports('yagona', firms)
             key = (stir, oy)
             if key in firms:
                 firm = firms[key]
-                generate_yagona_excel(
-                    stir, oy, firm['firma_nomi'], firm['rahbar'], firm['soliq_turi_yagona'],
+                await generate_excel(
+                    generate_yagona_excel, stir, oy, firm['firma_nomi'], firm['rahbar'], firm['soliq_turi_yagona'],
                     firm['yil_boshidan_aylanma'], firm['shu_oy_aylanma'], file_path_latin, file_path_cyrillic
                 )
         elif soliq_turi == 'qqs':
-            firms, error = parse_qqs_excel(temp_path, lang)
+            firms, error = await parse_upload(message, lang, parse_qqs_excel, temp_path, parse_lang='uz_latin')
             if error or not firms:
-                await message.answer(translate_text(f"❌ Faylni o'qishda xato: {error}", lang))
+                await message.answer(get_text(lang, 'err_file_read', error=translate_text(str(error), lang)))
                 logger.error(f"QQS faylni o'qishda xato: {error}, temp_path={temp_path}")
                 return
-            import shutil
-            shutil.copy(temp_path, file_path_latin)
-            shutil.copy(temp_path, file_path_cyrillic)
+            await db.bulk_upsert_reports('qqs', firms)
+            await archive_upload(temp_path, file_path_latin, file_path_cyrillic)
         else:
-            firms, error = parse_excel_file(temp_path, lang)
+            firms, error = await parse_upload(message, lang, parse_excel_file, temp_path)
             if error or not firms:
-                await message.answer(translate_text(f"❌ Faylni o'qishda xato: {error}", lang))
+                await message.answer(get_text(lang, 'err_file_read', error=translate_text(str(error), lang)))
                 logger.error(f"Daromad faylni o'qishda xato: {error}, temp_path={temp_path}")
                 return
-            import shutil
-            shutil.copy(temp_path, file_path_latin)
-            shutil.copy(temp_path, file_path_cyrillic)
+            await archive_upload(temp_path, file_path_latin, file_path_cyrillic)
 
-        save_file(stir, soliq_turi, oy, "excel1_latin", file_path_latin)
-        save_file(stir, soliq_turi, oy, "excel1_cyrillic", file_path_cyrillic)
+        # Xulosalar keshidagi eski fayl natijalari endi yaroqsiz
+        invalidate_workbook(file_path_latin)
+        invalidate_workbook(file_path_cyrillic)
+        await db.save_file(stir, soliq_turi, oy, "excel1_latin", file_path_latin)
+        await db.save_file(stir, soliq_turi, oy, "excel1_cyrillic", file_path_cyrillic)
         logger.info(f"Fayl yuklandi: {file_path_latin}, {file_path_cyrillic}")
 
         if os.path.exists(temp_path):
@@ -984,19 +817,19 @@ async def process_excel1(message: types.Message, state: FSMContext):
 
         await state.update_data(excel_file_path=temp_path)  # Vaqtinchalik fayl yo‘lini saqlash
         await UploadFiles.excel2.set()
-        sent_message = await message.answer(translate_text("✅ 1-Excel fayl yuklangan, endi 2-Excel faylni yuklang (.xlsx). Bekor qilish uchun /cancel bosing.", lang))
+        sent_message = await message.answer(get_text(lang, 'prompt_excel2'))
         await state.update_data(last_message_id=sent_message.message_id)
         logger.info(f"excel1 holatidan excel2 holatiga o'tildi: user_id={user_id}, stir={stir}, oy={oy}")
     except Exception as e:
         logger.error(f"Excel1 faylini yuklashda xato: {e}, user_id={user_id}, temp_path={temp_path}")
-        await message.answer(translate_text(f"❌ Faylni yuklashda xato yuz berdi: {str(e)}", lang))
+        await message.answer(get_text(lang, 'file_error', error=translate_text(str(e), lang)))
 
 @dp.message_handler(content_types=['document'], state=UploadFiles.excel2, user_id=ADMIN_IDS)
 async def process_excel2(message: types.Message, state: FSMContext):
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     if not message.document.file_name.endswith('.xlsx'):
-        await message.answer(translate_text("❌ Faqat .xlsx fayllarni yuklang.", lang))
+        await message.answer(get_text(lang, 'err_only_xlsx'))
         logger.warning(f"Noto'g'ri fayl formati: {message.document.file_name}, user_id={user_id}")
         return
     data = await state.get_data()
@@ -1005,7 +838,7 @@ async def process_excel2(message: types.Message, state: FSMContext):
     oy = data.get('oy').lower()
     
     if not all([stir, soliq_turi, oy]):
-        await message.answer(translate_text("❌ STIR, soliq turi yoki oy ma'lumotlari yo'q. Qayta boshlang.", lang))
+        await message.answer(get_text(lang, 'err_missing_report_data'))
         logger.error(f"Not enough data: stir={stir}, soliq_turi={soliq_turi}, oy={oy}")
         await state.finish()
         return
@@ -1024,8 +857,8 @@ async def process_excel2(message: types.Message, state: FSMContext):
         shutil.copy(temp_path, file_path_cyrillic)
         logger.info(f"Fayllar nusxalandi: temp={temp_path}, latin={file_path_latin}, cyrillic={file_path_cyrillic}")
         
-        save_file(stir, soliq_turi, oy, "excel2_latin", file_path_latin)
-        save_file(stir, soliq_turi, oy, "excel2_cyrillic", file_path_cyrillic)
+        await db.save_file(stir, soliq_turi, oy, "excel2_latin", file_path_latin)
+        await db.save_file(stir, soliq_turi, oy, "excel2_cyrillic", file_path_cyrillic)
         logger.info(f"Fayl yuklandi: {file_path_latin}, {file_path_cyrillic}")
         
         if os.path.exists(temp_path):
@@ -1034,21 +867,21 @@ async def process_excel2(message: types.Message, state: FSMContext):
         
         await state.update_data(excel_file_path=temp_path)  # Vaqtinchalik fayl yo‘lini saqlash
         await UploadFiles.next()
-        sent_message = await message.answer(translate_text("html_xlsx faylni yuklang yoki /cancel bosib amaliyotni bekor qilin", lang))
+        sent_message = await message.answer(get_text(lang, 'prompt_html_upload'))
         await state.update_data(last_message_id=sent_message.message_id)
         logger.info(f"excel2 holatidan html holatiga o'tildi: user_id={user_id}, stir={stir}, oy={oy}")
     except Exception as e:
         logger.error(f"Excel2 faylini yuklashda xato: {e}, user_id={user_id}, temp_path={temp_path}")
-        await message.answer(translate_text(f"❌ Faylni yuklashda xato yuz berdi: {str(e)}", lang))
+        await message.answer(get_text(lang, 'file_error', error=translate_text(str(e), lang)))
 
 @dp.message_handler(content_types=['document'], state=UploadFiles.html, user_id=ADMIN_IDS)
 async def process_html(message: types.Message, state: FSMContext):
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     logger.info(f"process_html boshlandi: user_id={user_id}, file_name={message.document.file_name}")
 
     if not message.document.file_name.endswith('.html'):
-        await message.answer(translate_text("❌ Faqat .html fayllarni yuklang.", lang), parse_mode='Markdown')
+        await message.answer(get_text(lang, 'err_only_html'), parse_mode='Markdown')
         logger.warning(f"Noto'g'ri fayl formati: {message.document.file_name}, user_id={user_id}")
         return
 
@@ -1058,7 +891,7 @@ async def process_html(message: types.Message, state: FSMContext):
     oy = data.get('oy')
 
     if not all([stir, soliq_turi, oy, user_id]):
-        await message.answer(translate_text("❌ STIR, soliq turi, oy yoki user_id ma'lumotlari yo'q. Qayta boshlang.", lang), parse_mode='Markdown')
+        await message.answer(get_text(lang, 'err_missing_upload_data'), parse_mode='Markdown')
         logger.error(f"Not enough data: stir={stir}, soliq_turi={soliq_turi}, oy={oy}, user_id={user_id}")
         await state.finish()
         return
@@ -1078,7 +911,7 @@ async def process_html(message: types.Message, state: FSMContext):
         shutil.copy(temp_path, file_path_cyrillic)
         logger.info(f"Fayllar nusxalandi: temp={temp_path}, latin={file_path_latin}, cyrillic={file_path_cyrillic}")
 
-        save_file(stir, soliq_turi, oy, "html", file_path_latin)
+        await db.save_file(stir, soliq_turi, oy, "html", file_path_latin)
         logger.info(f"Fayl yuklandi: {file_path_latin}, user_id={user_id}")
 
         if os.path.exists(temp_path):
@@ -1086,37 +919,35 @@ async def process_html(message: types.Message, state: FSMContext):
             logger.info(f"Vaqtinchalik fayl o'chirildi: {temp_path}")
 
         await state.finish()
-        sent_message = await message.answer(translate_text(f"✅ {get_month_name(lang, oy)} uchun fayllar muvaffaqiyatli yuklandi!", lang), parse_mode='Markdown')
+        sent_message = await message.answer(get_text(lang, 'files_uploaded_month', oy=get_month_name(lang, oy)), parse_mode='Markdown')
         await state.update_data(last_message_id=sent_message.message_id)
         logger.info(f"HTML fayl yuklandi va holat yakunlandi: user_id={user_id}, stir={stir}, oy={oy}")
         await back_to_admin_panel(state=state)
     except Exception as e:
         logger.error(f"HTML faylini yuklashda xato: {e}, user_id={user_id}, temp_path={temp_path}")
-        await message.answer(translate_text(f"❌ Faylni yuklashda xato yuz berdi: {str(e)}", lang), parse_mode='Markdown')
+        await message.answer(get_text(lang, 'file_error', error=translate_text(str(e), lang)), parse_mode='Markdown')
 
 
 @dp.callback_query_handler(lambda c: c.data == "delete_report", user_id=ADMIN_IDS)
 async def start_delete_report(callback_query: types.CallbackQuery):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
-    firms = get_all_firms()
-    if not firms:
-        await bot.send_message(callback_query.from_user.id, translate_text("❌ Hozircha firmalar mavjud emas.", lang))
+    lang = await db.get_user_language(user_id)
+    if not await db.count_firms():
+        await bot.send_message(callback_query.from_user.id, get_text(lang, 'err_no_firms'))
         return
-    keyboard, page, total_pages = create_paginated_keyboard(firms, "delete_firm", page=1, lang=lang)
-    await bot.send_message(callback_query.from_user.id, translate_text(f"Hisobotni o'chirish uchun firma tanlang (Sahifa {page}/{total_pages}):", lang), reply_markup=keyboard)
+    keyboard, page, total_pages = await create_firms_keyboard("delete_firm", lang=lang)
+    await bot.send_message(callback_query.from_user.id, get_text(lang, 'prompt_delete_firma_page', page=page, total_pages=total_pages), reply_markup=keyboard)
 
 @dp.callback_query_handler(lambda c: c.data.startswith("delete_firm_page_"), user_id=ADMIN_IDS)
 async def delete_firma_paginate(callback_query: types.CallbackQuery):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
-    page = int(callback_query.data.split("_")[-1])
-    firms = get_all_firms()
-    keyboard, page, total_pages = create_paginated_keyboard(firms, "delete_firm", page=page, lang=lang)
+    lang = await db.get_user_language(user_id)
+    page, after, before = parse_page_callback(callback_query.data)
+    keyboard, page, total_pages = await create_firms_keyboard("delete_firm", page, after, before, lang=lang)
     await bot.edit_message_text(
-        translate_text(f"Hisobotni o'chirish uchun firma tanlang (Sahifa {page}/{total_pages}):", lang),
+        get_text(lang, 'prompt_delete_firma_page', page=page, total_pages=total_pages),
         callback_query.from_user.id,
         callback_query.message.message_id,
         reply_markup=keyboard
@@ -1126,58 +957,50 @@ async def delete_firma_paginate(callback_query: types.CallbackQuery):
 async def start_delete_firma_search(callback_query: types.CallbackQuery, state: FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     await state.finish()
     await ManualInput.search.set()
     await state.update_data(search_context="delete_report")
-    await bot.send_message(callback_query.from_user.id, translate_text("Firma STIR yoki nomini kiriting (qisman moslik uchun):", lang))
+    await bot.send_message(callback_query.from_user.id, get_text(lang, 'prompt_search'))
 
 @dp.callback_query_handler(lambda c: c.data.startswith("delete_firm_"), user_id=ADMIN_IDS)
 async def select_month_to_delete(callback_query: types.CallbackQuery, state: FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     stir = callback_query.data.split("_", 2)[2]
     await state.update_data(stir=stir)
     keyboard = InlineKeyboardMarkup(row_width=3)
     oylar = ["yanvar", "fevral", "mart", "aprel", "may", "iyun", "iyul"]
     for oy in oylar:
         keyboard.insert(InlineKeyboardButton(get_month_name(lang, oy), callback_data=f"delete_oy_{stir}_{oy}"))
-    await bot.send_message(callback_query.from_user.id, translate_text("Qaysi oyning hisobotini o'chirishni xohlaysiz?", lang), reply_markup=keyboard)
+    await bot.send_message(callback_query.from_user.id, get_text(lang, 'prompt_delete_month'), reply_markup=keyboard)
 
 @dp.callback_query_handler(lambda c: c.data.startswith("delete_oy_"), user_id=ADMIN_IDS)
 async def confirm_delete_report(callback_query: types.CallbackQuery, state: FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     _, _, stir, oy = callback_query.data.split("_")
     await state.update_data(oy=oy)
     keyboard = InlineKeyboardMarkup(row_width=2)
     keyboard.add(
-        InlineKeyboardButton(translate_text("Ha, o'chirish", lang), callback_data=f"confirm_delete_{stir}_{oy}"),
-        InlineKeyboardButton(translate_text("Yo'q, bekor qilish", lang), callback_data="cancel_delete")
+        InlineKeyboardButton(get_text(lang, 'btn_delete_yes'), callback_data=f"confirm_delete_{stir}_{oy}"),
+        InlineKeyboardButton(get_text(lang, 'btn_delete_no'), callback_data="cancel_delete")
     )
-    await bot.send_message(callback_query.from_user.id, translate_text(f"{get_month_name(lang, oy)} oyi uchun hisobotni o'chirishni xohlaysizmi?", lang), reply_markup=keyboard)
+    await bot.send_message(callback_query.from_user.id, get_text(lang, 'prompt_delete_month_confirm', oy=get_month_name(lang, oy)), reply_markup=keyboard)
 
 @dp.callback_query_handler(lambda c: c.data.startswith("confirm_delete_"), user_id=ADMIN_IDS)
 async def delete_report(callback_query: types.CallbackQuery, state: FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     _, _, stir, oy = callback_query.data.split("_")
     
     # Firma soliq turini olish
-    conn = sqlite3.connect(os.path.join(DATA_PATH, "bot.db"))
-    c = conn.cursor()
-    c.execute("SELECT soliq_turi FROM firms WHERE stir = ?", (stir,))
-    result = c.fetchone()
-    soliq_turi = result[0].lower() if result and result[0] else 'daromad'
-    
     # Hisobot va fayllarni o'chirish
-    c.execute("DELETE FROM reports WHERE stir = ? AND oy = ?", (stir, oy))
-    c.execute("DELETE FROM files WHERE stir = ? AND oy = ?", (stir, oy))
-    conn.commit()
-    conn.close()
+    firma_soliq_turi = await db.delete_report_data(stir, oy)
+    soliq_turi = firma_soliq_turi.lower() if firma_soliq_turi else 'daromad'
     
     # Faqat firma soliq turiga mos fayllarni o'chirish
     for file_type in ["excel1_latin", "excel1_cyrillic", "excel2_latin", "excel2_cyrillic", "html"]:
@@ -1189,7 +1012,7 @@ async def delete_report(callback_query: types.CallbackQuery, state: FSMContext):
                 logger.info(f"Fayl o'chirildi: {file_path}")
     
     await state.finish()
-    await bot.send_message(callback_query.from_user.id, translate_text(f"✅ {get_month_name(lang, oy)} oyi hisoboti o'chirildi.", lang))
+    await bot.send_message(callback_query.from_user.id, get_text(lang, 'report_deleted_month', oy=get_month_name(lang, oy)))
     logger.info(f"Hisobot o'chirildi: STIR={stir}, Oy={oy}")
 
 
@@ -1197,25 +1020,25 @@ async def delete_report(callback_query: types.CallbackQuery, state: FSMContext):
 async def cancel_delete(callback_query: types.CallbackQuery, state: FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     await state.finish()
-    await bot.send_message(callback_query.from_user.id, translate_text("❌ O'chirish bekor qilindi.", lang))
+    await bot.send_message(callback_query.from_user.id, get_text(lang, 'delete_cancelled'))
 
 @dp.callback_query_handler(lambda c: c.data == "manual_input", user_id=ADMIN_IDS)
 async def start_manual_input(callback_query: types.CallbackQuery, state: FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     keyboard = InlineKeyboardMarkup(row_width=2)
     keyboard.add(
-        InlineKeyboardButton(translate_text("Daromad solig'i", lang), callback_data="manual_daromad"),
-        InlineKeyboardButton(translate_text("Yagona soliq", lang), callback_data="manual_yagona"),
-        InlineKeyboardButton(translate_text("Qo‘shilgan qiymat solig‘i", lang), callback_data="manual_qqs")
+        InlineKeyboardButton(get_text(lang, 'tax_daromad'), callback_data="manual_daromad"),
+        InlineKeyboardButton(get_text(lang, 'tax_yagona'), callback_data="manual_yagona"),
+        InlineKeyboardButton(get_text(lang, 'tax_qqs'), callback_data="manual_qqs")
     )
     await ManualInput.select_soliq_turi.set()
     await bot.send_message(
         callback_query.from_user.id,
-        translate_text("Hisobot kiritish uchun soliq turini tanlang:", lang),
+        get_text(lang, 'prompt_manual_tax_type'),
         reply_markup=keyboard
     )
 
@@ -1223,19 +1046,19 @@ async def start_manual_input(callback_query: types.CallbackQuery, state: FSMCont
 async def process_soliq_turi_selection(callback_query: types.CallbackQuery, state: FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     soliq_turi = callback_query.data.split("_")[1]  # "daromad", "yagona", or "qqs"
     await state.update_data(soliq_turi=soliq_turi)
 
     keyboard = InlineKeyboardMarkup(row_width=2)
     keyboard.add(
-        InlineKeyboardButton(translate_text("Excel fayl yuklash", lang), callback_data="upload_excel"),
-        InlineKeyboardButton(translate_text("Qo'lda kiritish", lang), callback_data="manual_no_excel")
+        InlineKeyboardButton(get_text(lang, 'btn_excel_upload'), callback_data="upload_excel"),
+        InlineKeyboardButton(get_text(lang, 'btn_manual_entry'), callback_data="manual_no_excel")
     )
     await ManualInput.excel_upload.set()
     await bot.send_message(
         callback_query.from_user.id,
-        translate_text(f"{translate_text(soliq_turi.capitalize() + ' solig‘i', lang)} hisobotini kiritish usulini tanlang:", lang),
+        get_text(lang, 'prompt_manual_method', tax=get_text(lang, f'tax_{soliq_turi}')),
         reply_markup=keyboard
     )
 
@@ -1245,7 +1068,7 @@ async def process_soliq_turi_selection(callback_query: types.CallbackQuery, stat
 async def request_excel_file(callback_query: types.CallbackQuery, state: FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     data = await state.get_data()
     last_message_id = data.get('last_message_id')
 
@@ -1258,34 +1081,34 @@ async def request_excel_file(callback_query: types.CallbackQuery, state: FSMCont
 
     sent_message = await bot.send_message(
         callback_query.from_user.id,
-        translate_text("xlsx faylni yuklang yoki /cancel bosib amaliyotni bekor qilin", lang)
+        get_text(lang, 'prompt_xlsx_upload')
     )
     await state.update_data(last_message_id=sent_message.message_id)
 @dp.message_handler(content_types=['document'], state=ManualInput.excel_upload, user_id=ADMIN_IDS)
 async def process_excel_upload(message: types.Message, state: FSMContext):
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
-    if not message.document.file_name.endswith('.xlsx'):
-        await message.answer(translate_text("❌ Faqat .xlsx fayllarni yuklang.", lang))
+    lang = await db.get_user_language(user_id)
+    if not is_table_file(message.document.file_name):
+        await message.answer(get_text(lang, 'err_only_table'))
         return
     data = await state.get_data()
     soliq_turi = data.get('soliq_turi')
-    file_path = os.path.join(DATA_PATH, "temp", f"manual_{user_id}_{int(datetime.now().timestamp())}.xlsx")
+    file_path = os.path.join(DATA_PATH, "temp", f"manual_{user_id}_{int(datetime.now().timestamp())}{upload_extension(message)}")
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
     await message.document.download(destination_file=file_path)
 
     if soliq_turi == 'daromad':
-        firms, error = parse_excel_file(file_path, lang)
+        firms, error = await parse_upload(message, lang, parse_excel_file, file_path)
     elif soliq_turi == 'yagona':
-        firms, error = parse_yagona_excel(file_path, lang)
+        firms, error = await parse_upload(message, lang, parse_yagona_excel, file_path)
     elif soliq_turi == 'qqs':
-        firms, error = parse_qqs_excel(file_path, lang)
+        firms, error = await parse_upload(message, lang, parse_qqs_excel, file_path)
     else:
-        await message.answer(translate_text("❌ Noto'g'ri soliq turi.", lang))
+        await message.answer(get_text(lang, 'err_bad_tax_type'))
         return
 
     if not firms:
-        await message.answer(translate_text(f"❌ Faylni o'qishda xatolik yuz berdi: {error}", lang))
+        await message.answer(get_text(lang, 'err_file_read_failed', error=translate_text(str(error), lang)))
         if os.path.exists(file_path):
             os.remove(file_path)
         return
@@ -1295,7 +1118,7 @@ async def process_excel_upload(message: types.Message, state: FSMContext):
     keyboard, page, total_pages = create_paginated_keyboard(firms_list, "manual_firm", page=1, lang=lang)
     await ManualInput.stir.set()
     await message.answer(
-        translate_text(f"Excel faylidan quyidagi firmalar topildi. Hisobot kiritish uchun birini tanlang (Sahifa {page}/{total_pages}):", lang),
+        get_text(lang, 'prompt_excel_firms_page', page=page, total_pages=total_pages),
         reply_markup=keyboard
     )
 
@@ -1304,14 +1127,25 @@ async def process_excel_upload(message: types.Message, state: FSMContext):
 async def manual_firm_paginate(callback_query: types.CallbackQuery, state: FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
-    page = int(callback_query.data.split("_")[-1])
+    lang = await db.get_user_language(user_id)
     data = await state.get_data()
-    firms = data.get('firms', {})
+    firms = data.get('firms')
+    if not firms:
+        # Excelsiz kiritish: firmalar bazadan sahifalanadi
+        page, after, before = parse_page_callback(callback_query.data)
+        keyboard, page, total_pages = await create_firms_keyboard("manual_firm", page, after, before, lang=lang)
+        await bot.edit_message_text(
+            get_text(lang, 'prompt_manual_firma_page', page=page, total_pages=total_pages),
+            callback_query.from_user.id,
+            callback_query.message.message_id,
+            reply_markup=keyboard
+        )
+        return
+    page = int(callback_query.data.split("_")[-1])
     firms_list = [(k[0], k[1], v['firma_nomi']) for k, v in firms.items()]
     keyboard, page, total_pages = create_paginated_keyboard(firms_list, "manual_firm", page=page, lang=lang)
     await bot.edit_message_text(
-        translate_text(f"Excel faylidan quyidagi firmalar topildi. Hisobot kiritish uchun birini tanlang (Sahifa {page}/{total_pages}):", lang),
+        get_text(lang, 'prompt_excel_firms_page', page=page, total_pages=total_pages),
         callback_query.from_user.id,
         callback_query.message.message_id,
         reply_markup=keyboard
@@ -1321,37 +1155,36 @@ async def manual_firm_paginate(callback_query: types.CallbackQuery, state: FSMCo
 async def start_manual_firm_search(callback_query: types.CallbackQuery, state=FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     await ManualInput.search.set()
     await state.update_data(search_context="manual_excel")
-    await bot.send_message(callback_query.from_user.id, translate_text("Excel faylidagi firma STIR yoki nomini kiriting (qisman moslik uchun):", lang))
+    await bot.send_message(callback_query.from_user.id, get_text(lang, 'prompt_search_excel'))
 
 @dp.callback_query_handler(lambda c: c.data == "manual_no_excel", user_id=ADMIN_IDS, state=ManualInput.excel_upload)
 async def skip_excel_upload(callback_query: types.CallbackQuery, state: FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     data = await state.get_data()
     soliq_turi = data.get('soliq_turi')
 
-    firms = get_all_firms()
-    if not firms:
-        await bot.send_message(callback_query.from_user.id, translate_text("❌ Hozircha firmalar mavjud emas.", lang))
+    if not await db.count_firms():
+        await bot.send_message(callback_query.from_user.id, get_text(lang, 'err_no_firms'))
         await state.finish()
         return
 
-    keyboard, page, total_pages = create_paginated_keyboard(firms, "manual_firm", page=1, lang=lang)
+    keyboard, page, total_pages = await create_firms_keyboard("manual_firm", lang=lang)
     await ManualInput.stir.set()
     await bot.send_message(
         callback_query.from_user.id,
-        translate_text(f"Hisobot kiritish uchun firmani tanlang (Sahifa {page}/{total_pages}):", lang),
+        get_text(lang, 'prompt_manual_firma_page', page=page, total_pages=total_pages),
         reply_markup=keyboard
     )
 @dp.callback_query_handler(lambda c: c.data.startswith("manual_firm_"), user_id=ADMIN_IDS, state=ManualInput.stir)
 async def select_firma_or_month(callback_query: types.CallbackQuery, state=FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     data = await state.get_data()
     parts = callback_query.data.split("_")
     stir = parts[2]
@@ -1359,14 +1192,14 @@ async def select_firma_or_month(callback_query: types.CallbackQuery, state=FSMCo
     soliq_turi = data.get('soliq_turi')
 
     if not re.match(r'^\d{9}$', stir):
-        await bot.send_message(callback_query.from_user.id, translate_text("❌ Noto'g'ri STIR formati. /admin orqali qayta boshlang.", lang))
+        await bot.send_message(callback_query.from_user.id, get_text(lang, 'err_bad_stir'))
         return
 
     await state.update_data(stir=stir)
 
     if oy:
         if oy not in ['yanvar', 'fevral', 'mart', 'aprel', 'may', 'iyun', 'iyul']:
-            await bot.send_message(callback_query.from_user.id, translate_text("❌ Noto'g'ri oy formati. /admin orqali qayta boshlang.", lang))
+            await bot.send_message(callback_query.from_user.id, get_text(lang, 'err_bad_month'))
             return
         await state.update_data(oy=oy)
         if soliq_turi == 'daromad':
@@ -1409,27 +1242,23 @@ async def select_firma_or_month(callback_query: types.CallbackQuery, state=FSMCo
                     )
                     keyboard = InlineKeyboardMarkup(row_width=2)
                     keyboard.add(
-                        InlineKeyboardButton(translate_text("Tasdiqlash", lang), callback_data="confirm_report"),
-                        InlineKeyboardButton(translate_text("Tahrirlash", lang), callback_data="edit_report"),
-                        InlineKeyboardButton(translate_text("Bekor qilish", lang), callback_data="cancel_report")
+                        InlineKeyboardButton(get_text(lang, 'btn_confirm'), callback_data="confirm_report"),
+                        InlineKeyboardButton(get_text(lang, 'btn_edit'), callback_data="edit_report"),
+                        InlineKeyboardButton(get_text(lang, 'btn_cancel'), callback_data="cancel_report")
                     )
                     await ManualInput.confirm.set()
-                    await bot.send_message(callback_query.from_user.id, result + "\n" + translate_text("Tasdiqlaysizmi?", lang), reply_markup=keyboard)
+                    await bot.send_message(callback_query.from_user.id, result + "\n" + get_text(lang, 'prompt_confirm'), reply_markup=keyboard)
                 except Exception as e:
                     logger.error(f"Yagona soliq hisoblashda xato: STIR={stir}, Oy={oy}, Error={str(e)}")
-                    await bot.send_message(callback_query.from_user.id, translate_text(f"❌ Yagona soliq hisoblashda xato: {str(e)}", lang))
+                    await bot.send_message(callback_query.from_user.id, get_text(lang, 'err_yagona_calc', error=translate_text(str(e), lang)))
                     return
             else:
-                firma_name = get_firma_name(stir)
+                firma_name = await db.get_firma_name(stir)
                 await state.update_data(firma_name=firma_name)
                 await ManualInput.yagona_data.set()
                 await bot.send_message(
                     callback_query.from_user.id,
-                    translate_text(
-                        f"Excel faylida {stir} uchun {get_month_name(lang, oy)} ma'lumotlari topilmadi.\n"
-                        f"Yagona soliq ma'lumotlarini kiriting (soliq stavkasi %, yil boshidan aylanma, shu oy aylanma, masalan: 4%, 10000000, 5000000):",
-                        lang
-                    )
+                    get_text(lang, 'prompt_yagona_data_missing', stir=stir, oy=get_month_name(lang, oy))
                 )
         elif soliq_turi == 'qqs':
             firms = data.get('firms', {})
@@ -1469,27 +1298,23 @@ async def select_firma_or_month(callback_query: types.CallbackQuery, state=FSMCo
                     )
                     keyboard = InlineKeyboardMarkup(row_width=2)
                     keyboard.add(
-                        InlineKeyboardButton(translate_text("Tasdiqlash", lang), callback_data="confirm_report"),
-                        InlineKeyboardButton(translate_text("Tahrirlash", lang), callback_data="edit_report"),
-                        InlineKeyboardButton(translate_text("Bekor qilish", lang), callback_data="cancel_report")
+                        InlineKeyboardButton(get_text(lang, 'btn_confirm'), callback_data="confirm_report"),
+                        InlineKeyboardButton(get_text(lang, 'btn_edit'), callback_data="edit_report"),
+                        InlineKeyboardButton(get_text(lang, 'btn_cancel'), callback_data="cancel_report")
                     )
                     await ManualInput.confirm.set()
-                    await bot.send_message(callback_query.from_user.id, result + "\n" + translate_text("Tasdiqlaysizmi?", lang), reply_markup=keyboard)
+                    await bot.send_message(callback_query.from_user.id, result + "\n" + get_text(lang, 'prompt_confirm'), reply_markup=keyboard)
                 except Exception as e:
                     logger.error(f"QQS soliq hisoblashda xato: STIR={stir}, Oy={oy}, Error={str(e)}")
-                    await bot.send_message(callback_query.from_user.id, translate_text(f"❌ QQS soliq hisoblashda xato: {str(e)}", lang))
+                    await bot.send_message(callback_query.from_user.id, get_text(lang, 'err_qqs_calc', error=translate_text(str(e), lang)))
                     return
             else:
-                firma_name = get_firma_name(stir)
+                firma_name = await db.get_firma_name(stir)
                 await state.update_data(firma_name=firma_name)
                 await ManualInput.qqs_data.set()
                 await bot.send_message(
                     callback_query.from_user.id,
-                    translate_text(
-                        f"Excel faylida {stir} uchun {get_month_name(lang, oy)} ma'lumotlari topilmadi.\n"
-                        f"QQS ma'lumotlarini kiriting (soliq stavkasi %, yil boshidan QQS, shu oy QQS, masalan: 15%, 20000000, 10000000):",
-                        lang
-                    )
+                    get_text(lang, 'prompt_qqs_data_missing', stir=stir, oy=get_month_name(lang, oy))
                 )
     else:
         keyboard = InlineKeyboardMarkup(row_width=3)
@@ -1498,7 +1323,7 @@ async def select_firma_or_month(callback_query: types.CallbackQuery, state=FSMCo
             keyboard.insert(InlineKeyboardButton(get_month_name(lang, oy), callback_data=f"manual_oy_{stir}_{oy}"))
         await bot.send_message(
             callback_query.from_user.id,
-            translate_text("Qaysi oy uchun hisobot kiritmoqchisiz?", lang),
+            get_text(lang, 'prompt_manual_month'),
             reply_markup=keyboard
         )
 
@@ -1506,7 +1331,7 @@ async def select_firma_or_month(callback_query: types.CallbackQuery, state=FSMCo
 async def select_month_manual(callback_query: types.CallbackQuery, state=FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     try:
         parts = callback_query.data.split("_")
         if len(parts) != 4:
@@ -1514,20 +1339,20 @@ async def select_month_manual(callback_query: types.CallbackQuery, state=FSMCont
         stir = parts[2]
         oy = parts[3]
         if not re.match(r'^\d{9}$', stir):
-            await bot.send_message(callback_query.from_user.id, translate_text("❌ Noto'g'ri STIR formati. /admin orqali qayta boshlang.", lang))
+            await bot.send_message(callback_query.from_user.id, get_text(lang, 'err_bad_stir'))
             return
         if oy not in ['yanvar', 'fevral', 'mart', 'aprel', 'may', 'iyun', 'iyul']:
-            await bot.send_message(callback_query.from_user.id, translate_text("❌ Noto'g'ri oy formati. /admin orqali qayta boshlang.", lang))
+            await bot.send_message(callback_query.from_user.id, get_text(lang, 'err_bad_month'))
             return
         await state.update_data(stir=stir, oy=oy)
         await process_excel_data(callback_query, state)
     except Exception as e:
         logger.error(f"select_month_manual xatosi: {e}, callback_data={callback_query.data}")
-        await bot.send_message(callback_query.from_user.id, translate_text("❌ Xatolik yuz berdi. /admin orqali qayta boshlang.", lang))
+        await bot.send_message(callback_query.from_user.id, get_text(lang, 'err_restart_admin'))
 
 async def process_excel_data(callback_query: types.CallbackQuery, state: FSMContext):
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     data = await state.get_data()
     stir = data.get('stir')
     oy = data.get('oy')
@@ -1546,8 +1371,8 @@ async def process_excel_data(callback_query: types.CallbackQuery, state: FSMCont
         # Xodimlar ma'lumotlarini to'g'ri formatda shakllantirish
         xodimlar_data = [
             f"{i+1} ({x['lavozim']}) – {x['ism']}, "
-            f"{translate_text('bu_oy_uchun_hisobotda', lang)}: {x['shu_oy']:,} {translate_text('so‘m', lang)} "
-            f"({translate_text('yil_boshidan_hisobotda', lang)}: {x['yil_boshidan']:,} {translate_text('so‘m', lang)})"
+            f"{get_text(lang, 'label_this_month')}: {x['shu_oy']:,} {get_text(lang, 'label_som')} "
+            f"({get_text(lang, 'label_since_year_start')}: {x['yil_boshidan']:,} {get_text(lang, 'label_som')})"
             for i, x in enumerate(xodimlar)
         ]
 
@@ -1570,23 +1395,23 @@ async def process_excel_data(callback_query: types.CallbackQuery, state: FSMCont
         )
         keyboard = InlineKeyboardMarkup(row_width=2)
         keyboard.add(
-            InlineKeyboardButton(translate_text("Tasdiqlash", lang), callback_data="confirm_report"),
-            InlineKeyboardButton(translate_text("Tahrirlash", lang), callback_data="edit_report"),
-            InlineKeyboardButton(translate_text("Bekor qilish", lang), callback_data="cancel_report")
+            InlineKeyboardButton(get_text(lang, 'btn_confirm'), callback_data="confirm_report"),
+            InlineKeyboardButton(get_text(lang, 'btn_edit'), callback_data="edit_report"),
+            InlineKeyboardButton(get_text(lang, 'btn_cancel'), callback_data="cancel_report")
         )
         await ManualInput.confirm.set()
-        await bot.send_message(callback_query.from_user.id, result + "\n" + translate_text("Tasdiqlaysizmi?", lang), reply_markup=keyboard)
+        await bot.send_message(callback_query.from_user.id, result + "\n" + get_text(lang, 'prompt_confirm'), reply_markup=keyboard)
     else:
-        firma_name = get_firma_name(stir)
+        firma_name = await db.get_firma_name(stir)
         await state.update_data(firma_name=firma_name)
         await ManualInput.firma_name.set()
-        await bot.send_message(callback_query.from_user.id, translate_text(f"Excel faylida {stir} uchun {get_month_name(lang, oy)} ma'lumotlari topilmadi.\nFirma nomi (hozirgi: {firma_name}, o'zgartirish uchun yangi nom kiriting yoki bo'sh qoldiring):", lang))
+        await bot.send_message(callback_query.from_user.id, get_text(lang, 'prompt_firma_name_missing', stir=stir, oy=get_month_name(lang, oy), firma_name=translate_text(firma_name, lang)))
 
 
 @dp.message_handler(state=ManualInput.yagona_data, user_id=ADMIN_IDS)
 async def process_yagona_data(message: types.Message, state: FSMContext):
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     data = await state.get_data()
     stir = data.get('stir')
     oy = data.get('oy')
@@ -1597,13 +1422,7 @@ async def process_yagona_data(message: types.Message, state: FSMContext):
     match = re.match(pattern, message.text.strip())
 
     if not match:
-        await message.answer(
-            translate_text(
-                f"❌ Noto'g'ri format. Namuna: 4%, 10000000, 5000000\n"
-                f"Kiritilgan matn: {message.text.strip()}",
-                lang
-            )
-        )
+        await message.answer(get_text(lang, 'err_yagona_format', text=message.text.strip()))
         logger.error(f"Noto'g'ri yagona format kiritildi: user_id={user_id}, matn={message.text.strip()}")
         return
 
@@ -1612,11 +1431,11 @@ async def process_yagona_data(message: types.Message, state: FSMContext):
         yil_boshidan_aylanma = int(yil_boshidan_aylanma.replace(" ", ""))
         shu_oy_aylanma = int(shu_oy_aylanma.replace(" ", ""))
     except ValueError:
-        await message.answer(translate_text("❌ Aylanma summalari raqam bo'lishi kerak.", lang))
+        await message.answer(get_text(lang, 'err_aylanma_numbers'))
         return
 
     yagona_soliq = int(shu_oy_aylanma * (float(soliq_turi_yagona.strip('%')) / 100))
-    rahbar = get_firma_info(stir)[1] or "Noma'lum"
+    rahbar = (await db.get_firma_info(stir))[1] or "Noma'lum"
 
     result = get_text(
         lang,
@@ -1638,17 +1457,17 @@ async def process_yagona_data(message: types.Message, state: FSMContext):
     )
     keyboard = InlineKeyboardMarkup(row_width=2)
     keyboard.add(
-        InlineKeyboardButton(translate_text("Tasdiqlash", lang), callback_data="confirm_report"),
-        InlineKeyboardButton(translate_text("Tahrirlash", lang), callback_data="edit_report"),
-        InlineKeyboardButton(translate_text("Bekor qilish", lang), callback_data="cancel_report")
+        InlineKeyboardButton(get_text(lang, 'btn_confirm'), callback_data="confirm_report"),
+        InlineKeyboardButton(get_text(lang, 'btn_edit'), callback_data="edit_report"),
+        InlineKeyboardButton(get_text(lang, 'btn_cancel'), callback_data="cancel_report")
     )
     await ManualInput.confirm.set()
-    await message.answer(result + "\n" + translate_text("Tasdiqlaysizmi?", lang), reply_markup=keyboard)
+    await message.answer(result + "\n" + get_text(lang, 'prompt_confirm'), reply_markup=keyboard)
 
 @dp.message_handler(state=ManualInput.qqs_data, user_id=ADMIN_IDS)
 async def process_qqs_data(message: types.Message, state: FSMContext):
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     data = await state.get_data()
     stir = data.get('stir')
     oy = data.get('oy')
@@ -1659,13 +1478,7 @@ async def process_qqs_data(message: types.Message, state: FSMContext):
     match = re.match(pattern, message.text.strip())
 
     if not match:
-        await message.answer(
-            translate_text(
-                f"❌ Noto'g'ri format. Namuna: 15%, 20000000, 10000000\n"
-                f"Kiritilgan matn: {message.text.strip()}",
-                lang
-            )
-        )
+        await message.answer(get_text(lang, 'err_qqs_format', text=message.text.strip()))
         logger.error(f"Noto'g'ri QQS format kiritildi: user_id={user_id}, matn={message.text.strip()}")
         return
 
@@ -1674,11 +1487,11 @@ async def process_qqs_data(message: types.Message, state: FSMContext):
         yil_boshidan_qqs = int(yil_boshidan_qqs.replace(" ", ""))
         shu_oy_qqs = int(shu_oy_qqs.replace(" ", ""))
     except ValueError:
-        await message.answer(translate_text("❌ QQS summalari raqam bo'lishi kerak.", lang))
+        await message.answer(get_text(lang, 'err_qqs_numbers'))
         return
 
     qqs_soliq = int(shu_oy_qqs * (float(soliq_turi_qqs.strip('%')) / 100))
-    rahbar = get_firma_info(stir)[1] or "Noma'lum"
+    rahbar = (await db.get_firma_info(stir))[1] or "Noma'lum"
 
     result = get_text(
         lang,
@@ -1700,12 +1513,12 @@ async def process_qqs_data(message: types.Message, state: FSMContext):
     )
     keyboard = InlineKeyboardMarkup(row_width=2)
     keyboard.add(
-        InlineKeyboardButton(translate_text("Tasdiqlash", lang), callback_data="confirm_report"),
-        InlineKeyboardButton(translate_text("Tahrirlash", lang), callback_data="edit_report"),
-        InlineKeyboardButton(translate_text("Bekor qilish", lang), callback_data="cancel_report")
+        InlineKeyboardButton(get_text(lang, 'btn_confirm'), callback_data="confirm_report"),
+        InlineKeyboardButton(get_text(lang, 'btn_edit'), callback_data="edit_report"),
+        InlineKeyboardButton(get_text(lang, 'btn_cancel'), callback_data="cancel_report")
     )
     await ManualInput.confirm.set()
-    await message.answer(result + "\n" + translate_text("Tasdiqlaysizmi?", lang), reply_markup=keyboard)
+    await message.answer(result + "\n" + get_text(lang, 'prompt_confirm'), reply_markup=keyboard)
 
 
 
@@ -1713,85 +1526,50 @@ async def process_qqs_data(message: types.Message, state: FSMContext):
 @dp.message_handler(state=ManualInput.firma_name, user_id=ADMIN_IDS)
 async def process_firma_name(message: types.Message, state=FSMContext):
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     firma_name = message.text.strip()
     data = await state.get_data()
     stir = data['stir']
     if not firma_name:
-        firma_name = data.get('firma_name', get_firma_name(stir))
+        firma_name = data.get('firma_name', await db.get_firma_name(stir))
     if len(firma_name) < 3:
-        await message.answer(translate_text("❌ Firma nomi kamida 3 ta belgidan iborat bo'lishi kerak.", lang))
+        await message.answer(get_text(lang, 'err_firma_name_short'))
         return
     if lang == 'uz_cyrillic':
         firma_name = convert_to_cyrillic(firma_name)
     await state.update_data(firma_name=firma_name)
     await ManualInput.xodimlar_soni.set()
-    await message.answer(translate_text(f"Xodimlar sonini kiriting (raqam bilan, masalan: 2):", lang))
+    await message.answer(get_text(lang, 'prompt_xodimlar_soni'))
 
 @dp.message_handler(state=ManualInput.xodimlar_soni, user_id=ADMIN_IDS)
 async def process_xodimlar_soni(message: types.Message, state=FSMContext):
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     try:
         xodimlar_soni = int(message.text.strip())
         if xodimlar_soni <= 0:
-            await message.answer(translate_text("❌ Xodimlar soni 0 dan katta bo'lishi kerak.", lang))
+            await message.answer(get_text(lang, 'err_xodimlar_soni_positive'))
             return
         await state.update_data(xodimlar_soni=xodimlar_soni, xodimlar_data=[], xodimlar=[])
         await ManualInput.xodimlar_data.set()
-        await message.answer(translate_text(f"Xodimlar ma'lumotlarini kiriting (har bir xodim uchun: raqam (lavozim) – shu oy summasi so'm (yil boshidan jami so'm), masalan:\n1 (Rahbar) – 0 so'm (5000000 so'm)\nHar bir xodimni alohida kiriting, 1-xodimdan boshlang:"), lang)
+        await message.answer(get_text(lang, 'prompt_xodimlar_data'))
     except ValueError:
-        await message.answer(translate_text("❌ Xodimlar soni raqam bo'lishi kerak.", lang))
+        await message.answer(get_text(lang, 'err_xodimlar_soni_number'))
 
 logger = logging.getLogger(__name__)
 
-def parse_firms_excel(file_path, lang='uz_latin'):
-    try:
-        workbook = openpyxl.load_workbook(file_path)
-        sheet = workbook['Лист1']  # Excel faylidagi sahifa nomi
-        firms = []
-
-        for row in sheet.iter_rows(min_row=2, values_only=True):
-            if not any(row):
-                continue
-            stir, firma_nomi, rahbar, soliq_turi, ds_stavka, ys_stavka, qqs_stavka = row
-            if not stir or not firma_nomi or not rahbar or not soliq_turi:
-                logger.warning(f"Noto'g'ri qator: {row}")
-                continue
-            if not re.match(r'^\d{9}$', str(stir)):
-                logger.warning(f"Noto'g'ri STIR: {stir}")
-                continue
-            if check_firma(str(stir)):
-                logger.warning(f"STIR allaqachon mavjud: {stir}")
-                continue
-
-            # Soliq turini to'g'ri formatga aylantirish
-            soliq_turi = soliq_turi.strip().lower()
-            if soliq_turi not in ['ds-ys', 'ds-qqs']:
-                soliq_turi = 'ds-ys'  # Standart holat
-
-            # Ma'lumotlarni to'g'ri formatlash
-            stir = str(stir)
-            firma_nomi = str(firma_nomi).strip()
-            rahbar = str(rahbar).strip()
-            ds_stavka = str(ds_stavka).strip() if ds_stavka else "Noma'lum"
-            ys_stavka = str(ys_stavka).strip() if ys_stavka else "Noma'lum"
-            qqs_stavka = str(qqs_stavka).strip() if qqs_stavka else "Noma'lum"
-
-            firms.append({
-                'stir': stir,
-                'firma_nomi': firma_nomi,
-                'rahbar': rahbar,
-                'soliq_turi': soliq_turi,
-                'ds_stavka': ds_stavka,
-                'ys_stavka': ys_stavka,
-                'qqs_stavka': qqs_stavka
-            })
-
-        return firms, None
-    except Exception as e:
-        logger.error(f"Excel faylini o'qishda xato: {e}")
-        return None, f"Excel faylini o'qishda xato: {str(e)}"
+def format_import_summary(summary, lang, limit=20):
+    lines = [get_text(lang, 'import_summary', inserted=len(summary['inserted']), updated=len(summary['updated']),
+                      skipped=len(summary['skipped']))]
+    for key in ('inserted', 'updated'):
+        firms = summary[key]
+        if not firms:
+            continue
+        names = ", ".join(f"{translate_text(f['firma_nomi'], lang)} ({f['stir']})" for f in firms[:limit])
+        if len(firms) > limit:
+            names += get_text(lang, 'summary_more', count=len(firms) - limit)
+        lines.append(f"{get_text(lang, f'label_{key}')}: {names}")
+    return "\n\n".join(lines)
 
 class AddFirmsFromExcel(StatesGroup):
     excel_upload = State()
@@ -1800,7 +1578,7 @@ class AddFirmsFromExcel(StatesGroup):
 async def start_add_firms_excel(callback_query: types.CallbackQuery, state: FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     data = await state.get_data()
     last_message_id = data.get('last_message_id')
 
@@ -1814,7 +1592,7 @@ async def start_add_firms_excel(callback_query: types.CallbackQuery, state: FSMC
     await AddFirmsFromExcel.excel_upload.set()
     sent_message = await bot.send_message(
         callback_query.from_user.id,
-        translate_text("xlsx faylni yuklang yoki /cancel bosib amaliyotni bekor qilin", lang)
+        get_text(lang, 'prompt_xlsx_upload')
     )
     await state.update_data(last_message_id=sent_message.message_id)
 
@@ -1824,64 +1602,170 @@ async def start_add_firms_excel(callback_query: types.CallbackQuery, state: FSMC
 @dp.message_handler(content_types=['document'], state=AddFirmsFromExcel.excel_upload, user_id=ADMIN_IDS)
 async def process_firms_excel(message: types.Message, state: FSMContext):
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     await state.update_data(user_id=user_id)  # user_id ni state ga saqlash
-    if not message.document.file_name.endswith('.xlsx'):
-        await message.answer(translate_text("❌ Faqat .xlsx fayllarni yuklang.", lang))
+    if not is_table_file(message.document.file_name):
+        await message.answer(get_text(lang, 'err_only_table'))
         await state.finish()
         return
 
-    file_path = os.path.join(DATA_PATH, "temp", f"firms_{user_id}_{int(datetime.now().timestamp())}.xlsx")
+    file_path = os.path.join(DATA_PATH, "temp", f"firms_{user_id}_{int(datetime.now().timestamp())}{upload_extension(message)}")
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
     await message.document.download(destination_file=file_path)
 
-    firms, error = parse_firms_excel(file_path, lang)
+    firms, error = await parse_upload(message, lang, parse_firms_excel, file_path, check_stirs=False)
     if not firms:
-        await message.answer(translate_text(f"❌ Faylni o'qishda xato yuz berdi: {error}", lang))
+        await message.answer(get_text(lang, 'err_file_read_failed', error=translate_text(str(error), lang)))
         if os.path.exists(file_path):
             os.remove(file_path)
         await state.finish()
         return
 
-    added_firms = []
-    for firm in firms:
-        stir = firm['stir']
-        firma_nomi = firm['firma_nomi']
-        rahbar = firm['rahbar']
-        soliq_turi = firm['soliq_turi'].lower()
-        ds_stavka = firm['ds_stavka']
-        ys_stavka = firm['ys_stavka']
-        qqs_stavka = firm['qqs_stavka']
-
-        add_firma(stir, firma_nomi, rahbar, soliq_turi, ds_stavka, ys_stavka, qqs_stavka)
-        try:
-            os.makedirs(os.path.join(DATA_PATH, stir, "daromad"), exist_ok=True)
-            if soliq_turi == 'ds-ys':
-                os.makedirs(os.path.join(DATA_PATH, stir, "yagona"), exist_ok=True)
-                logger.info(f"Papka yaratildi: data/{stir}/yagona")
-            elif soliq_turi == 'ds-qqs':
-                os.makedirs(os.path.join(DATA_PATH, stir, "qqs"), exist_ok=True)
-                logger.info(f"Papka yaratildi: data/{stir}/qqs")
-            else:
-                logger.warning(f"Noto'g'ri soliq_turi: {soliq_turi} firma uchun {stir}")
-        except Exception as e:
-            logger.error(f"Papka yaratishda xato: {e}")
-        added_firms.append(f"{firma_nomi} ({stir})")
-        logger.info(f"Yangi firma qo'shildi: STIR={stir}, Name={firma_nomi}, Soliq_turi={soliq_turi}")
+    summary = await db.bulk_upsert_firms(firms)
+    new_dirs = [(f['stir'], f['soliq_turi']) for f in summary['inserted']]
+    await asyncio.get_running_loop().run_in_executor(None, create_firm_dirs, new_dirs)
 
     if os.path.exists(file_path):
         os.remove(file_path)
         logger.info(f"Vaqtinchalik fayl o'chirildi: {file_path}")
 
-    await message.answer(translate_text(f"✅ Quyidagi firmalar qo'shildi:\n{', '.join(added_firms)}", lang))
+    await message.answer(format_import_summary(summary, lang))
     await state.finish()
     await state.update_data(user_id=user_id)
     await back_to_admin_panel(state=state) # message orqali user_id uzatiladi
 
+class BulkUpload(StatesGroup):
+    excel_upload = State()
+
+BULK_TAX_TYPES = ('daromad', 'yagona', 'qqs')
+
+def report_file_paths(stir, soliq_turi, oy):
+    """Firma-oy hisobotining (lotin, kirill) fayl yo'llari — process_excel1 dagi nomlar bilan bir xil."""
+    return tuple(os.path.normpath(os.path.join(DATA_PATH, stir, soliq_turi, f"{get_month_name(file_lang, oy)}1.xlsx"))
+                 for file_lang in ('uz_latin', 'uz_cyrillic'))
+
+async def fan_out_reports(message, lang, soliq_turi, firms):
+    """Ommaviy yuklashdagi har bir firma-oy uchun fayllar, files yozuvlari va hisobot qatorlarini saqlaydi.
+
+    Firma-oylar BULK_CHUNK_SIZE lik bo'laklarga bo'linadi: fayllar worker jarayonlarida parallel yaratiladi,
+    har bir bo'lakning hisobotlari va files yozuvlari bitta tranzaksiyada yoziladi.
+    Natija: (fayllari yaratilgan, yaratilmagan) (stir, oy) kalitlari.
+    """
+    keys = list(firms)
+    paths = {(stir, oy): report_file_paths(stir, soliq_turi, oy) for stir, oy in keys}
+    chunks = [keys[i:i + BULK_CHUNK_SIZE] for i in range(0, len(keys), BULK_CHUNK_SIZE)]
+    written, failed = [], []
+    status = await message.answer(get_text(lang, 'bulk_writing_files'))
+    try:
+        # Bir vaqtda jarayonlar sonicha bo'lak yuboriladi, shunda worker navbati to'lib qolmaydi
+        wave_size = workers.excel_pool.max_workers
+        for start in range(0, len(chunks), wave_size):
+            wave = chunks[start:start + wave_size]
+            results = await asyncio.gather(*(
+                workers.excel_pool.submit(write_report_files, soliq_turi, [(firms[key], *paths[key]) for key in chunk])
+                for chunk in wave
+            ), return_exceptions=True)
+            for chunk, result in zip(wave, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Ommaviy yuklash: {len(chunk)} ta firma-oy fayllari yaratilmadi: {result}")
+                    result = ()
+                ok = set(result)
+                files = []
+                for stir, oy in chunk:
+                    if (stir, oy) not in ok:
+                        failed.append((stir, oy))
+                        continue
+                    path_latin, path_cyrillic = paths[(stir, oy)]
+                    invalidate_workbook(path_latin)
+                    invalidate_workbook(path_cyrillic)
+                    files.append((stir, oy, "excel1_latin", path_latin))
+                    files.append((stir, oy, "excel1_cyrillic", path_cyrillic))
+                    written.append((stir, oy))
+                await db.save_bulk_reports(soliq_turi, {key: firms[key] for key in chunk}, files)
+            try:
+                await status.edit_text(f"{get_text(lang, 'bulk_writing_files')} {len(written) + len(failed):,}/{len(keys):,}")
+            except Exception as e:
+                logger.warning(f"Status xabarini yangilashda xato: {e}")
+    finally:
+        try:
+            await status.delete()
+        except Exception as e:
+            logger.warning(f"Status xabarini o'chirishda xato: {e}")
+    return written, failed
+
+def format_bulk_summary(parsed, written, failed, lang, limit=20):
+    firms = parsed.result
+    lines = [get_text(lang, 'bulk_summary', firms=len({stir for stir, _ in firms}), months=len({oy for _, oy in firms}),
+                      reports=len(firms), files=len(written) * 2)]
+    if parsed.error_count:
+        lines.append(get_text(lang, 'bulk_skipped_rows', count=parsed.error_count,
+                              errors=translate_text(parsed.error_summary(), lang)))
+    if failed:
+        names = ", ".join(f"{stir} ({get_month_name(lang, oy)})" for stir, oy in failed[:limit])
+        if len(failed) > limit:
+            names += get_text(lang, 'summary_more', count=len(failed) - limit)
+        lines.append(get_text(lang, 'bulk_files_failed', names=names))
+    return "\n\n".join(lines)
+
+@dp.callback_query_handler(lambda c: c.data == "bulk_upload", user_id=ADMIN_IDS)
+async def start_bulk_upload(callback_query: types.CallbackQuery, state: FSMContext):
+    await bot.answer_callback_query(callback_query.id)
+    lang = await db.get_user_language(callback_query.from_user.id)
+    keyboard = InlineKeyboardMarkup(row_width=2)
+    keyboard.add(*[
+        InlineKeyboardButton(text=get_text(lang, f'tax_{soliq_turi}'), callback_data=f"bulk_tax_{soliq_turi}")
+        for soliq_turi in BULK_TAX_TYPES
+    ])
+    await bot.send_message(callback_query.from_user.id, get_text(lang, 'prompt_bulk_tax_type'), reply_markup=keyboard)
+
+@dp.callback_query_handler(lambda c: c.data.startswith("bulk_tax_"), user_id=ADMIN_IDS)
+async def select_bulk_tax_type(callback_query: types.CallbackQuery, state: FSMContext):
+    await bot.answer_callback_query(callback_query.id)
+    lang = await db.get_user_language(callback_query.from_user.id)
+    soliq_turi = callback_query.data.split("_", 2)[2]
+    if soliq_turi not in BULK_TAX_TYPES:
+        await bot.send_message(callback_query.from_user.id, get_text(lang, 'err_bad_tax_type'))
+        return
+    await BulkUpload.excel_upload.set()
+    await state.update_data(bulk_soliq_turi=soliq_turi)
+    await bot.send_message(callback_query.from_user.id, get_text(lang, 'prompt_bulk_upload'))
+
+@dp.message_handler(content_types=['document'], state=BulkUpload.excel_upload, user_id=ADMIN_IDS)
+async def process_bulk_upload(message: types.Message, state: FSMContext):
+    user_id = message.from_user.id
+    lang = await db.get_user_language(user_id)
+    if not is_table_file(message.document.file_name):
+        await message.answer(get_text(lang, 'err_only_table'))
+        return
+    soliq_turi = (await state.get_data()).get('bulk_soliq_turi')
+
+    file_path = os.path.join(DATA_PATH, "temp", f"bulk_{user_id}_{int(datetime.now().timestamp())}{upload_extension(message)}")
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    try:
+        await message.document.download(destination_file=file_path)
+        # Barcha qatorlar bitta o'tishda tekshiriladi; nomlar bazaga lotinda yoziladi
+        parsed, error = await parse_upload(message, lang, parse_bulk_report, file_path, parse_lang='uz_latin', soliq_turi=soliq_turi)
+        if parsed is None:
+            await message.answer(get_text(lang, 'err_file_read', error=translate_text(str(error), lang)))
+            return
+        written, failed = await fan_out_reports(message, lang, soliq_turi, parsed.result)
+        await message.answer(format_bulk_summary(parsed, written, failed, lang))
+        logger.info(f"Ommaviy yuklash: soliq_turi={soliq_turi}, hisobotlar={len(parsed.result)}, "
+                    f"fayllar={len(written)}, xatolar={parsed.error_count + len(failed)}, user_id={user_id}")
+    except Exception as e:
+        logger.error(f"Ommaviy yuklashda xato: {e}, user_id={user_id}, fayl={file_path}")
+        await message.answer(get_text(lang, 'file_error', error=translate_text(str(e), lang)))
+    finally:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+    await state.finish()
+    await state.update_data(user_id=user_id)
+    await back_to_admin_panel(state=state)
+
 @dp.message_handler(state=ManualInput.xodimlar_data, user_id=ADMIN_IDS)
 async def process_xodimlar_data(message: types.Message, state=FSMContext):
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     data = await state.get_data()
     xodimlar_soni = data['xodimlar_soni']
     xodimlar_data = data.get('xodimlar_data', [])
@@ -1892,13 +1776,7 @@ async def process_xodimlar_data(message: types.Message, state=FSMContext):
     match = re.match(pattern, message.text.strip())
 
     if not match:
-        await message.answer(
-            translate_text(
-                f"❌ Noto'g'ri format. Namuna: 1 (Rahbar) – Aliyev Valijon – 0 so'm (5000000 so'm)\n"
-                f"Kiritilgan matn: {message.text.strip()}",
-                lang
-            )
-        )
+        await message.answer(get_text(lang, 'err_xodim_format', text=message.text.strip()))
         logger.error(f"Noto'g'ri format kiritildi: user_id={user_id}, matn={message.text.strip()}")
         return
 
@@ -1908,7 +1786,7 @@ async def process_xodimlar_data(message: types.Message, state=FSMContext):
     yil_boshidan = int(yil_boshidan.replace(" ", ""))
 
     if index != len(xodimlar_data) + 1:
-        await message.answer(translate_text(f"❌ Noto'g'ri tartib raqami. {len(xodimlar_data) + 1}-xodimni kiriting.", lang))
+        await message.answer(get_text(lang, 'err_xodim_index', index=len(xodimlar_data) + 1))
         logger.error(f"Noto'g'ri tartib raqami: user_id={user_id}, index={index}, kutilgan={len(xodimlar_data) + 1}")
         return
 
@@ -1923,8 +1801,8 @@ async def process_xodimlar_data(message: types.Message, state=FSMContext):
     # To‘liq formatni shakllantirish
     xodimlar_data.append(
         f"{index} ({lavozim}) – {ism_familya}, "
-        f"{translate_text('bu_oy_uchun_hisobotda', lang)}: {shu_oy:,} {translate_text('so‘m', lang)} "
-        f"({translate_text('yil_boshidan_hisobotda', lang)}: {yil_boshidan:,} {translate_text('so‘m', lang)})"
+        f"{get_text(lang, 'label_this_month')}: {shu_oy:,} {get_text(lang, 'label_som')} "
+        f"({get_text(lang, 'label_since_year_start')}: {yil_boshidan:,} {get_text(lang, 'label_som')})"
     )
     xodimlar.append({
         'lavozim': lavozim,
@@ -1937,7 +1815,7 @@ async def process_xodimlar_data(message: types.Message, state=FSMContext):
     logger.info(f"Xodim ma'lumotlari qo'shildi: user_id={user_id}, index={index}, lavozim={lavozim}, ism={ism_familya}")
 
     if len(xodimlar_data) < xodimlar_soni:
-        await message.answer(translate_text(f"Keyingi xodim ma'lumotlarini kiriting ({len(xodimlar_data) + 1}/{xodimlar_soni}):", lang))
+        await message.answer(get_text(lang, 'prompt_next_xodim', index=len(xodimlar_data) + 1, total=xodimlar_soni))
         return
 
     hisobot_davri_oylik = sum(x['shu_oy'] for x in xodimlar if x['shu_oy'] > 0)
@@ -1962,12 +1840,12 @@ async def process_xodimlar_data(message: types.Message, state=FSMContext):
     )
     keyboard = InlineKeyboardMarkup(row_width=2)
     keyboard.add(
-        InlineKeyboardButton(translate_text("Tasdiqlash", lang), callback_data="confirm_report"),
-        InlineKeyboardButton(translate_text("Tahrirlash", lang), callback_data="edit_report"),
-        InlineKeyboardButton(translate_text("Bekor qilish", lang), callback_data="cancel_report")
+        InlineKeyboardButton(get_text(lang, 'btn_confirm'), callback_data="confirm_report"),
+        InlineKeyboardButton(get_text(lang, 'btn_edit'), callback_data="edit_report"),
+        InlineKeyboardButton(get_text(lang, 'btn_cancel'), callback_data="cancel_report")
     )
     await ManualInput.confirm.set()
-    await message.answer(result + "\n" + translate_text("Tasdiqlaysizmi?", lang), reply_markup=keyboard)
+    await message.answer(result + "\n" + get_text(lang, 'prompt_confirm'), reply_markup=keyboard)
 
 
 
@@ -1975,7 +1853,7 @@ async def process_xodimlar_data(message: types.Message, state=FSMContext):
 async def confirm_manual_report(callback_query: types.CallbackQuery, state=FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     data = await state.get_data()
     stir = data.get('stir')
     oy = data.get('oy')
@@ -1984,12 +1862,12 @@ async def confirm_manual_report(callback_query: types.CallbackQuery, state=FSMCo
     # Retrieve firma_name from state or database
     firma_name = data.get('firma_name')
     if not firma_name:
-        firma_name = get_firma_name(stir)
+        firma_name = await db.get_firma_name(stir)
         if not firma_name:
             logger.error(f"Firma nomi topilmadi: STIR={stir}, user_id={user_id}")
             await bot.send_message(
                 callback_query.from_user.id,
-                translate_text("❌ Firma nomi topilmadi. Iltimos, qayta boshlang.", lang)
+                get_text(lang, 'err_firma_name_not_found')
             )
             await state.finish()
             return
@@ -2004,19 +1882,20 @@ async def confirm_manual_report(callback_query: types.CallbackQuery, state=FSMCo
             soliq = data['soliq']
             xodimlar = data.get('xodimlar', [])
 
-            save_manual_report(stir, oy, firma_name, xodimlar_soni, "\n".join(xodimlar_data), hisobot_davri_oylik, jami_oylik, soliq)
+            await db.save_manual_report(stir, oy, firma_name, xodimlar_soni, "\n".join(xodimlar_data), hisobot_davri_oylik, jami_oylik, soliq,
+                                        xodimlar=xodimlar)
 
             dest_path_latin = os.path.join(DATA_PATH, stir, "daromad", f"{get_month_name('uz_latin', oy)}1.xlsx")
             dest_path_cyrillic = os.path.join(DATA_PATH, stir, "daromad", f"{get_month_name('uz_cyrillic', oy)}1.xlsx")
-            if generate_firma_excel(stir, oy, firma_name, xodimlar, dest_path_latin, dest_path_cyrillic):
-                save_file(stir, "daromad", oy, "excel1_latin", dest_path_latin)
-                save_file(stir, "daromad", oy, "excel1_cyrillic", dest_path_cyrillic)
+            if await generate_excel(generate_firma_excel, stir, oy, firma_name, xodimlar, dest_path_latin, dest_path_cyrillic):
+                await db.save_file(stir, "daromad", oy, "excel1_latin", dest_path_latin)
+                await db.save_file(stir, "daromad", oy, "excel1_cyrillic", dest_path_cyrillic)
                 logger.info(f"Excel fayllari saqlandi: {dest_path_latin}, {dest_path_cyrillic}")
             else:
                 logger.error(f"Excel fayllarini saqlashda xato: {dest_path_latin}, {dest_path_cyrillic}")
                 await bot.send_message(
                     callback_query.from_user.id,
-                    translate_text("⚠️ Hisobot saqlandi, lekin Excel fayllarini yaratishda xato yuz berdi.", lang)
+                    get_text(lang, 'report_saved_excel_failed')
                 )
         elif soliq_turi == 'yagona':
             soliq_turi_yagona = data['soliq_turi_yagona']
@@ -2025,19 +1904,19 @@ async def confirm_manual_report(callback_query: types.CallbackQuery, state=FSMCo
             yagona_soliq = data['yagona_soliq']
             rahbar = data['rahbar']
 
-            save_yagona_report(stir, oy, firma_name, rahbar, soliq_turi_yagona, yil_boshidan_aylanma, shu_oy_aylanma, yagona_soliq)
+            await db.save_yagona_report(stir, oy, firma_name, rahbar, soliq_turi_yagona, yil_boshidan_aylanma, shu_oy_aylanma, yagona_soliq)
 
             dest_path_latin = os.path.join(DATA_PATH, stir, "yagona", f"{get_month_name('uz_latin', oy)}1.xlsx")
             dest_path_cyrillic = os.path.join(DATA_PATH, stir, "yagona", f"{get_month_name('uz_cyrillic', oy)}1.xlsx")
-            if generate_yagona_excel(stir, oy, firma_name, rahbar, soliq_turi_yagona, yil_boshidan_aylanma, shu_oy_aylanma, dest_path_latin, dest_path_cyrillic):
-                save_file(stir, "yagona", oy, "excel1_latin", dest_path_latin)
-                save_file(stir, "yagona", oy, "excel1_cyrillic", dest_path_cyrillic)
+            if await generate_excel(generate_yagona_excel, stir, oy, firma_name, rahbar, soliq_turi_yagona, yil_boshidan_aylanma, shu_oy_aylanma, dest_path_latin, dest_path_cyrillic):
+                await db.save_file(stir, "yagona", oy, "excel1_latin", dest_path_latin)
+                await db.save_file(stir, "yagona", oy, "excel1_cyrillic", dest_path_cyrillic)
                 logger.info(f"Yagona Excel fayllari saqlandi: {dest_path_latin}, {dest_path_cyrillic}")
             else:
                 logger.error(f"Yagona Excel fayllarini saqlashda xato: {dest_path_latin}, {dest_path_cyrillic}")
                 await bot.send_message(
                     callback_query.from_user.id,
-                    translate_text("⚠️ Hisobot saqlandi, lekin Excel fayllarini yaratishda xato yuz berdi.", lang)
+                    get_text(lang, 'report_saved_excel_failed')
                 )
         elif soliq_turi == 'qqs':
             soliq_turi_qqs = data['soliq_turi_qqs']
@@ -2046,25 +1925,25 @@ async def confirm_manual_report(callback_query: types.CallbackQuery, state=FSMCo
             qqs_soliq = data['qqs_soliq']
             rahbar = data['rahbar']
 
-            save_qqs_report(stir, oy, firma_name, rahbar, soliq_turi_qqs, yil_boshidan_qqs, shu_oy_qqs, qqs_soliq)
+            await db.save_qqs_report(stir, oy, firma_name, rahbar, soliq_turi_qqs, yil_boshidan_qqs, shu_oy_qqs, qqs_soliq)
 
             dest_path_latin = os.path.join(DATA_PATH, stir, "qqs", f"{get_month_name('uz_latin', oy)}1.xlsx")
             dest_path_cyrillic = os.path.join(DATA_PATH, stir, "qqs", f"{get_month_name('uz_cyrillic', oy)}1.xlsx")
-            if generate_yagona_excel(stir, oy, firma_name, rahbar, soliq_turi_qqs, yil_boshidan_qqs, shu_oy_qqs, dest_path_latin, dest_path_cyrillic):
-                save_file(stir, "qqs", oy, "excel1_latin", dest_path_latin)
-                save_file(stir, "qqs", oy, "excel1_cyrillic", dest_path_cyrillic)
+            if await generate_excel(generate_yagona_excel, stir, oy, firma_name, rahbar, soliq_turi_qqs, yil_boshidan_qqs, shu_oy_qqs, dest_path_latin, dest_path_cyrillic):
+                await db.save_file(stir, "qqs", oy, "excel1_latin", dest_path_latin)
+                await db.save_file(stir, "qqs", oy, "excel1_cyrillic", dest_path_cyrillic)
                 logger.info(f"QQS Excel fayllari saqlandi: {dest_path_latin}, {dest_path_cyrillic}")
             else:
                 logger.error(f"QQS Excel fayllarini saqlashda xato: {dest_path_latin}, {dest_path_cyrillic}")
                 await bot.send_message(
                     callback_query.from_user.id,
-                    translate_text("⚠️ Hisobot saqlandi, lekin Excel fayllarini yaratishda xato yuz berdi.", lang)
+                    get_text(lang, 'report_saved_excel_failed')
                 )
         else:
             logger.error(f"Noto'g'ri soliq_turi: {soliq_turi}, STIR={stir}, Oy={oy}")
             await bot.send_message(
                 callback_query.from_user.id,
-                translate_text("❌ Noto'g'ri soliq turi. Iltimos, qayta boshlang.", lang)
+                get_text(lang, 'err_bad_tax_type_restart')
             )
             await state.finish()
             return
@@ -2077,7 +1956,7 @@ async def confirm_manual_report(callback_query: types.CallbackQuery, state=FSMCo
         await state.finish()
         await bot.send_message(
             callback_query.from_user.id,
-            translate_text(f"✅ {get_month_name(lang, oy)} uchun hisobot saqlandi.", lang)
+            get_text(lang, 'report_saved_month', oy=get_month_name(lang, oy))
         )
         logger.info(f"Hisobot saqlandi: STIR={stir}, Oy={oy}, Firma={firma_name}, Soliq_turi={soliq_turi}")
         await back_to_admin_panel(callback_query=callback_query, state=state)
@@ -2086,7 +1965,7 @@ async def confirm_manual_report(callback_query: types.CallbackQuery, state=FSMCo
         logger.error(f"Hisobotni saqlashda xato: STIR={stir}, Oy={oy}, Soliq_turi={soliq_turi}, Error={str(e)}")
         await bot.send_message(
             callback_query.from_user.id,
-            translate_text(f"❌ Hisobotni saqlashda xato yuz berdi: {str(e)}", lang)
+            get_text(lang, 'err_report_save', error=translate_text(str(e), lang))
         )
         await state.finish()
 
@@ -2094,7 +1973,7 @@ async def confirm_manual_report(callback_query: types.CallbackQuery, state=FSMCo
 async def edit_manual_report(callback_query: types.CallbackQuery, state=FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     data = await state.get_data()
     firma_name = data['firma_name']
     soliq_turi = data.get('soliq_turi')
@@ -2103,25 +1982,19 @@ async def edit_manual_report(callback_query: types.CallbackQuery, state=FSMConte
         await ManualInput.firma_name.set()
         await bot.send_message(
             callback_query.from_user.id,
-            translate_text(f"Firma nomi (hozirgi: {firma_name}, o'zgartirish uchun yangi nom kiriting yoki bo'sh qoldiring):", lang)
+            get_text(lang, 'prompt_firma_name_current', firma_name=translate_text(firma_name, lang))
         )
     elif soliq_turi == 'yagona':
         await ManualInput.yagona_data.set()
         await bot.send_message(
             callback_query.from_user.id,
-            translate_text(
-                f"Yagona soliq ma'lumotlarini qayta kiriting (soliq stavkasi %, yil boshidan aylanma, shu oy aylanma, masalan: 4%, 10000000, 5000000):",
-                lang
-            )
+            get_text(lang, 'prompt_yagona_data_again')
         )
     elif soliq_turi == 'qqs':
         await ManualInput.qqs_data.set()
         await bot.send_message(
             callback_query.from_user.id,
-            translate_text(
-                f"QQS ma'lumotlarini qayta kiriting (soliq stavkasi %, yil boshidan QQS, shu oy QQS, masalan: 15%, 20000000, 10000000):",
-                lang
-            )
+            get_text(lang, 'prompt_qqs_data_again')
         )
 
 
@@ -2129,31 +2002,53 @@ async def edit_manual_report(callback_query: types.CallbackQuery, state=FSMConte
 async def cancel_manual_report(callback_query: types.CallbackQuery, state=FSMContext):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     data = await state.get_data()
     excel_file_path = data.get('excel_file_path')
     if excel_file_path and os.path.exists(excel_file_path):
         os.remove(excel_file_path)
         logger.info(f"Vaqtinchalik fayl o'chirildi: {excel_file_path}")
     await state.finish()
-    await bot.send_message(callback_query.from_user.id, translate_text("❌ Hisobot kiritish bekor qilindi.", lang))
+    await bot.send_message(callback_query.from_user.id, get_text(lang, 'manual_report_cancelled'))
     logger.info(f"Hisobot kiritish bekor qilindi: user_id={callback_query.from_user.id}")
 
+# Qidiruv konteksti -> natija tugmalarining callback prefiksi
+SEARCH_CALLBACK_PREFIXES = {
+    'edit_firma': 'edit_firm',
+    'upload_files': 'firm_upload',
+    'delete_report': 'delete_firm',
+    'manual_excel': 'manual_firm',
+}
+SEARCH_LIMIT = 10
+
 @dp.message_handler(state=ManualInput.search, user_id=ADMIN_IDS)
 async def process_search(message: types.Message, state=FSMContext):
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
-    search_query = message.text.strip().lower()
+    lang = await db.get_user_language(user_id)
+    search_query = message.text.strip()
     data = await state.get_data()
     search_context = data.get('search_context')
-    firms = get_all_firms()
-    filtered_firms = [(stir, name) for stir, name in firms if search_query in stir.lower() or search_query in name.lower()]
-    
+    callback_prefix = SEARCH_CALLBACK_PREFIXES.get(search_context, search_context)
+
+    if search_context == 'manual_excel' and data.get('firms'):
+        # Excel faylidagi firmalar xotirada, ular orasidan qidiriladi
+        query = search_latin(search_query)
+        filtered_firms = [(k[0], k[1], v['firma_nomi']) for k, v in data.get('firms', {}).items()
+                          if query in k[0] or query in search_latin(v['firma_nomi'])]
+    else:
+        filtered_firms = await db.search_firms(search_query, limit=SEARCH_LIMIT)
+        if not filtered_firms:
+            # Nom xato yozilgan bo'lishi mumkin: trigram o'xshashligi bo'yicha eng yaqinlari
+            filtered_firms = await db.fuzzy_search_firms(search_query, limit=SEARCH_LIMIT)
+
     if not filtered_firms:
-        await message.answer(translate_text("❌ Qidiruv bo'yicha firma topilmadi.", lang))
+        await message.answer(get_text(lang, 'err_search_not_found'))
         await state.finish()
         return
 
-    keyboard, page, total_pages = create_paginated_keyboard(filtered_firms, search_context.replace("_search", ""), page=1, lang=lang)
-    await bot.send_message(message.from_user.id, translate_text(f"Qidiruv natijalari (Sahifa {page}/{total_pages}):", lang), reply_markup=keyboard)
-    await state.finish()
\ No newline at end of file
+    keyboard, page, total_pages = create_paginated_keyboard(filtered_firms, callback_prefix, page=1, per_page=SEARCH_LIMIT, lang=lang)
+    await bot.send_message(message.from_user.id, get_text(lang, 'search_results_page', page=page, total_pages=total_pages), reply_markup=keyboard)
+    if search_context == 'manual_excel':
+        await ManualInput.stir.set()
+    else:
+        await state.finish()
\ No newline at end of file
@@ -0,0 +1,811 @@
+"""Firmauz_bot benchmarklari.
+
+Ishlatish:
+    python benchmark.py                  # barcha benchmarklar
+    python benchmark.py migrations       # faqat tanlangan benchmark
+    python benchmark.py --rows 500000    # sintetik ma'lumotlar hajmi
+    python benchmark.py search --firms 100000
+    python benchmark.py text --save-baseline   # joriy natijalarni bazaviy deb saqlash
+    python benchmark.py text --threshold 0.2   # bazaviydan 20% dan ko'p sekinlashsa xato bilan chiqadi
+"""
+import os
+import sys
+import json
+import time
+import random
+import re
+import sqlite3
+import argparse
+import tempfile
+import tracemalloc
+from contextlib import contextmanager
+
+BENCHMARKS = {}
+# record() orqali yozilgan o'lchovlar: nom -> {'throughput', 'relative', 'unit', 'peak_kb'}
+RESULTS = {}
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baselines.json")
+
+
+def benchmark(name):
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+@contextmanager
+def temp_data_dir():
+    """Vaqtinchalik katalogda ishlash: DATA_PATH nisbiy bo'lgani uchun bot.db shu yerda yaratiladi."""
+    import db_connection
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.makedirs("data", exist_ok=True)
+        try:
+            yield tmp
+        finally:
+            db_connection.close_all()
+            os.chdir(cwd)
+
+
+def _random_stirs(count, rng):
+    return [str(s) for s in rng.sample(range(100000000, 999999999), count)]
+
+
+def build_legacy_db(path, rows, duplicate_ratio=0.2, seed=42):
+    """Eski init_db sxemasidagi (indekssiz, takroriy qatorli) sintetik baza."""
+    rng = random.Random(seed)
+    oylar = ["yanvar", "fevral", "mart", "aprel", "may", "iyun", "iyul"]
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE users (user_id INTEGER PRIMARY KEY, language TEXT DEFAULT 'uz_latin');
+        CREATE TABLE firms (stir TEXT PRIMARY KEY, name TEXT, rahbar TEXT, soliq_turi TEXT,
+                            ds_stavka TEXT, ys_stavka TEXT, qqs_stavka TEXT);
+        CREATE TABLE reports (id INTEGER PRIMARY KEY AUTOINCREMENT, stir TEXT, oy TEXT, firma_name TEXT,
+                              xodimlar_soni INTEGER, xodimlar_data TEXT, hisobot_davri_oylik INTEGER,
+                              jami_oylik INTEGER, soliq INTEGER);
+        CREATE TABLE reports_yagona (id INTEGER PRIMARY KEY AUTOINCREMENT, stir TEXT, oy TEXT, firma_name TEXT,
+                                     rahbar TEXT, soliq_turi_yagona TEXT, yil_boshidan_aylanma INTEGER,
+                                     shu_oy_aylanma INTEGER, yagona_soliq INTEGER);
+        CREATE TABLE reports_qqs (id INTEGER PRIMARY KEY AUTOINCREMENT, stir TEXT, oy TEXT, firma_name TEXT,
+                                  rahbar TEXT, soliq_turi_qqs TEXT, yil_boshidan_qqs INTEGER,
+                                  shu_oy_qqs INTEGER, qqs_soliq INTEGER);
+        CREATE TABLE files (id INTEGER PRIMARY KEY AUTOINCREMENT, stir TEXT, soliq_turi TEXT, oy TEXT,
+                            file_type TEXT, file_path TEXT);
+    ''')
+    firm_count = max(1, rows // 20)
+    stirs = _random_stirs(firm_count, rng)
+    conn.executemany("INSERT INTO firms VALUES (?, ?, ?, ?, ?, ?, ?)",
+                     ((s, f"Firma {i} MChJ", f"Rahbar {i}", rng.choice(['ds-ys', 'ds-qqs']), '12%', '4%', '12%')
+                      for i, s in enumerate(stirs)))
+
+    def keys():
+        for _ in range(rows):
+            if rng.random() < duplicate_ratio:
+                yield rng.choice(stirs), "may"
+            else:
+                yield rng.choice(stirs), rng.choice(oylar)
+
+    conn.executemany("INSERT INTO files (stir, soliq_turi, oy, file_type, file_path) VALUES (?, ?, ?, ?, ?)",
+                     ((s, 'yagona', oy, rng.choice(['excel1_latin', 'excel1_cyrillic', 'excel2_latin', 'html']), f"data/{s}/yagona/{oy}.xlsx")
+                      for s, oy in keys()))
+    conn.executemany("INSERT INTO reports (stir, oy, firma_name, xodimlar_soni, xodimlar_data, hisobot_davri_oylik, jami_oylik, soliq) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                     ((s, oy, "Firma", 1, "1 (Rahbar) – Ali Valiyev, bu_oy_uchun_hisobotda: 1,000,000 so‘m (yil_boshidan_hisobotda: 5,000,000 so‘m)", 1000000, 5000000, 120000)
+                      for s, oy in keys()))
+    conn.executemany("INSERT INTO reports_yagona (stir, oy, firma_name, rahbar, soliq_turi_yagona, yil_boshidan_aylanma, shu_oy_aylanma, yagona_soliq) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                     ((s, oy, "Firma", "Rahbar", "4%", 10000000, 5000000, 200000) for s, oy in keys()))
+    conn.executemany("INSERT INTO reports_qqs (stir, oy, firma_name, rahbar, soliq_turi_qqs, yil_boshidan_qqs, shu_oy_qqs, qqs_soliq) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                     ((s, oy, "Firma", "Rahbar", "12%", 20000000, 10000000, 1200000) for s, oy in keys()))
+    conn.commit()
+    conn.close()
+    return stirs
+
+
+@benchmark("migrations")
+def bench_migrations(args):
+    with temp_data_dir():
+        started = time.perf_counter()
+        build_legacy_db(os.path.join("data", "bot.db"), args.rows)
+        build_time = time.perf_counter() - started
+
+        import migrations
+        pending = migrations.plan()
+        started = time.perf_counter()
+        applied = migrations.run_migrations()
+        total = time.perf_counter() - started
+
+    print(f"  sintetik baza: {args.rows} qator/jadval, yaratish {build_time:.2f} s")
+    print(f"  navbatdagi migratsiyalar: {len(pending)}")
+    for v, name, duration_ms in applied:
+        print(f"    {v}: {name} — {duration_ms} ms")
+    print(f"  jami: {total:.2f} s")
+
+
+FIRM_WORDS = ["Oʻzbekiston", "Temir", "Savdo", "Qurilish", "Agro", "Invest", "Servis", "Textile", "Humo", "Shifo",
+              "Тошкент", "Самарқанд", "Ҳамкор", "Олтин", "Барака", "Нур", "Файз", "Зарафшон"]
+FIRM_FORMS = ["MChJ", "XK", "AJ", "МЧЖ", "ХК"]
+
+
+def synthetic_firms(count, seed=42):
+    """bulk_upsert_firms formatidagi sintetik firmalar (nomlar lotin va kirillda aralash)."""
+    rng = random.Random(seed)
+    return [{
+        'stir': stir,
+        'firma_nomi': f"{' '.join(rng.sample(FIRM_WORDS, 2))} {i} {rng.choice(FIRM_FORMS)}",
+        'rahbar': f"Rahbar {i}",
+        'soliq_turi': rng.choice(['ds-ys', 'ds-qqs']),
+        'ds_stavka': '12%', 'ys_stavka': '4%', 'qqs_stavka': '12%',
+    } for i, stir in enumerate(_random_stirs(count, rng))]
+
+
+def _timeit(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def _best_times(funcs, repeat):
+    """Funksiyalar navbatma-navbat ishlatiladi, shunda yuklamaning o'zgarishi hammasiga bir xil tushadi."""
+    best = [float('inf')] * len(funcs)
+    for _ in range(repeat):
+        for i, func in enumerate(funcs):
+            started = time.perf_counter()
+            func()
+            best[i] = min(best[i], time.perf_counter() - started)
+    return best
+
+
+CALIBRATION_TEXT = "Firma hisoboti 2024 yil uchun tayyorlandi. " * 2000
+CALIBRATION_RE = re.compile(r"\w+")
+
+
+def _calibration():
+    """Mashina tezligi o'lchovi: regex + Python callback ish yuki, o'girgichlarga o'xshash."""
+    return CALIBRATION_RE.sub(lambda m: m.group().upper(), CALIBRATION_TEXT)
+
+
+def record(name, func, size, unit, repeat=15):
+    """func ni repeat marta ishlatib eng yaxshi vaqtni oladi; bitta ishga tushirishdagi xotira cho'qqisi tracemalloc bilan.
+
+    size — bitta ishga tushirishda qayta ishlangan birliklar (belgi yoki chaqiruv) soni.
+    relative — kalibrlash ish yukiga nisbatan tezlik: umumiy yuklama (CPU chastotasi, qo'shni jarayonlar)
+    ikkala o'lchovga bir xil ta'sir qiladi, shuning uchun bazaviy bilan solishtirish shu qiymat bo'yicha.
+    """
+    func()  # qizdirish: keshlar va lazy kompilyatsiya o'lchovga kirmasin
+    calibration, best = _best_times([_calibration, func], repeat)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    RESULTS[name] = {
+        'throughput': round(size / best),
+        'relative': round(calibration / best * size, 1),
+        'unit': unit,
+        'peak_kb': round(peak / 1024, 1),
+    }
+    print(f"  {name}: {best * 1000:.2f} ms, {size / best:,.0f} {unit}/s, xotira cho'qqisi {peak / 1024:,.1f} KiB")
+
+
+def compare_with_baseline(path, threshold):
+    """RESULTS ni bazaviy natijalar bilan solishtiradi; sekinlashgan o'lchovlar ro'yxatini qaytaradi."""
+    if not os.path.exists(path):
+        print(f"  bazaviy natijalar topilmadi: {path} (--save-baseline bilan yarating)")
+        return []
+    with open(path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = []
+    for name, current in RESULTS.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        ratio = current['relative'] / base['relative']
+        mark = "SEKINLASHDI" if ratio < 1 - threshold else "ok"
+        print(f"  {name}: {ratio:.0%} (bazaviy {base['throughput']:,} {base['unit']}/s) {mark}")
+        if ratio < 1 - threshold:
+            regressions.append(name)
+    return regressions
+
+
+def save_baseline(path):
+    baseline = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            baseline = json.load(f)
+    baseline.update(RESULTS)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"  {len(RESULTS)} ta o'lchov saqlandi: {path}")
+
+
+@benchmark("search")
+def bench_search(args):
+    queries = ["savdo", "самарқанд", "humo 12", "nur", "3"]
+    with temp_data_dir():
+        import migrations
+        import database
+        migrations.run_migrations()
+        started = time.perf_counter()
+        database.bulk_upsert_firms(synthetic_firms(args.firms))
+        print(f"  {args.firms} ta firma yozildi (FTS triggerlari bilan): {time.perf_counter() - started:.2f} s")
+
+        def linear(query):
+            # Eski process_search: barcha firmalarni o'qib, Python'da substring qidirish
+            q = query.lower()
+            return [(stir, name) for stir, name in database.get_all_firms() if q in stir.lower() or q in name.lower()]
+
+        for query in queries:
+            linear_ms, linear_result = _timeit(lambda: linear(query), 5)
+            fts_ms, fts_result = _timeit(lambda: database.search_firms(query), 20)
+            print(f"  {query!r}: chiziqli {linear_ms:.2f} ms ({len(linear_result)} ta), FTS5 {fts_ms:.2f} ms (top {len(fts_result)})")
+
+
+@benchmark("fuzzy")
+def bench_fuzzy(args):
+    queries = ["samarkand savdo", "ozbekiston", "hamkr", "тошкен агро", "zarafshan"]
+    with temp_data_dir():
+        import migrations
+        import database
+        from trigram_index import trigrams
+        migrations.run_migrations()
+        database.bulk_upsert_firms(synthetic_firms(args.firms))
+        firms = database.get_all_firms()
+
+        started = time.perf_counter()
+        database.firm_trigrams.build()
+        print(f"  trigram indeksi: {len(database.firm_trigrams)} ta firma, qurish {time.perf_counter() - started:.2f} s")
+
+        def substring_scan(query):
+            # Hozirgi process_search: qisman moslik
+            q = query.lower()
+            return [(stir, name) for stir, name in firms if q in stir.lower() or q in name.lower()]
+
+        grams = {stir: trigrams(name) for stir, name in firms}
+
+        def trigram_scan(query):
+            # Indekssiz: har bir firma bilan o'xshashlikni hisoblash
+            q = trigrams(query)
+            scored = sorted(((len(q & g) / len(q), stir) for stir, g in grams.items()), reverse=True)
+            return [stir for score, stir in scored[:10] if score >= 0.3]
+
+        for query in queries:
+            sub_ms, sub_result = _timeit(lambda: substring_scan(query), 3)
+            scan_ms, scan_result = _timeit(lambda: trigram_scan(query), 1)
+            index_ms, index_result = _timeit(lambda: database.firm_trigrams.search(query), 5)
+            print(f"  {query!r}: substring {sub_ms:.1f} ms ({len(sub_result)} ta), "
+                  f"chiziqli trigram {scan_ms:.1f} ms, trigram indeksi {index_ms:.1f} ms "
+                  f"(top: {index_result[0][1] if index_result else '-'})")
+
+
+# converters.py ning avvalgi (kompilyatsiyasiz) versiyasi — natijalarni solishtirish uchun namuna
+def legacy_convert_to_cyrillic(text):
+    text = text.replace("'", 'ʻ').replace('‘', 'ʻ').replace('’', 'ʻ')
+
+    translit_map = {
+        # 'shch': 'щ',  # Olib tashlandi, chunki bu O‘zbek tilida kerak emas
+        'ch': 'ч', 'sh': 'ш', 'yo': 'ё', 'yu': 'ю', 'ya': 'я',
+        'oʻ': 'ў', 'gʻ': 'ғ', 'ʻ': 'ъ', 'a': 'а', 'b': 'б', 'v': 'в',
+        'g': 'г', 'd': 'д', 'e': 'е', 'z': 'з', 'i': 'и', 'y': 'й',
+        'k': 'к', 'l': 'л', 'm': 'м', 'n': 'н', 'o': 'о', 'p': 'п',
+        'r': 'р', 's': 'с', 't': 'т', 'u': 'у', 'f': 'ф', 'x': 'ҳ',
+        'ts': 'ц', 'q': 'қ', 'h': 'ҳ', 'j': 'ж'
+    }
+
+    sorted_keys = sorted(translit_map.keys(), key=lambda x: (-len(x), x))
+    result = []
+    i = 0
+
+    while i < len(text):
+        matched = False
+        for key in sorted_keys:
+            end = i + len(key)
+            if end > len(text):
+                continue
+            substring = text[i:end].lower()
+            if substring == key.lower():
+                base = translit_map[key]
+                original = text[i:end]
+                if original.isupper():
+                    converted = base.upper()
+                elif original.istitle():
+                    converted = base.capitalize()
+                else:
+                    converted = base.lower()
+                result.append(converted)
+                i = end
+                matched = True
+                break
+        if not matched:
+            result.append(text[i])
+            i += 1
+
+    return ''.join(result)
+
+
+def legacy_convert_to_latin(text):
+    translit_map = {
+        'Щ': 'Shch', 'щ': 'shch',
+        'Шаҳ': 'Shah', 'шаҳ': 'shah',  # Maxsus qayta ishlash
+        'Ш': 'Sh', 'ш': 'sh',
+        'Ч': 'Ch', 'ч': 'ch',
+        'Ў': 'Oʻ', 'ў': 'oʻ',
+        'Ғ': 'Gʻ', 'ғ': 'gʻ',
+        'Ҳ': 'X', 'ҳ': 'x',
+        'Қ': 'Q', 'қ': 'q',
+        'Ё': 'Yo', 'ё': 'yo',
+        'Ю': 'Yu', 'ю': 'yu',
+        'Я': 'Ya', 'я': 'ya',
+        'ъ': "'", 'ь': '',
+        'А': 'A', 'а': 'a',
+        'Б': 'B', 'б': 'b',
+        'В': 'V', 'в': 'v',
+        'Г': 'G', 'г': 'g',
+        'Д': 'D', 'д': 'd',
+        'Е': 'E', 'е': 'e',
+        'Ж': 'J', 'ж': 'j',
+        'З': 'Z', 'з': 'z',
+        'И': 'I', 'и': 'i',
+        'Й': 'Y', 'й': 'y',
+        'К': 'K', 'к': 'k',
+        'Л': 'L', 'л': 'l',
+        'М': 'M', 'м': 'm',
+        'Н': 'N', 'н': 'n',
+        'О': 'O', 'о': 'o',
+        'П': 'P', 'п': 'p',
+        'Р': 'R', 'р': 'r',
+        'С': 'S', 'с': 's',
+        'Т': 'T', 'т': 't',
+        'У': 'U', 'у': 'u',
+        'Ф': 'F', 'ф': 'f',
+        'Х': 'X', 'х': 'x',
+        'Ц': 'Ts', 'ц': 'ts',
+        'Ы': 'Y', 'ы': 'y',
+        'Э': 'E', 'э': 'e',
+    }
+
+    sorted_keys = sorted(translit_map.keys(), key=lambda x: (-len(x), x))
+    result = []
+    i = 0
+
+    while i < len(text):
+        matched = False
+        for key in sorted_keys:
+            end = i + len(key)
+            if end > len(text):
+                continue
+            substring = text[i:end]
+            if substring == key:
+                base = translit_map[key]
+                result.append(base)
+                i = end
+                matched = True
+                break
+        if not matched:
+            result.append(text[i])
+            i += 1
+
+    return ''.join(result)
+
+
+def translit_corpus(size=20000, seed=42):
+    """Ekvivalentlik korpusi: UI matnlari, chegaraviy holatlar va tasodifiy aralash satrlar."""
+    from lang import LANGUAGES
+    rng = random.Random(seed)
+    corpus = [text for texts in LANGUAGES.values() for text in texts.values()]
+    corpus += [
+        "", "'", "ʻ", "O'zbekiston", "Oʻzbekiston", "O‘ZBEKISTON", "o’g‘il", "SHAHAR", "Shahar", "sHahar",
+        "Шаҳар", "шаҳар", "ШАҲАР", "Шаҳ", "Ш", "щ", "Ц", "ЦЕХ", "Ёмғир", "ЮКСАК", "ъ ь",
+        "TSEX", "Tsex", "tS", "YO", "Yo", "yO", "CH", "Ch", "cH", "K\u212a", "\u0130stanbul", "ſh",
+        "Ответ 123 — ok!", "Tasdiqlash ✅", "Keyingi ➡️", "⬅️ Oldingi",
+        "sex sexr Sexlar SENTRIFUGA sirka sirk", "Сентябрь, сентябрда; ОБЪЕКТИВ поезд-поездлар",
+    ]
+    pool = ("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'‘’ʻ "
+            "абвгдеёжзийклмнопрстуфхцчшщъыьэюяўқғҳАБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯЎҚҒҲ"
+            "0123456789.,-\u212a\u0130ſ")
+    for _ in range(size):
+        corpus.append("".join(rng.choice(pool) for _ in range(rng.randint(1, 40))))
+    return corpus
+
+
+# Istisnolar ro'yxatidagi so'zlarga o'xshash, lekin ro'yxatda yo'q oddiy so'zlar: asosiy qoidalar bilan o'giriladi
+ORDINARY_WORDS = [
+    "sirka", "Sirka", "SIRKA", "sirkasi", "sexr", "Sexr", "sexrgar", "sexrli", "sexi-", "sexa", "sentyabr",
+    "Sentyabrda", "semiz", "sitora", "yer", "Yetti", "yevropa", "ye", "obyek", "poyez",
+    "сирка", "сеҳр", "ер", "Етти", "Европа", "цех", "Цирк", "ЦЕМЕНТ", "центр", "цитата", "Сентябрьда",
+    "сентябрлар", "октябрьский", "объ", "поез", "съе",
+]
+
+
+def _exception_words(text, transliterator):
+    """Matndagi istisnoga tushadigan so'zlar: butun so'z yoki o'zak bilan boshlanadigan so'z (regexdan mustaqil)."""
+    if transliterator.prepare:
+        text = transliterator.prepare(text)
+    return [word for word in re.findall(r'\w+', text)
+            if word.lower() in transliterator.words
+            or any(word.lower().startswith(stem) for stem in transliterator.stems)]
+
+
+@benchmark("translit")
+def bench_translit(args):
+    from converters import BASE_TRANSLITERATORS, TRANSLITERATORS, _build_transliterators
+    from converters import transliterate_many, transliterate_stream
+    corpus = translit_corpus()
+    # Eski algoritm bilan faqat asosiy qoidalar solishtiriladi (istisnolar natijani ataylab o'zgartiradi)
+    pairs = [
+        ("convert_to_cyrillic", BASE_TRANSLITERATORS['uz_cyrillic'].convert, legacy_convert_to_cyrillic),
+        ("convert_to_latin", BASE_TRANSLITERATORS['uz_latin'].convert, legacy_convert_to_latin),
+    ]
+    mismatches = [(name, text) for name, new, old in pairs for text in corpus if new(text) != old(text)]
+    print(f"  ekvivalentlik: {len(corpus)} ta satr x 2 yo'nalish, farqlar: {len(mismatches)}")
+
+    # Istisnolar yuklangan holda ham ro'yxatga tushmagan so'zlar eski algoritm bilan bir xil o'girilishi kerak
+    legacy = {'uz_cyrillic': legacy_convert_to_cyrillic, 'uz_latin': legacy_convert_to_latin}
+    checked = 0
+    for target, transliterator in TRANSLITERATORS.items():
+        for text in ORDINARY_WORDS + corpus:
+            if _exception_words(text, transliterator):
+                continue
+            checked += 1
+            if transliterator.convert(text) != legacy[target](text):
+                mismatches.append((f"istisnolar bilan [{target}]", text))
+    print(f"  istisnolar bilan ekvivalentlik: {checked} ta satr (istisno so'zlarisiz), farqlar: {len(mismatches)}")
+
+    # Batch va oqimli rejim (istisnolar bilan) bitta-bitta o'girish bilan bir xil natija berishi kerak
+    document = "\n".join(corpus)
+    for target, transliterator in TRANSLITERATORS.items():
+        if transliterate_many(corpus, target) != [transliterator.convert(text) for text in corpus]:
+            mismatches.append((f"transliterate_many[{target}]", None))
+        expected = transliterator.convert(document)
+        for size in (1, 2, 3, 7, 64, 4096):
+            chunks = (document[i:i + size] for i in range(0, len(document), size))
+            if "".join(transliterate_stream(chunks, target)) != expected:
+                mismatches.append((f"transliterate_stream[{target}, {size}]", None))
+    print(f"  batch/oqim tekshiruvi: farqlar: {len(mismatches)}")
+
+    sample = corpus[:2000]
+    chars = sum(len(text) for text in sample)
+    for name, new, old in pairs:
+        old_ms, _ = _timeit(lambda: [old(text) for text in sample], 1)
+        new_ms, _ = _timeit(lambda: [new(text) for text in sample], 5)
+        print(f"  {name}: eski {old_ms:.1f} ms, yangi {new_ms:.1f} ms "
+              f"({old_ms / new_ms:.1f}x, {chars / new_ms * 1000:,.0f} belgi/s)")
+    stream_ms, _ = _timeit(lambda: "".join(transliterate_stream(
+        (document[i:i + 65536] for i in range(0, len(document), 65536)), 'uz_cyrillic')), 3)
+    print(f"  transliterate_stream: {len(document):,} belgi, {stream_ms:.1f} ms "
+          f"({len(document) / stream_ms * 1000:,.0f} belgi/s)")
+
+    # Istisnolar soni oshganda tezlik deyarli o'zgarmasligi kerak (prefiks daraxti)
+    rng = random.Random(7)
+    letters = "абвгдеёжзийклмнопрстуфхцчшўқғҳ"
+    cyrillic_sample = [BASE_TRANSLITERATORS['uz_cyrillic'].convert(text) for text in sample]
+    cyrillic_chars = sum(len(text) for text in cyrillic_sample)
+    for count in (0, 100, 1000, 10000):
+        exceptions = {"".join(rng.choice(letters) for _ in range(rng.randint(3, 10))): "x" for _ in range(count)}
+        build_ms, transliterators = _timeit(lambda: _build_transliterators(exceptions), 1)
+        convert = transliterators['uz_latin'].convert
+        ms, _ = _timeit(lambda: [convert(text) for text in cyrillic_sample], 5)
+        print(f"  {count:>5} ta istisno: qurish {build_ms:.0f} ms, o'girish {ms:.1f} ms "
+              f"({cyrillic_chars / ms * 1000:,.0f} belgi/s)")
+
+    if mismatches:
+        for name, text in mismatches[:10]:
+            print(f"    {name}: {text!r}")
+        raise SystemExit(1)
+
+
+@benchmark("translate_cache")
+def bench_translate_cache(args):
+    import lang
+    # Bir xabarni chizishda ishlatiladigan odatiy tugma va sarlavhalar
+    labels = ["Tasdiqlash", "Tahrirlash", "Bekor qilish", "⬅️ Oldingi", "Keyingi ➡️", "🔍 Qidirish", "🔙 Orqaga",
+              "Admin paneliga qaytish", "Firmalar ro'yxati", "Sahifa"] * 10
+    uncached_ms, _ = _timeit(lambda: [lang._translate(text, 'uz_cyrillic') for text in labels], 200)
+    lang.translate_cache.clear()
+    cached_ms, _ = _timeit(lambda: [lang.translate_text(text, 'uz_cyrillic') for text in labels], 200)
+    print(f"  {len(labels)} ta matn: keshsiz {uncached_ms * 1000:.0f} µs, kesh bilan {cached_ms * 1000:.0f} µs")
+    print(f"  {lang.translate_cache.stats()}")
+
+
+def text_corpora(seed=42):
+    """Har bir xabarda ishlaydigan kod uchun realistik korpuslar (lotin shaklida)."""
+    from lang import LANGUAGES, _template_fields
+    from converters import convert_to_latin
+    rng = random.Random(seed)
+    names = [convert_to_latin(firm['firma_nomi']) for firm in synthetic_firms(5000, seed)]
+    templates = [
+        text.format(**{field: rng.choice(names) for field in _template_fields(text)})
+        for text in LANGUAGES['uz_latin'].values()
+    ]
+    # Bir necha KB li matnlar: hisobotlar va firma ro'yxatlari aralashmasi
+    documents = []
+    for _ in range(50):
+        parts = []
+        while sum(map(len, parts)) < 8192:
+            parts.append(rng.choice(templates) if rng.random() < 0.5 else ", ".join(rng.sample(names, 5)))
+        documents.append("\n".join(parts))
+    return {'firm_names': names, 'templates': templates, 'documents': documents}
+
+
+@benchmark("text")
+def bench_text(args):
+    import lang
+    from converters import convert_to_cyrillic, convert_to_latin
+    corpora = text_corpora()
+    for corpus_name, latin in corpora.items():
+        cyrillic = [convert_to_cyrillic(text) for text in latin]
+        chars = sum(map(len, latin))
+        record(f"convert_to_cyrillic:{corpus_name}", lambda: [convert_to_cyrillic(t) for t in latin], chars, "belgi")
+        record(f"convert_to_latin:{corpus_name}", lambda: [convert_to_latin(t) for t in cyrillic],
+               sum(map(len, cyrillic)), "belgi")
+
+    # TRANSLATE_CACHE_MAX_LEN dan uzun matnlar keshga yozilmaydi: hit/miss faqat qisqa matnlarda o'lchanadi,
+    # uzunlari alohida holat (har safar o'giriladi)
+    short = [t for t in corpora['templates'] if len(t) <= lang.TRANSLATE_CACHE_MAX_LEN]
+    long = [t for t in corpora['templates'] if len(t) > lang.TRANSLATE_CACHE_MAX_LEN]
+    chars = sum(map(len, short))
+
+    def translate_uncached():
+        lang.translate_cache.clear()
+        return [lang.translate_text(t, 'uz_cyrillic') for t in short]
+
+    record("translate_text:miss", translate_uncached, chars, "belgi")
+    translate_uncached()
+    hits = lang.translate_cache.hits
+    record("translate_text:hit", lambda: [lang.translate_text(t, 'uz_cyrillic') for t in short], chars, "belgi")
+    if lang.translate_cache.hits == hits:
+        raise SystemExit("translate_text:hit keshga tushmadi")
+    record("translate_text:long", lambda: [lang.translate_text(t, 'uz_cyrillic') for t in long],
+           sum(map(len, long)), "belgi")
+
+    calls = []
+    for key, text in lang.LANGUAGES['uz_latin'].items():
+        kwargs = {field: "123" for field in lang._template_fields(text)}
+        calls += [(code, key, kwargs) for code in lang.LANGUAGES]
+    calls += [(code, key, {}) for code in lang.LANGUAGES for key in lang.UI_TEXTS]
+    calls *= 20
+    record("get_text", lambda: [lang.get_text(code, key, **kwargs) for code, key, kwargs in calls], len(calls), "chaqiruv")
+
+    months = ['yanvar', 'fevral', 'mart', 'aprel', 'may', 'iyun', 'iyul', 'avgust', 'sentabr', 'oktabr', 'noyabr', 'dekabr']
+    month_calls = [(code, oy) for code in lang.LANGUAGES for oy in months] * 100
+    record("get_month_name", lambda: [lang.get_month_name(code, oy) for code, oy in month_calls],
+           len(month_calls), "chaqiruv")
+
+
+def write_yagona_workbook(path, rows, seed=42):
+    """parse_yagona_excel formatidagi sintetik ish kitobi (write_only rejimida yoziladi). STIRlar to'plamini qaytaradi."""
+    from openpyxl import Workbook
+    rng = random.Random(seed)
+    stirs = _random_stirs(max(1, rows // 7), rng)
+    oylar = ["yanvar", "fevral", "mart", "aprel", "may", "iyun", "iyul"]
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Лист1")
+    sheet.append(["STIR", "Oy", "Firma nomi", "Raxbar", "Soliq turi yagona", "Yil boshidan aylanma", "Shu oy uchun aylanma"])
+    for i in range(rows):
+        sheet.append([stirs[i % len(stirs)], oylar[i % 7], f"Firma {i} MChJ", f"Rahbar {i}", "4%",
+                      rng.randint(10 ** 6, 10 ** 9), rng.randint(10 ** 5, 10 ** 8)])
+    workbook.save(path)
+    return set(stirs)
+
+
+def legacy_full_read(path):
+    """Eski usul: to'liq rejimda yuklash (barcha kataklar obyekt sifatida xotirada)."""
+    from openpyxl import load_workbook
+    workbook = load_workbook(path)
+    return sum(1 for row in workbook['Лист1'].iter_rows(min_row=2, values_only=True) if any(row))
+
+
+def _traced(func):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+@benchmark("excel")
+def bench_excel(args):
+    from excel_reader import iter_excel_rows
+    from report_parser import parse_yagona_excel
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in (10000, 100000):
+            path = os.path.join(tmp, f"yagona_{rows}.xlsx")
+            stirs = write_yagona_workbook(path, rows)
+            size_mb = os.path.getsize(path) / 1024 / 1024
+            print(f"  {rows} qator ({size_mb:.1f} MB):")
+            cases = [
+                ("to'liq load_workbook", lambda: legacy_full_read(path)),
+                ("iter_excel_rows", lambda: sum(1 for _ in iter_excel_rows(path, 'Лист1', width=7, max_rows=None))),
+                ("parse_yagona_excel", lambda: len(parse_yagona_excel(path, 'uz_cyrillic', known_stirs=stirs)[0] or ())),
+            ]
+            for name, func in cases:
+                started = time.perf_counter()
+                count = func()
+                elapsed = time.perf_counter() - started
+                # Xotira alohida o'lchanadi: tracemalloc vaqtni bir necha barobar sekinlashtiradi
+                _, peak, _ = _traced(func)
+                print(f"    {name}: {elapsed:.2f} s ({rows / elapsed:,.0f} qator/s), "
+                      f"xotira cho'qqisi {peak / 1024 / 1024:,.1f} MB, natija {count}")
+
+
+def write_yagona_csv(path, rows, encoding='utf-8', delimiter=',', cyrillic=False, seed=42):
+    """write_yagona_workbook bilan bir xil ma'lumotlar CSV/TSV ko'rinishida; cyrillic=True — oy va nomlar kirillda (cp1251 uchun)."""
+    import csv
+    rng = random.Random(seed)
+    stirs = _random_stirs(max(1, rows // 7), rng)
+    if cyrillic:
+        oylar = ["Январ", "Феврал", "Март", "Апрел", "Май", "Июн", "Июл"]
+        firma, rahbar = "Фирма {} МЧЖ", "Рахбар {}"
+    else:
+        oylar = ["yanvar", "fevral", "mart", "aprel", "may", "iyun", "iyul"]
+        firma, rahbar = "Firma {} MChJ", "Rahbar {}"
+    with open(path, 'w', encoding=encoding, newline='') as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(["STIR", "Oy", "Firma nomi", "Raxbar", "Soliq turi yagona", "Yil boshidan aylanma", "Shu oy uchun aylanma"])
+        for i in range(rows):
+            writer.writerow([stirs[i % len(stirs)], oylar[i % 7], firma.format(i), rahbar.format(i), "4%",
+                             rng.randint(10 ** 6, 10 ** 9), rng.randint(10 ** 5, 10 ** 8)])
+    return set(stirs)
+
+
+@benchmark("csv")
+def bench_csv(args):
+    from excel_reader import iter_excel_rows, iter_csv_rows
+    from report_parser import parse_yagona_excel
+    rows = 100000
+    with tempfile.TemporaryDirectory() as tmp:
+        xlsx_path = os.path.join(tmp, "yagona.xlsx")
+        stirs = write_yagona_workbook(xlsx_path, rows)
+        files = [(".xlsx", xlsx_path)]
+        for name, encoding, delimiter, cyrillic in (("utf-8 .csv", 'utf-8', ',', False),
+                                                    ("cp1251 .csv (;)", 'cp1251', ';', True),
+                                                    ("utf-8 .tsv", 'utf-8', '\t', False)):
+            path = os.path.join(tmp, f"yagona_{encoding}{'.tsv' if delimiter == chr(9) else '.csv'}")
+            write_yagona_csv(path, rows, encoding, delimiter, cyrillic)
+            files.append((name, path))
+
+        print(f"  {rows} qator:")
+        base = {}
+        for name, path in files:
+            if path.endswith('.xlsx'):
+                read = lambda: sum(1 for _ in iter_excel_rows(path, 'Лист1', width=7, max_rows=None))
+            else:
+                read = lambda: sum(1 for _ in iter_csv_rows(path, width=7, max_rows=None))
+            parse = lambda: len(parse_yagona_excel(path, 'uz_latin', known_stirs=stirs)[0] or ())
+            size_mb = os.path.getsize(path) / 1024 / 1024
+            for stage, func in (("o'qish", read), ("parse_yagona_excel", parse)):
+                started = time.perf_counter()
+                count = func()
+                elapsed = time.perf_counter() - started
+                base.setdefault(stage, elapsed)
+                print(f"    {name} ({size_mb:.1f} MB) {stage}: {elapsed:.2f} s ({rows / elapsed:,.0f} qator/s, "
+                      f".xlsx dan {base[stage] / elapsed:.1f}x), natija {count}")
+
+
+@benchmark("workbook_cache")
+def bench_workbook_cache(args):
+    from report_parser import parse_report_cached, invalidate_workbook, workbook_cache, YAGONA_SCHEMA
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "May1.xlsx")
+        write_yagona_workbook(path, 1000)
+        cold_ms, (firms, _) = _timeit(lambda: (invalidate_workbook(path), parse_report_cached(YAGONA_SCHEMA, path))[1], 3)
+        warm_ms, _ = _timeit(lambda: parse_report_cached(YAGONA_SCHEMA, path), 1000)
+        print(f"  1000 qatorli fayl: birinchi o'qish {cold_ms:.1f} ms, keshdan {warm_ms * 1000:.1f} µs ({len(firms)} ta yozuv)")
+        print(f"  {workbook_cache.stats()}")
+
+
+@benchmark("report_summary")
+def bench_report_summary(args):
+    from report_parser import parse_yagona_excel, parse_report, YAGONA_SCHEMA
+    with temp_data_dir() as tmp:
+        import migrations
+        import database
+        migrations.run_migrations()
+        path = os.path.join(tmp, "yagona.xlsx")
+        stirs = write_yagona_workbook(path, 10000)
+        firms, _ = parse_yagona_excel(path, 'uz_latin', known_stirs=stirs)
+        for attempt in ("yangi", "qayta (upsert)"):
+            started = time.perf_counter()
+            saved = database.bulk_upsert_reports('yagona', firms)
+            print(f"  {attempt} yuklash: {saved} qator bitta tranzaksiyada, {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        stir, oy = next(iter(firms))
+        excel_ms, _ = _timeit(lambda: parse_report(YAGONA_SCHEMA, path, check_stirs=False)[0][(stir, oy)], 3)
+        sql_ms, figures = _timeit(lambda: database.get_report_figures('yagona', stir, oy), 1000)
+        print(f"  bitta xulosa: Excel'dan {excel_ms:.1f} ms, bazadan {sql_ms * 1000:.1f} µs ({excel_ms / sql_ms:,.0f}x)")
+        assert figures['yagona_soliq'] == database.tax_amount(figures['shu_oy_aylanma'], figures['soliq_turi_yagona'])
+
+
+async def _loop_lag(job):
+    """job() davomida event loop holati: eng katta kechikish (ms) va boshqa foydalanuvchilar xabarlariga
+    o'xshash mayda ishlar soni (sekundiga). Natija: (vaqt, kechikish, ishlar/s)."""
+    import asyncio
+    from converters import convert_to_cyrillic
+    lags = []
+    handled = [0]
+
+    async def ticker():
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - started - 0.001)
+            convert_to_cyrillic("Salom, hisobotingiz tayyor. Yagona soliq bo'yicha ma'lumotlar")
+            handled[0] += 1
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.05)
+    handled[0] = 0
+    lags.clear()
+    started = time.perf_counter()
+    await job()
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(0.01)
+    task.cancel()
+    return elapsed, max(lags, default=0) * 1000, handled[0] / elapsed
+
+
+@benchmark("workers")
+def bench_workers(args):
+    import asyncio
+    import db
+    from workers import WorkerPool
+    from report_parser import parse_yagona_excel
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "yagona.xlsx")
+        stirs = write_yagona_workbook(path, 20000)
+        pool = WorkerPool("benchmark", max_workers=2)
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            cases = [
+                ("event loop ichida", lambda: asyncio.sleep(0, parse_yagona_excel(path, 'uz_cyrillic', known_stirs=stirs))),
+                ("oqimda (run_in_executor)", lambda: loop.run_in_executor(db._read_executor, lambda: parse_yagona_excel(path, 'uz_cyrillic', known_stirs=stirs))),
+                ("worker jarayonida", lambda: pool.submit(parse_yagona_excel, path, 'uz_cyrillic', known_stirs=stirs)),
+            ]
+            # Birinchi chaqiruv jarayonlarni ishga tushiradi, o'lchovga kirmaydi
+            await pool.submit(len, ())
+            for name, job in cases:
+                elapsed, lag_ms, rate = await _loop_lag(job)
+                print(f"  {name}: {elapsed:.2f} s, event loop eng katta kechikishi {lag_ms:.0f} ms, "
+                      f"parallel mayda ishlar {rate:,.0f}/s")
+
+        try:
+            asyncio.run(run())
+        finally:
+            pool.shutdown()
+        print(f"  {pool.stats()}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Firmauz_bot benchmarklari")
+    parser.add_argument("names", nargs="*", help=f"benchmarklar: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--rows", type=int, default=100000, help="sintetik ma'lumotlar hajmi")
+    parser.add_argument("--firms", type=int, default=100000, help="sintetik firmalar soni")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="bazaviy natijalar fayli (JSON)")
+    parser.add_argument("--save-baseline", action="store_true", help="joriy natijalarni bazaviy deb saqlash")
+    parser.add_argument("--threshold", type=float, default=0.3,
+                        help="ruxsat etilgan sekinlashish ulushi (0.3 = 30%%)")
+    args = parser.parse_args(argv)
+
+    names = args.names or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        parser.error(f"noma'lum benchmark: {', '.join(unknown)}")
+    for name in names:
+        print(f"[{name}]")
+        BENCHMARKS[name](args)
+
+    if not RESULTS:
+        return
+    print("[baseline]")
+    if args.save_baseline:
+        save_baseline(args.baseline)
+    elif compare_with_baseline(args.baseline, args.threshold):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
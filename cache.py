@@ -0,0 +1,112 @@
+import time
+import threading
+from collections import OrderedDict
+
+# Kesh ichida qiymat yo'qligini bildiradi (None ham to'g'ri qiymat bo'lishi mumkin)
+MISSING = object()
+
+# Nom bo'yicha barcha keshlar (statistika uchun)
+CACHES = {}
+
+
+class LRUCache:
+    """Hajmi cheklangan, ixtiyoriy TTL li LRU kesh. Bir nechta oqimdan xavfsiz foydalanish mumkin.
+
+    weigh berilsa, har bir qiymatning "og'irligi" (masalan, qatorlar soni) hisoblanadi va jami maxweight dan
+    oshmasligi uchun eng eski yozuvlar chiqariladi; maxweight dan og'ir qiymat keshga yozilmaydi.
+    """
+
+    def __init__(self, name, maxsize=1024, ttl=None, maxweight=None, weigh=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxweight = maxweight
+        self.weigh = weigh
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        # invalidate/clear da oshadi: eski o'qish natijasi keshga qaytib yozilmasligi uchun
+        self.version = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        CACHES[name] = self
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            item = self._data.get(key, MISSING)
+            if item is not MISSING:
+                value, expires, _ = item
+                if expires is None or expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._pop(key)
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        with self._lock:
+            self._store(key, value)
+
+    def setdefault(self, key, value, version=None):
+        """Kalit keshda bo'lmasa yozadi. O'qish natijasi parallel yozuvni bosib ketmasligi uchun.
+
+        version berilsa va o'qish davomida kesh tozalangan bo'lsa, qiymat keshga yozilmaydi.
+        """
+        with self._lock:
+            if version is not None and version != self.version:
+                return value
+            item = self._data.get(key, MISSING)
+            if item is not MISSING and (item[1] is None or item[1] > time.monotonic()):
+                return item[0]
+            self._store(key, value)
+            return value
+
+    def _store(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        weight = self.weigh(value) if self.weigh else 0
+        self._pop(key)
+        if self.maxweight is not None and weight > self.maxweight:
+            return
+        self._data[key] = (value, expires, weight)
+        self.weight += weight
+        while len(self._data) > self.maxsize or (self.maxweight is not None and self.weight > self.maxweight):
+            _, (_, _, evicted) = self._data.popitem(last=False)
+            self.weight -= evicted
+
+    def _pop(self, key):
+        item = self._data.pop(key, None)
+        if item is not None:
+            self.weight -= item[2]
+
+    def invalidate(self, *keys):
+        with self._lock:
+            self.version += 1
+            for key in keys:
+                self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self._data.clear()
+            self.weight = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'name': self.name,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'weight': self.weight,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+def all_stats():
+    return [cache.stats() for cache in CACHES.values()]
@@ -5,4 +5,18 @@ load_dotenv()
 
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 ADMIN_IDS = [123456789]  # Admin Telegram IDlarini kiriting
-DATA_PATH = "data"
\ No newline at end of file
+DATA_PATH = "data"
+DB_READ_WORKERS = int(os.getenv("DB_READ_WORKERS", 4))
+LANG_CACHE_SIZE = int(os.getenv("LANG_CACHE_SIZE", 10000))
+LANG_CACHE_TTL = int(os.getenv("LANG_CACHE_TTL", 3600))  # soniya
+FIRM_CACHE_SIZE = int(os.getenv("FIRM_CACHE_SIZE", 5000))
+TRANSLATE_CACHE_SIZE = int(os.getenv("TRANSLATE_CACHE_SIZE", 4096))
+TRANSLIT_EXCEPTIONS_FILE = os.getenv("TRANSLIT_EXCEPTIONS_FILE", "translit_exceptions.txt")
+EXCEL_MAX_ROWS = int(os.getenv("EXCEL_MAX_ROWS", 200000))
+EXCEL_MAX_FILE_SIZE = int(os.getenv("EXCEL_MAX_FILE_SIZE", 20 * 1024 * 1024))  # bayt, Telegram bot fayl cheklovi
+WORKBOOK_CACHE_SIZE = int(os.getenv("WORKBOOK_CACHE_SIZE", 256))
+WORKBOOK_CACHE_MAX_ROWS = int(os.getenv("WORKBOOK_CACHE_MAX_ROWS", 200000))  # keshdagi jami qatorlar (xotira cheklovi)
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", 2))  # Excel o'qish/yozish jarayonlari
+WORKER_TIMEOUT = int(os.getenv("WORKER_TIMEOUT", 120))  # soniya
+WORKER_MAX_QUEUE = int(os.getenv("WORKER_MAX_QUEUE", 16))  # band jarayonlardan tashqari navbatdagi ishlar
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", 200))  # ommaviy yuklash: bitta worker ishi va tranzaksiyadagi firma-oylar
@@ -1,108 +1,356 @@
-def convert_to_cyrillic(text):
-    text = text.replace("'", 'ʻ').replace('‘', 'ʻ').replace('’', 'ʻ')
-
-    translit_map = {
-        # 'shch': 'щ',  # Olib tashlandi, chunki bu O‘zbek tilida kerak emas
-        'ch': 'ч', 'sh': 'ш', 'yo': 'ё', 'yu': 'ю', 'ya': 'я',
-        'oʻ': 'ў', 'gʻ': 'ғ', 'ʻ': 'ъ', 'a': 'а', 'b': 'б', 'v': 'в',
-        'g': 'г', 'd': 'д', 'e': 'е', 'z': 'з', 'i': 'и', 'y': 'й',
-        'k': 'к', 'l': 'л', 'm': 'м', 'n': 'н', 'o': 'о', 'p': 'п',
-        'r': 'р', 's': 'с', 't': 'т', 'u': 'у', 'f': 'ф', 'x': 'ҳ',
-        'ts': 'ц', 'q': 'қ', 'h': 'ҳ', 'j': 'ж'
-    }
+import os
+import re
+import logging
+from itertools import product
+from config import TRANSLIT_EXCEPTIONS_FILE
+
+logger = logging.getLogger(__name__)
+
+# Qoidalar modul yuklanganda bir marta kompilyatsiya qilinadi; natija avvalgi
+# "har bir pozitsiyada barcha kalitlarni sinash" algoritmi bilan bir xil.
+
+LATIN_TO_CYRILLIC = {
+    # 'shch': 'щ',  # Olib tashlandi, chunki bu O‘zbek tilida kerak emas
+    'ch': 'ч', 'sh': 'ш', 'yo': 'ё', 'yu': 'ю', 'ya': 'я',
+    'oʻ': 'ў', 'gʻ': 'ғ', 'ʻ': 'ъ', 'a': 'а', 'b': 'б', 'v': 'в',
+    'g': 'г', 'd': 'д', 'e': 'е', 'z': 'з', 'i': 'и', 'y': 'й',
+    'k': 'к', 'l': 'л', 'm': 'м', 'n': 'н', 'o': 'о', 'p': 'п',
+    'r': 'р', 's': 'с', 't': 'т', 'u': 'у', 'f': 'ф', 'x': 'ҳ',
+    'ts': 'ц', 'q': 'қ', 'h': 'ҳ', 'j': 'ж'
+}
+
+CYRILLIC_TO_LATIN = {
+    'Щ': 'Shch', 'щ': 'shch',
+    'Шаҳ': 'Shah', 'шаҳ': 'shah',  # Maxsus qayta ishlash (qidiruv indeksi shunga tayanadi, qolgan istisnolar faylda)
+    'Ш': 'Sh', 'ш': 'sh',
+    'Ч': 'Ch', 'ч': 'ch',
+    'Ў': 'Oʻ', 'ў': 'oʻ',
+    'Ғ': 'Gʻ', 'ғ': 'gʻ',
+    'Ҳ': 'X', 'ҳ': 'x',
+    'Қ': 'Q', 'қ': 'q',
+    'Ё': 'Yo', 'ё': 'yo',
+    'Ю': 'Yu', 'ю': 'yu',
+    'Я': 'Ya', 'я': 'ya',
+    'ъ': "'", 'ь': '',
+    'А': 'A', 'а': 'a',
+    'Б': 'B', 'б': 'b',
+    'В': 'V', 'в': 'v',
+    'Г': 'G', 'г': 'g',
+    'Д': 'D', 'д': 'd',
+    'Е': 'E', 'е': 'e',
+    'Ж': 'J', 'ж': 'j',
+    'З': 'Z', 'з': 'z',
+    'И': 'I', 'и': 'i',
+    'Й': 'Y', 'й': 'y',
+    'К': 'K', 'к': 'k',
+    'Л': 'L', 'л': 'l',
+    'М': 'M', 'м': 'm',
+    'Н': 'N', 'н': 'n',
+    'О': 'O', 'о': 'o',
+    'П': 'P', 'п': 'p',
+    'Р': 'R', 'р': 'r',
+    'С': 'S', 'с': 's',
+    'Т': 'T', 'т': 't',
+    'У': 'U', 'у': 'u',
+    'Ф': 'F', 'ф': 'f',
+    'Х': 'X', 'х': 'x',
+    'Ц': 'Ts', 'ц': 'ts',
+    'Ы': 'Y', 'ы': 'y',
+    'Э': 'E', 'э': 'e',
+}
+
+APOSTROPHES = str.maketrans({"'": 'ʻ', '‘': 'ʻ', '’': 'ʻ'})
+
+
+# Istisno qatori: "kirill = lotin" (ikki tomonga), "kirill > lotin" (faqat lotinga), "kirill < lotin" (faqat kirillga)
+EXCEPTION_LINE_RE = re.compile(r'^(\S+)\s*([=<>])\s*(\S+)$')
+# O'zak belgisi: "центр* < sentr*" so'z boshida prefiks sifatida qo'llanadi, qolgan istisnolar butun so'z
+STEM_MARK = '*'
+
+
+def _trie_pattern(keys, char_pattern):
+    """Kalitlardan prefiks daraxti ko'rinishidagi regex: har bir pozitsiyada faqat bitta shox tekshiriladi,
+    shuning uchun moslash narxi kalitlar soniga emas, eng uzun kalit uzunligiga bog'liq. Eng uzun moslik tanlanadi.
+    """
+    trie = {}
+    for key in keys:
+        node = trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [char_pattern(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        if '' in node:
+            return '(?:' + '|'.join(branches) + ')?'
+        return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+
+    return build(trie)
+
+
+def _case_variants(mapping):
+    """Har bir kalit belgisi uchun .lower() qiymati shu belgiga teng bo'lgan barcha belgilar (masalan, 'K' va Kelvin 'K')."""
+    key_chars = {ch for key in mapping for ch in key}
+    variants = {ch: [] for ch in key_chars}
+    # BMP dan tashqarida .lower() bu belgilarga olib keladigan belgi yo'q
+    for ch in map(chr, range(0x10000)):
+        lowered = ch.lower()
+        if lowered in variants:
+            variants[lowered].append(ch)
+    return variants
+
 
-    sorted_keys = sorted(translit_map.keys(), key=lambda x: (-len(x), x))
-    result = []
-    i = 0
+def _apply_case(original, base):
+    if original.isupper():
+        return base.upper()
+    if original.istitle():
+        return base.capitalize()
+    return base.lower()
 
-    while i < len(text):
-        matched = False
-        for key in sorted_keys:
-            end = i + len(key)
-            if end > len(text):
+
+def _apply_exception_case(original, following, base):
+    """Istisno natijasi registri: "ЦЕХ" -> "SEX", "Цех" -> "Sex". Bitta bosh harf keyingi belgiga qarab aniqlanadi."""
+    if original.isupper() and (len(original) > 1 or following.isupper()):
+        return base.upper()
+    if original[:1].isupper():
+        return base[:1].upper() + base[1:]
+    return base
+
+
+def _variants_pattern(variants):
+    return lambda ch: "[" + "".join(re.escape(c) for c in variants[ch]) + "]"
+
+
+def _compile_case_insensitive(mapping, variants):
+    """Kalitlar registrsiz solishtiriladi, natija registri asl matnga moslanadi. Barcha variantlar oldindan hisoblanadi."""
+    table = {}
+    for key, value in mapping.items():
+        for combo in product(*(variants[c] for c in key)):
+            original = "".join(combo)
+            table.setdefault(original, _apply_case(original, value))
+    return _trie_pattern(mapping, _variants_pattern(variants)), table
+
+
+def _compile_exact(mapping):
+    return _trie_pattern(mapping, re.escape), dict(mapping)
+
+
+def _split_exceptions(exceptions):
+    """{kalit: qiymat} -> (butun so'zlar, o'zaklar). O'zak kalit va qiymatlari STEM_MARK bilan tugaydi."""
+    words, stems = {}, {}
+    for key, value in exceptions.items():
+        if key.endswith(STEM_MARK):
+            stems[key[:-1]] = value.rstrip(STEM_MARK)
+        else:
+            words[key] = value
+    return words, stems
+
+
+def _compile(rules, words, stems, variants):
+    """Istisnolar va belgi qoidalari bitta regexga birlashtiriladi. So'z boshida avval butun so'z istisnosi
+    (1-guruh, keyin harf kelmasligi kerak), so'ng o'zak (2-guruh) sinaladi."""
+    char_pattern = _variants_pattern(variants)
+    branches = []
+    if words:
+        branches.append('(' + _trie_pattern(words, char_pattern) + r')(?!\w)')
+    if stems:
+        branches.append('(' + _trie_pattern(stems, char_pattern) + ')')
+    if not branches:
+        return re.compile(rules)
+    # Ikkala guruh ham har doim mavjud bo'lishi uchun bo'sh guruh qo'yiladi (lastindex 1 yoki 2)
+    if not words:
+        branches.insert(0, '()(?!)')
+    return re.compile(r'(?<!\w)(?:' + '|'.join(branches) + ')|' + rules)
+
+
+def load_exceptions(path=TRANSLIT_EXCEPTIONS_FILE):
+    """Istisnolar faylini o'qiydi: (kirill -> lotin, lotin -> kirill) lug'atlari, kalitlar kichik harfda.
+
+    Istisno butun so'zga qo'llanadi ("цех" ga mos, "sexr" ga emas). STEM_MARK bilan belgilangan o'zak kalitlari
+    ("центр*") STEM_MARK ni saqlaydi va so'z boshida prefiks sifatida qo'llanadi ("центрда", "sentrifuga").
+    """
+    to_latin, to_cyrillic = {}, {}
+    if not os.path.exists(path):
+        logger.warning(f"Transliteratsiya istisnolari fayli topilmadi: {path}")
+        return to_latin, to_cyrillic
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            match = EXCEPTION_LINE_RE.match(line)
+            if not match:
+                logger.warning(f"Noto'g'ri istisno qatori: {path}:{number}: {line}")
+                continue
+            cyrillic, op, latin = match.groups()
+            cyrillic, latin = cyrillic.lower(), latin.translate(APOSTROPHES).lower()
+            if cyrillic.endswith(STEM_MARK) != latin.endswith(STEM_MARK):
+                logger.warning(f"O'zak belgisi ({STEM_MARK}) ikkala tomonda bo'lishi kerak: {path}:{number}: {line}")
                 continue
-            substring = text[i:end].lower()
-            if substring == key.lower():
-                base = translit_map[key]
-                original = text[i:end]
-                if original.isupper():
-                    converted = base.upper()
-                elif original.istitle():
-                    converted = base.capitalize()
-                else:
-                    converted = base.lower()
-                result.append(converted)
-                i = end
-                matched = True
+            stem = cyrillic.endswith(STEM_MARK)
+            cyrillic, latin = cyrillic.rstrip(STEM_MARK), latin.rstrip(STEM_MARK)
+            if not cyrillic or not latin:
+                logger.warning(f"Noto'g'ri istisno qatori: {path}:{number}: {line}")
+                continue
+            if stem:
+                cyrillic, latin = cyrillic + STEM_MARK, latin + STEM_MARK
+            if op in '=>':
+                to_latin[cyrillic] = latin
+            if op in '=<':
+                to_cyrillic[latin] = cyrillic
+    return to_latin, to_cyrillic
+
+
+class Transliterator:
+    """Kompilyatsiya qilingan qoidalar: bitta matn, matnlar to'plami yoki bo'laklab kelayotgan oqim uchun."""
+
+    # transliterate_many da matnlarni birlashtirish uchun; hech qaysi kalitda uchramaydi
+    SEPARATOR = '\x1f'
+
+    def __init__(self, regex, table, maxlen, prepare=None, words=None, stems=None):
+        self.regex = regex
+        self.table = table
+        self.prepare = prepare
+        self.words = words or {}
+        self.stems = stems or {}
+        if self.words or self.stems:
+            # Istisno registri va so'z chegarasi keyingi belgiga qarab aniqlanadi, shuning uchun oqimda yana bitta belgi kutiladi
+            self.maxlen = max(maxlen, max(map(len, [*self.words, *self.stems])) + 1)
+            self._replace = self._replace_with_exceptions
+        else:
+            self.maxlen = maxlen
+            self._replace = lambda m: table[m.group()]
+
+    def _replace_with_exceptions(self, m):
+        original = m.group()
+        if m.lastindex:
+            end = m.end()
+            exceptions = self.words if m.lastindex == 1 else self.stems
+            return _apply_exception_case(original, m.string[end:end + 1], exceptions[original.lower()])
+        return self.table[original]
+
+    def convert(self, text):
+        if self.prepare:
+            text = self.prepare(text)
+        return self.regex.sub(self._replace, text)
+
+    def convert_many(self, texts):
+        """Matnlar ro'yxatini bitta regex o'tishida o'giradi. Satr bo'lmagan qiymatlar (son, None) o'zgarmaydi."""
+        texts = list(texts)
+        indexes = [i for i, text in enumerate(texts) if isinstance(text, str)]
+        strings = [texts[i] for i in indexes]
+        if any(self.SEPARATOR in text for text in strings):
+            converted = [self.convert(text) for text in strings]
+        else:
+            converted = self.convert(self.SEPARATOR.join(strings)).split(self.SEPARATOR)
+        for i, text in zip(indexes, converted):
+            texts[i] = text
+        return texts
+
+    def _scan(self, buf, start, limit, out):
+        """buf[start:] dagi limit dan oldin boshlanadigan mosliklarni o'giradi; qayta ishlangan joy oxirini qaytaradi."""
+        pos = start
+        for m in self.regex.finditer(buf, start):
+            if m.start() >= limit:
                 break
-        if not matched:
-            result.append(text[i])
-            i += 1
+            out.append(buf[pos:m.start()])
+            out.append(self._replace(m))
+            pos = m.end()
+        if pos < limit:
+            out.append(buf[pos:limit])
+            pos = limit
+        return pos
 
-    return ''.join(result)
+    def stream(self, chunks):
+        """Bo'laklarni o'girib, natija bo'laklarini qaytaradi (generator).
 
+        Bo'lak oxiridagi maxlen-1 belgi keyingi bo'lak kelguncha ushlab turiladi, shuning uchun
+        chegarada bo'lingan "sh", "oʻ", "yo" kabi birikmalar butun matndagidek o'giriladi.
+        Oldingi bitta belgi ham saqlanadi: istisnolar so'z boshini (?<!\\w) orqali tekshiradi.
+        """
+        carry = ''
+        start = 0
+        for chunk in chunks:
+            buf = carry + (self.prepare(chunk) if self.prepare else chunk)
+            out = []
+            pos = self._scan(buf, start, len(buf) - (self.maxlen - 1), out)
+            keep = max(pos - 1, 0)
+            carry, start = buf[keep:], pos - keep
+            if out:
+                yield ''.join(out)
+        if len(carry) > start:
+            out = []
+            self._scan(carry, start, len(carry), out)
+            yield ''.join(out)
 
-def convert_to_latin(text):
-    translit_map = {
-        'Щ': 'Shch', 'щ': 'shch',
-        'Шаҳ': 'Shah', 'шаҳ': 'shah',  # Maxsus qayta ishlash
-        'Ш': 'Sh', 'ш': 'sh',
-        'Ч': 'Ch', 'ч': 'ch',
-        'Ў': 'Oʻ', 'ў': 'oʻ',
-        'Ғ': 'Gʻ', 'ғ': 'gʻ',
-        'Ҳ': 'X', 'ҳ': 'x',
-        'Қ': 'Q', 'қ': 'q',
-        'Ё': 'Yo', 'ё': 'yo',
-        'Ю': 'Yu', 'ю': 'yu',
-        'Я': 'Ya', 'я': 'ya',
-        'ъ': "'", 'ь': '',
-        'А': 'A', 'а': 'a',
-        'Б': 'B', 'б': 'b',
-        'В': 'V', 'в': 'v',
-        'Г': 'G', 'г': 'g',
-        'Д': 'D', 'д': 'd',
-        'Е': 'E', 'е': 'e',
-        'Ж': 'J', 'ж': 'j',
-        'З': 'Z', 'з': 'z',
-        'И': 'I', 'и': 'i',
-        'Й': 'Y', 'й': 'y',
-        'К': 'K', 'к': 'k',
-        'Л': 'L', 'л': 'l',
-        'М': 'M', 'м': 'm',
-        'Н': 'N', 'н': 'n',
-        'О': 'O', 'о': 'o',
-        'П': 'P', 'п': 'p',
-        'Р': 'R', 'р': 'r',
-        'С': 'S', 'с': 's',
-        'Т': 'T', 'т': 't',
-        'У': 'U', 'у': 'u',
-        'Ф': 'F', 'ф': 'f',
-        'Х': 'X', 'х': 'x',
-        'Ц': 'Ts', 'ц': 'ts',
-        'Ы': 'Y', 'ы': 'y',
-        'Э': 'E', 'э': 'e',
+
+def _build_transliterators(to_latin_exceptions=None, to_cyrillic_exceptions=None):
+    latin_words, latin_stems = _split_exceptions(to_latin_exceptions or {})
+    cyrillic_words, cyrillic_stems = _split_exceptions(to_cyrillic_exceptions or {})
+    variants = _case_variants({**LATIN_TO_CYRILLIC, **latin_words, **latin_stems, **cyrillic_words, **cyrillic_stems})
+    to_cyrillic_rules, to_cyrillic = _compile_case_insensitive(LATIN_TO_CYRILLIC, variants)
+    to_latin_rules, to_latin = _compile_exact(CYRILLIC_TO_LATIN)
+    return {
+        'uz_cyrillic': Transliterator(_compile(to_cyrillic_rules, cyrillic_words, cyrillic_stems, variants), to_cyrillic,
+                                      max(map(len, LATIN_TO_CYRILLIC)),
+                                      prepare=lambda text: text.translate(APOSTROPHES),
+                                      words=cyrillic_words, stems=cyrillic_stems),
+        'uz_latin': Transliterator(_compile(to_latin_rules, latin_words, latin_stems, variants), to_latin,
+                                   max(map(len, CYRILLIC_TO_LATIN)),
+                                   words=latin_words, stems=latin_stems),
     }
 
-    sorted_keys = sorted(translit_map.keys(), key=lambda x: (-len(x), x))
-    result = []
-    i = 0
-    
-    while i < len(text):
-        matched = False
-        for key in sorted_keys:
-            end = i + len(key)
-            if end > len(text):
-                continue
-            substring = text[i:end]
-            if substring == key:
-                base = translit_map[key]
-                result.append(base)
-                i = end
-                matched = True
-                break
-        if not matched:
-            result.append(text[i])
-            i += 1
-            
-    return ''.join(result)
 
+# Qidiruv shakllari faqat asosiy qoidalar bilan olinadi: istisnolar qayta yuklanganda FTS va trigram indekslari eskirmaydi
+BASE_TRANSLITERATORS = _build_transliterators()
+TRANSLITERATORS = dict(BASE_TRANSLITERATORS)
+
+
+def reload_transliterators(path=TRANSLIT_EXCEPTIONS_FILE):
+    """Istisnolar faylini qayta o'qib, transliteratorlarni almashtiradi. Xato bo'lsa eskilari qoladi.
+
+    O'girilgan matnlar keshlari (lang.translate_cache, UI katalogi) chaqiruvchi tomonidan yangilanadi.
+    """
+    to_latin, to_cyrillic = load_exceptions(path)
+    TRANSLITERATORS.update(_build_transliterators(to_latin, to_cyrillic))
+    logger.info(f"Transliteratsiya istisnolari yuklandi: lotinga={len(to_latin)}, kirillga={len(to_cyrillic)}")
+    return len(to_latin), len(to_cyrillic)
+
+
+def convert_to_cyrillic(text):
+    return TRANSLITERATORS['uz_cyrillic'].convert(text)
+
+
+def convert_to_latin(text):
+    return TRANSLITERATORS['uz_latin'].convert(text)
+
+
+def transliterate_many(texts, target):
+    """target: 'uz_cyrillic' yoki 'uz_latin'. Natija — kirish tartibidagi ro'yxat."""
+    return TRANSLITERATORS[target].convert_many(texts)
+
+
+def transliterate_stream(chunks, target):
+    return TRANSLITERATORS[target].stream(chunks)
+
+
+def search_latin(text):
+    """Qidiruv uchun yagona lotin shakli: kichik harf, barcha tutuq belgilari ʻ ga keltiriladi."""
+    if not text:
+        return ''
+    text = BASE_TRANSLITERATORS['uz_latin'].convert(text).lower()
+    for mark in ("'", '‘', '’', '`'):
+        text = text.replace(mark, 'ʻ')
+    return text
+
+
+def search_cyrillic(text):
+    """Qidiruv uchun yagona kirill shakli (lotin shakli orqali, shuning uchun х/ҳ kabi farqlar bir xillashadi)."""
+    if not text:
+        return ''
+    return BASE_TRANSLITERATORS['uz_cyrillic'].convert(search_latin(text)).lower()
+
+
+reload_transliterators()
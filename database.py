@@ -1,200 +1,325 @@
+import re
 import sqlite3
-import os
-from config import DATA_PATH
 import logging
+from db_connection import get_connection, transaction
+from cache import LRUCache, MISSING
+from trigram_index import TrigramIndex
+from converters import search_latin, search_cyrillic
+from config import LANG_CACHE_SIZE, LANG_CACHE_TTL, FIRM_CACHE_SIZE
 
 logger = logging.getLogger(__name__)
 
-def init_db():
-    try:
-        conn = sqlite3.connect(os.path.join(DATA_PATH, "bot.db"))
-        c = conn.cursor()
-        # Mavjud jadvallar
-        c.execute('''CREATE TABLE IF NOT EXISTS users (
-            user_id INTEGER PRIMARY KEY,
-            language TEXT DEFAULT 'uz_latin'
-        )''')
-        c.execute('''CREATE TABLE IF NOT EXISTS firms (
-            stir TEXT PRIMARY KEY,
-            name TEXT,
-            rahbar TEXT,
-            soliq_turi TEXT,
-            ds_stavka TEXT,
-            ys_stavka TEXT,
-            qqs_stavka TEXT
-        )''')
-        c.execute('''CREATE TABLE IF NOT EXISTS reports (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            stir TEXT,
-            oy TEXT,
-            firma_name TEXT,
-            xodimlar_soni INTEGER,
-            xodimlar_data TEXT,
-            hisobot_davri_oylik INTEGER,
-            jami_oylik INTEGER,
-            soliq INTEGER
-        )''')
-        c.execute('''CREATE TABLE IF NOT EXISTS reports_yagona (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            stir TEXT,
-            oy TEXT,
-            firma_name TEXT,
-            rahbar TEXT,
-            soliq_turi_yagona TEXT,
-            yil_boshidan_aylanma INTEGER,
-            shu_oy_aylanma INTEGER,
-            yagona_soliq INTEGER
-        )''')
-        c.execute('''CREATE TABLE IF NOT EXISTS reports_qqs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            stir TEXT,
-            oy TEXT,
-            firma_name TEXT,
-            rahbar TEXT,
-            soliq_turi_qqs TEXT,
-            yil_boshidan_qqs INTEGER,
-            shu_oy_qqs INTEGER,
-            qqs_soliq INTEGER
-        )''')
-        c.execute('''CREATE TABLE IF NOT EXISTS files (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            stir TEXT,
-            soliq_turi TEXT,
-            oy TEXT,
-            file_type TEXT,
-            file_path TEXT
-        )''')
-        conn.commit()
-        conn.close()
-        logger.info("Ma'lumotlar bazasi muvaffaqiyatli yangilandi.")
-    except Exception as e:
-        logger.error(f"Ma'lumotlar bazasi yangilashda xato: {e}")
+# user_id -> til; set_user_language orqali yangilanadi (write-through)
+language_cache = LRUCache("user_language", maxsize=LANG_CACHE_SIZE, ttl=LANG_CACHE_TTL)
+# stir -> get_firma_info natijasi; firms jadvaliga yozuvchi funksiyalar tozalaydi
+firm_cache = LRUCache("firm", maxsize=FIRM_CACHE_SIZE)
+# Firmalar soni (sahifalash uchun); firma qo'shilganda tozalanadi
+firm_count_cache = LRUCache("firm_count", maxsize=1)
+# Xato yozilgan nomlar uchun trigram indeksi; birinchi fuzzy qidiruvda get_all_firms() dan quriladi
+firm_trigrams = TrigramIndex(lambda: get_all_firms())
 
 def save_yagona_report(stir, oy, firma_name, rahbar, soliq_turi_yagona, yil_boshidan_aylanma, shu_oy_aylanma, yagona_soliq):
-    conn = sqlite3.connect(os.path.join(DATA_PATH, "bot.db"))
-    c = conn.cursor()
-    c.execute("""
-        INSERT INTO reports_yagona (stir, oy, firma_name, rahbar, soliq_turi_yagona, yil_boshidan_aylanma, shu_oy_aylanma, yagona_soliq)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, (stir, oy, firma_name, rahbar, soliq_turi_yagona, yil_boshidan_aylanma, shu_oy_aylanma, yagona_soliq))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("""
+            INSERT OR REPLACE INTO reports_yagona (stir, oy, firma_name, rahbar, soliq_turi_yagona, yil_boshidan_aylanma, shu_oy_aylanma, yagona_soliq)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (stir, oy, firma_name, rahbar, soliq_turi_yagona, yil_boshidan_aylanma, shu_oy_aylanma, yagona_soliq))
 
 def save_qqs_report(stir, oy, firma_name, rahbar, soliq_turi_qqs, yil_boshidan_qqs, shu_oy_qqs, qqs_soliq):
-    conn = sqlite3.connect(os.path.join(DATA_PATH, "bot.db"))
-    c = conn.cursor()
-    c.execute("""
-        INSERT INTO reports_qqs (stir, oy, firma_name, rahbar, soliq_turi_qqs, yil_boshidan_qqs, shu_oy_qqs, qqs_soliq)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, (stir, oy, firma_name, rahbar, soliq_turi_qqs, yil_boshidan_qqs, shu_oy_qqs, qqs_soliq))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("""
+            INSERT OR REPLACE INTO reports_qqs (stir, oy, firma_name, rahbar, soliq_turi_qqs, yil_boshidan_qqs, shu_oy_qqs, qqs_soliq)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (stir, oy, firma_name, rahbar, soliq_turi_qqs, yil_boshidan_qqs, shu_oy_qqs, qqs_soliq))
+
+# Excel yuklashda saqlanadigan hisobotlar: soliq turi -> (jadval, stavka, yil boshidan, shu oy, soliq summasi).
+# Stavka va summalar ustunlari parse_yagona_excel / parse_qqs_excel natijasidagi kalitlar bilan bir xil.
+REPORT_TABLES = {
+    'yagona': ('reports_yagona', 'soliq_turi_yagona', 'yil_boshidan_aylanma', 'shu_oy_aylanma', 'yagona_soliq'),
+    'qqs': ('reports_qqs', 'soliq_turi_qqs', 'yil_boshidan_qqs', 'shu_oy_qqs', 'qqs_soliq'),
+}
+
+def tax_amount(amount, stavka):
+    """Shu oy summasi * stavka ("4%", "4,5%" yoki son)."""
+    rate = float(str(stavka).rstrip('%').strip().replace(',', '.'))
+    return int(amount * (rate / 100))
+
+def bulk_upsert_reports(soliq_turi, firms):
+    """Yuklangan fayldagi barcha qatorlarni bitta tranzaksiyada (stir, oy) bo'yicha qo'shadi yoki yangilaydi.
+
+    firms: parse_yagona_excel / parse_qqs_excel natijasi ({(stir, oy): {...}}). Soliq summasi shu yerda hisoblanadi.
+    """
+    table, stavka, yil_boshidan, shu_oy, soliq = REPORT_TABLES[soliq_turi]
+    columns = ('stir', 'oy', 'firma_name', 'rahbar', stavka, yil_boshidan, shu_oy, soliq)
+    rows = [(f['stir'], f['oy'], f['firma_nomi'], f['rahbar'], f[stavka], f[yil_boshidan], f[shu_oy], tax_amount(f[shu_oy], f[stavka]))
+            for f in firms.values()]
+    updates = ", ".join(f"{column} = excluded.{column}" for column in columns[2:])
+    with transaction(immediate=True) as conn:
+        conn.executemany(f"""INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})
+                             ON CONFLICT (stir, oy) DO UPDATE SET {updates}""", rows)
+    logger.info(f"bulk_upsert_reports: {table}, {len(rows)} ta qator saqlandi")
+    return len(rows)
+
+def daromad_report_row(firm):
+    """parse_excel_file natijasidagi bitta firma-oy uchun reports qatori (process_excel_data bilan bir xil hisob)."""
+    xodimlar = firm['xodimlar']
+    hisobot_davri_oylik = sum(x['shu_oy'] for x in xodimlar if x['shu_oy'] > 0)
+    jami_oylik = sum(x['yil_boshidan'] for x in xodimlar)
+    xodimlar_data = "\n".join(EMPLOYEE_LINE_FORMAT.format(tartib=i + 1, **x) for i, x in enumerate(xodimlar))
+    return (firm['stir'], firm['oy'], firm['firma_nomi'], len(xodimlar), xodimlar_data,
+            hisobot_davri_oylik, jami_oylik, int(hisobot_davri_oylik * 0.12))
+
+def save_bulk_reports(soliq_turi, firms, files):
+    """Ommaviy yuklashning bitta bo'lagini bitta tranzaksiyada yozadi: hisobot qatorlari va files yozuvlari.
+
+    firms: parser natijasidan {(stir, oy): yozuv} bo'lagi; files: [(stir, oy, file_type, file_path), ...].
+    """
+    with transaction(immediate=True) as conn:
+        if soliq_turi == 'daromad':
+            conn.executemany("""INSERT OR REPLACE INTO reports (stir, oy, firma_name, xodimlar_soni, xodimlar_data, hisobot_davri_oylik, jami_oylik, soliq)
+                                VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", [daromad_report_row(firm) for firm in firms.values()])
+            for (stir, oy), firm in firms.items():
+                save_report_employees(conn, stir, oy, firm['xodimlar'])
+        else:
+            bulk_upsert_reports(soliq_turi, firms)
+        conn.executemany("INSERT OR REPLACE INTO files (stir, soliq_turi, oy, file_type, file_path) VALUES (?, ?, ?, ?, ?)",
+                         [(stir, soliq_turi, oy, file_type, file_path) for stir, oy, file_type, file_path in files])
+    logger.info(f"save_bulk_reports: {soliq_turi}, hisobotlar={len(firms)}, fayllar={len(files)}")
+
+def get_report_figures(soliq_turi, stir, oy):
+    """Xulosa uchun stavka va summalar: {ustun: qiymat} yoki None (ux_*_stir_oy indeksi bo'yicha)."""
+    table, *columns = REPORT_TABLES[soliq_turi]
+    row = get_connection().execute(f"SELECT {', '.join(columns)} FROM {table} WHERE stir = ? AND oy = ?", (stir, oy)).fetchone()
+    return dict(zip(columns, row)) if row else None
 
 def get_yagona_report(stir, oy):
-    conn = sqlite3.connect(os.path.join(DATA_PATH, "bot.db"))
-    c = conn.cursor()
-    c.execute("SELECT * FROM reports_yagona WHERE stir = ? AND oy = ?", (stir, oy))
-    result = c.fetchone()
-    conn.close()
-    return result
+    c = get_connection().execute("SELECT * FROM reports_yagona WHERE stir = ? AND oy = ?", (stir, oy))
+    return c.fetchone()
 
 def get_qqs_report(stir, oy):
-    conn = sqlite3.connect(os.path.join(DATA_PATH, "bot.db"))
-    c = conn.cursor()
-    c.execute("SELECT * FROM reports_qqs WHERE stir = ? AND oy = ?", (stir, oy))
-    result = c.fetchone()
-    conn.close()
-    return result
+    c = get_connection().execute("SELECT * FROM reports_qqs WHERE stir = ? AND oy = ?", (stir, oy))
+    return c.fetchone()
 
 
 
 def add_firma(stir, name, rahbar=None, soliq_turi=None, ds_stavka=None, ys_stavka=None, qqs_stavka=None):
-    conn = sqlite3.connect(os.path.join(DATA_PATH, "bot.db"))
-    c = conn.cursor()
-    c.execute("INSERT INTO firms (stir, name, rahbar, soliq_turi, ds_stavka, ys_stavka, qqs_stavka) VALUES (?, ?, ?, ?, ?, ?, ?)",
-              (stir, name, rahbar, soliq_turi, ds_stavka, ys_stavka, qqs_stavka))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute("INSERT INTO firms (stir, name, rahbar, soliq_turi, ds_stavka, ys_stavka, qqs_stavka) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                     (stir, name, rahbar, soliq_turi, ds_stavka, ys_stavka, qqs_stavka))
+    firm_cache.invalidate(stir)
+    firm_count_cache.clear()
+    firm_trigrams.add(stir, name)
+
+# Excel reyestrdan yangilanadigan maydonlar (nom faqat "Firma tahrirlash" orqali o'zgaradi)
+FIRM_UPDATE_FIELDS = ('rahbar', 'ds_stavka', 'ys_stavka', 'qqs_stavka')
+
+def bulk_upsert_firms(firms, chunk_size=500):
+    """Firmalarni bitta tranzaksiyada qo'shadi yoki yangilaydi.
+
+    firms: parse_firms_excel qaytargan lug'atlar ro'yxati.
+    Natija: {'inserted': [...], 'updated': [...], 'skipped': [...]} — har birida firma lug'atlari.
+    """
+    summary = {'inserted': [], 'updated': [], 'skipped': []}
+    unique = {}
+    for firm in firms:
+        if firm['stir'] in unique:
+            summary['skipped'].append(firm)
+        else:
+            unique[firm['stir']] = firm
+    stirs = list(unique)
+
+    with transaction(immediate=True) as conn:
+        existing = {}
+        for i in range(0, len(stirs), chunk_size):
+            chunk = stirs[i:i + chunk_size]
+            placeholders = ", ".join("?" * len(chunk))
+            for row in conn.execute(f"SELECT stir, {', '.join(FIRM_UPDATE_FIELDS)} FROM firms WHERE stir IN ({placeholders})", chunk):
+                existing[row[0]] = row[1:]
+
+        inserts, updates = [], []
+        for stir, firm in unique.items():
+            if stir not in existing:
+                inserts.append(firm)
+            elif tuple(firm[f] for f in FIRM_UPDATE_FIELDS) != existing[stir]:
+                updates.append(firm)
+            else:
+                summary['skipped'].append(firm)
+
+        conn.executemany("INSERT INTO firms (stir, name, rahbar, soliq_turi, ds_stavka, ys_stavka, qqs_stavka) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         [(f['stir'], f['firma_nomi'], f['rahbar'], f['soliq_turi'], f['ds_stavka'], f['ys_stavka'], f['qqs_stavka']) for f in inserts])
+        conn.executemany(f"UPDATE firms SET {', '.join(f'{f} = ?' for f in FIRM_UPDATE_FIELDS)} WHERE stir = ?",
+                         [tuple(f[field] for field in FIRM_UPDATE_FIELDS) + (f['stir'],) for f in updates])
+
+    firm_cache.invalidate(*(f['stir'] for f in inserts + updates))
+    if inserts:
+        firm_count_cache.clear()
+    for f in inserts:
+        firm_trigrams.add(f['stir'], f['firma_nomi'])
+    summary['inserted'] = inserts
+    summary['updated'] = updates
+    logger.info(f"bulk_upsert_firms: qo'shildi={len(inserts)}, yangilandi={len(updates)}, o'tkazib yuborildi={len(summary['skipped'])}")
+    return summary
 
 def get_firma_info(stir):
-    conn = sqlite3.connect(os.path.join(DATA_PATH, "bot.db"))
-    c = conn.cursor()
-    c.execute("SELECT name, rahbar, soliq_turi, ds_stavka, ys_stavka, qqs_stavka FROM firms WHERE stir = ?", (stir,))
-    result = c.fetchone()
-    conn.close()
-    return result
+    info = firm_cache.get(stir)
+    if info is not MISSING:
+        return info
+    return fetch_firma_info(stir)
+
+def fetch_firma_info(stir):
+    """Firmani bazadan o'qiydi va keshga yozadi (firma topilmasa None ham keshlanadi)."""
+    version = firm_cache.version
+    c = get_connection().execute("SELECT name, rahbar, soliq_turi, ds_stavka, ys_stavka, qqs_stavka FROM firms WHERE stir = ?", (stir,))
+    return firm_cache.setdefault(stir, c.fetchone(), version=version)
 
 
 def check_firma(stir):
-    conn = sqlite3.connect(os.path.join(DATA_PATH, "bot.db"))
-    c = conn.cursor()
-    c.execute("SELECT stir FROM firms WHERE stir = ?", (stir,))
-    result = c.fetchone()
-    conn.close()
-    return result is not None
+    return get_firma_info(stir) is not None
+
+def get_all_stirs():
+    """Ro'yxatdan o'tgan barcha STIRlar to'plami (Excel parserlari uchun bir martalik tekshiruv)."""
+    return {row[0] for row in get_connection().execute("SELECT stir FROM firms")}
 
 def get_all_firms():
-    conn = sqlite3.connect(os.path.join(DATA_PATH, "bot.db"))
-    c = conn.cursor()
-    c.execute("SELECT stir, name FROM firms")
-    firms = c.fetchall()
-    conn.close()
-    return firms
+    c = get_connection().execute("SELECT stir, name FROM firms")
+    return c.fetchall()
+
+def get_firms_page(limit, after=None, before=None):
+    """Firmalarni (name, stir) tartibida keyset usulida sahifalaydi.
+
+    after/before — oldingi sahifadagi oxirgi/birinchi firmaning STIRi. OFFSET ishlatilmaydi,
+    shuning uchun har qanday sahifa ix_firms_name_stir indeksi bo'yicha bir xil tezlikda o'qiladi.
+    Natija: [(stir, name), ...] doim o'sish tartibida.
+    """
+    conn = get_connection()
+    if after:
+        c = conn.execute("""SELECT stir, name FROM firms
+                            WHERE (name, stir) > (SELECT name, stir FROM firms WHERE stir = ?)
+                            ORDER BY name, stir LIMIT ?""", (after, limit))
+        return c.fetchall()
+    if before:
+        c = conn.execute("""SELECT stir, name FROM firms
+                            WHERE (name, stir) < (SELECT name, stir FROM firms WHERE stir = ?)
+                            ORDER BY name DESC, stir DESC LIMIT ?""", (before, limit))
+        return c.fetchall()[::-1]
+    return conn.execute("SELECT stir, name FROM firms ORDER BY name, stir LIMIT ?", (limit,)).fetchall()
+
+def count_firms():
+    total = firm_count_cache.get('total')
+    if total is not MISSING:
+        return total
+    version = firm_count_cache.version
+    total = get_connection().execute("SELECT COUNT(*) FROM firms").fetchone()[0]
+    return firm_count_cache.setdefault('total', total, version=version)
+
+def _fts_prefix_query(text):
+    return " AND ".join(f'"{token}"*' for token in re.findall(r'\w+', text))
+
+def search_firms(query, limit=10):
+    """firms_fts bo'yicha qidiruv (STIR, nom yoki rahbar; lotin yoki kirill). Natija: [(stir, name), ...] mosligi bo'yicha."""
+    latin, cyrillic = _fts_prefix_query(search_latin(query)), _fts_prefix_query(search_cyrillic(query))
+    if not latin:
+        return []
+    match = f"{{stir name_lat rahbar_lat}} : ({latin}) OR {{name_cyr rahbar_cyr}} : ({cyrillic})"
+    c = get_connection().execute("""
+        SELECT f.stir, f.name FROM firms_fts JOIN firms f ON f.rowid = firms_fts.rowid
+        WHERE firms_fts MATCH ?
+        ORDER BY bm25(firms_fts, 10.0, 5.0, 5.0, 1.0, 1.0)
+        LIMIT ?
+    """, (match, limit))
+    return c.fetchall()
+
+def fuzzy_search_firms(query, limit=10):
+    """Trigram o'xshashligi bo'yicha qidiruv (FTS hech narsa topmaganda). Natija: [(stir, name), ...]"""
+    return [(stir, name) for stir, name, _ in firm_trigrams.search(query, limit=limit)]
+
+def update_firma_name(stir, new_name):
+    with transaction() as conn:
+        conn.execute("UPDATE firms SET name = ? WHERE stir = ?", (new_name, stir))
+    firm_cache.invalidate(stir)
+    firm_trigrams.add(stir, new_name)
 
 def get_firma_name(stir):
-    conn = sqlite3.connect(os.path.join(DATA_PATH, "bot.db"))
-    c = conn.cursor()
-    c.execute("SELECT name FROM firms WHERE stir = ?", (stir,))
-    result = c.fetchone()
-    conn.close()
+    result = get_firma_info(stir)
     return result[0] if result else "Noma'lum"
 
 def save_file(stir, soliq_turi, oy, file_type, file_path):
     try:
-        conn = sqlite3.connect(os.path.join(DATA_PATH, "bot.db"))
-        c = conn.cursor()
-        c.execute("INSERT OR REPLACE INTO files (stir, soliq_turi, oy, file_type, file_path) VALUES (?, ?, ?, ?, ?)",
-                 (stir, soliq_turi, oy.lower(), file_type, file_path))
-        conn.commit()
+        with transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO files (stir, soliq_turi, oy, file_type, file_path) VALUES (?, ?, ?, ?, ?)",
+                         (stir, soliq_turi, oy.lower(), file_type, file_path))
         logger.info(f"Fayl saqlandi: stir={stir}, soliq_turi={soliq_turi}, oy={oy}, file_type={file_type}, file_path={file_path}")
     except sqlite3.Error as e:
         logger.error(f"SQL xatosi faylni saqlashda: {e}, stir={stir}, soliq_turi={soliq_turi}, oy={oy}, file_type={file_type}")
-    finally:
-        conn.close()
 
 def check_file(stir, soliq_turi, oy, file_type):
     try:
-        conn = sqlite3.connect(os.path.join(DATA_PATH, "bot.db"))
-        c = conn.cursor()
-        c.execute("SELECT file_path FROM files WHERE stir=? AND soliq_turi=? AND oy=? AND file_type=?", 
-                 (stir, soliq_turi, oy.lower(), file_type))
+        c = get_connection().execute("SELECT file_path FROM files WHERE stir=? AND soliq_turi=? AND oy=? AND file_type=?",
+                                     (stir, soliq_turi, oy.lower(), file_type))
         result = c.fetchone()
         logger.info(f"check_file: stir={stir}, soliq_turi={soliq_turi}, oy={oy}, file_type={file_type}, result={result}")
         return result[0] if result else None
     except sqlite3.Error as e:
         logger.error(f"check_file xatosi: {e}, stir={stir}, soliq_turi={soliq_turi}, oy={oy}, file_type={file_type}")
         return None
-    finally:
-        conn.close()
 
 
-def save_manual_report(stir, oy, firma_name, xodimlar_soni, xodimlar_data, hisobot_davri_oylik, jami_oylik, soliq):
-    conn = sqlite3.connect(os.path.join(DATA_PATH, "bot.db"))
-    c = conn.cursor()
-    c.execute("""
-        INSERT INTO reports (stir, oy, firma_name, xodimlar_soni, xodimlar_data, hisobot_davri_oylik, jami_oylik, soliq)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, (stir, oy, firma_name, xodimlar_soni, xodimlar_data, hisobot_davri_oylik, jami_oylik, soliq))
-    conn.commit()
-    conn.close()
+# xodimlar_data qatori: "1 (Lavozim) – Ism, bu_oy_uchun_hisobotda: 1,000 so‘m (yil_boshidan_hisobotda: 5,000 so‘m)"
+EMPLOYEE_LINE_RE = re.compile(r'^(\d+) \((.*?)\) – (.*?), (.*?): ([\d,]+) (.*?)\s*\((.*?): ([\d,]+) (.*?)\)$')
+EMPLOYEE_LINE_FORMAT = "{tartib} ({lavozim}) – {ism}, bu_oy_uchun_hisobotda: {shu_oy:,} so‘m (yil_boshidan_hisobotda: {yil_boshidan:,} so‘m)"
+
+def parse_xodimlar_data(xodimlar_data):
+    """Eski matnli formatdagi xodimlar ro'yxatini lug'atlarga ajratadi (mos kelmagan qatorlar tashlanadi)."""
+    xodimlar = []
+    for line in (xodimlar_data or "").split("\n"):
+        match = EMPLOYEE_LINE_RE.match(line)
+        if match:
+            tartib, lavozim, ism, _, shu_oy, _, _, yil_boshidan, _ = match.groups()
+            xodimlar.append({
+                'tartib': int(tartib),
+                'lavozim': lavozim,
+                'ism': ism,
+                'shu_oy': int(shu_oy.replace(",", "")),
+                'yil_boshidan': int(yil_boshidan.replace(",", "")),
+            })
+    return xodimlar
+
+def save_report_employees(conn, stir, oy, xodimlar):
+    conn.execute("DELETE FROM report_employees WHERE stir = ? AND oy = ?", (stir, oy))
+    conn.executemany("INSERT OR REPLACE INTO report_employees (stir, oy, tartib, lavozim, ism, shu_oy, yil_boshidan) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                     [(stir, oy, x.get('tartib', i + 1), x['lavozim'], x['ism'], x['shu_oy'], x['yil_boshidan'])
+                      for i, x in enumerate(xodimlar)])
+
+def save_manual_report(stir, oy, firma_name, xodimlar_soni, xodimlar_data, hisobot_davri_oylik, jami_oylik, soliq, xodimlar=None):
+    if not xodimlar:
+        xodimlar = parse_xodimlar_data(xodimlar_data)
+    with transaction() as conn:
+        conn.execute("""
+            INSERT OR REPLACE INTO reports (stir, oy, firma_name, xodimlar_soni, xodimlar_data, hisobot_davri_oylik, jami_oylik, soliq)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (stir, oy, firma_name, xodimlar_soni, xodimlar_data, hisobot_davri_oylik, jami_oylik, soliq))
+        save_report_employees(conn, stir, oy, xodimlar)
 
 def get_manual_report(stir, oy):
-    conn = sqlite3.connect(os.path.join(DATA_PATH, "bot.db"))
-    c = conn.cursor()
-    c.execute("SELECT * FROM reports WHERE stir = ? AND oy = ?", (stir, oy))
-    result = c.fetchone()
-    conn.close()
-    return result
+    c = get_connection().execute("SELECT * FROM reports WHERE stir = ? AND oy = ?", (stir, oy))
+    return c.fetchone()
+
+def get_report_employees(stir, oy):
+    """[(tartib, lavozim, ism, shu_oy, yil_boshidan), ...] tartib raqami bo'yicha."""
+    c = get_connection().execute("SELECT tartib, lavozim, ism, shu_oy, yil_boshidan FROM report_employees WHERE stir = ? AND oy = ? ORDER BY tartib",
+                                 (stir, oy))
+    return c.fetchall()
+
+def delete_report_data(stir, oy):
+    """Oy bo'yicha hisobot va fayl yozuvlarini o'chiradi, firma soliq turini qaytaradi."""
+    with transaction() as conn:
+        result = conn.execute("SELECT soliq_turi FROM firms WHERE stir = ?", (stir,)).fetchone()
+        conn.execute("DELETE FROM reports WHERE stir = ? AND oy = ?", (stir, oy))
+        conn.execute("DELETE FROM report_employees WHERE stir = ? AND oy = ?", (stir, oy))
+        for table, *_ in REPORT_TABLES.values():
+            conn.execute(f"DELETE FROM {table} WHERE stir = ? AND oy = ?", (stir, oy))
+        conn.execute("DELETE FROM files WHERE stir = ? AND oy = ?", (stir, oy))
+    return result[0] if result else None
 
 def set_user_language(user_id, language):
     try:
@@ -203,27 +328,31 @@ def set_user_language(user_id, language):
             language = 'uz_cyrillic'
         elif language == 'latin':
             language = 'uz_latin'
-        conn = sqlite3.connect(os.path.join(DATA_PATH, "bot.db"))
-        c = conn.cursor()
-        c.execute("INSERT OR REPLACE INTO users (user_id, language) VALUES (?, ?)", (user_id, language))
-        conn.commit()
-        conn.close()
+        with transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO users (user_id, language) VALUES (?, ?)", (user_id, language))
+        language_cache.set(user_id, language)
         logger.info(f"set_user_language: user_id={user_id}, language={language}")
     except Exception as e:
         logger.error(f"set_user_language xatosi: {e}")
 
 def get_user_language(user_id):
+    lang = language_cache.get(user_id)
+    if lang is not MISSING:
+        return lang
+    return fetch_user_language(user_id)
+
+def fetch_user_language(user_id):
+    """Tilni bazadan o'qiydi va keshga yozadi."""
+    version = language_cache.version
     try:
-        conn = sqlite3.connect(os.path.join(DATA_PATH, "bot.db"))
-        c = conn.cursor()
-        c.execute("SELECT language FROM users WHERE user_id = ?", (user_id,))
+        c = get_connection().execute("SELECT language FROM users WHERE user_id = ?", (user_id,))
         result = c.fetchone()
-        conn.close()
         lang = result[0] if result else 'uz_latin'
         # cyrillic ni uz_cyrillic bilan almashtiramiz
         if lang == 'cyrillic':
             lang = 'uz_cyrillic'
-        logger.info(f"get_user_language: user_id={user_id}, lang={lang}")
+        lang = language_cache.setdefault(user_id, lang, version=version)
+        logger.debug(f"get_user_language: user_id={user_id}, lang={lang}")
         return lang
     except Exception as e:
         logger.error(f"get_user_language xatosi: {e}")
@@ -0,0 +1,99 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import database
+import db_connection
+from cache import MISSING
+from config import DB_READ_WORKERS
+
+logger = logging.getLogger(__name__)
+
+# O'qish amallari bir nechta oqimda parallel bajariladi (WAL rejimi bunga ruxsat beradi),
+# yozish amallari esa bitta oqimda navbat bilan bajariladi.
+_read_executor = ThreadPoolExecutor(max_workers=DB_READ_WORKERS, thread_name_prefix="db-read")
+_write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-write")
+
+
+async def run_read(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_read_executor, functools.partial(func, *args, **kwargs))
+
+
+async def run_write(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_write_executor, functools.partial(func, *args, **kwargs))
+
+
+def _reader(func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_read(func, *args, **kwargs)
+    return wrapper
+
+
+def _writer(func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_write(func, *args, **kwargs)
+    return wrapper
+
+
+async def get_user_language(user_id):
+    # Keshdagi til event loop ichida qaytariladi, executorga o'tilmaydi
+    lang = database.language_cache.get(user_id)
+    if lang is not MISSING:
+        return lang
+    return await run_read(database.fetch_user_language, user_id)
+
+
+async def get_firma_info(stir):
+    info = database.firm_cache.get(stir)
+    if info is MISSING:
+        info = await run_read(database.fetch_firma_info, stir)
+    return info
+
+
+async def get_firma_name(stir):
+    info = await get_firma_info(stir)
+    return info[0] if info else "Noma'lum"
+
+
+async def check_firma(stir):
+    return await get_firma_info(stir) is not None
+
+
+# O'qish
+get_all_firms = _reader(database.get_all_firms)
+get_all_stirs = _reader(database.get_all_stirs)
+get_firms_page = _reader(database.get_firms_page)
+count_firms = _reader(database.count_firms)
+search_firms = _reader(database.search_firms)
+fuzzy_search_firms = _reader(database.fuzzy_search_firms)
+check_file = _reader(database.check_file)
+get_manual_report = _reader(database.get_manual_report)
+get_report_employees = _reader(database.get_report_employees)
+get_yagona_report = _reader(database.get_yagona_report)
+get_qqs_report = _reader(database.get_qqs_report)
+get_report_figures = _reader(database.get_report_figures)
+
+# Yozish
+set_user_language = _writer(database.set_user_language)
+add_firma = _writer(database.add_firma)
+bulk_upsert_firms = _writer(database.bulk_upsert_firms)
+update_firma_name = _writer(database.update_firma_name)
+save_file = _writer(database.save_file)
+save_manual_report = _writer(database.save_manual_report)
+save_yagona_report = _writer(database.save_yagona_report)
+save_qqs_report = _writer(database.save_qqs_report)
+bulk_upsert_reports = _writer(database.bulk_upsert_reports)
+save_bulk_reports = _writer(database.save_bulk_reports)
+delete_report_data = _writer(database.delete_report_data)
+
+
+def shutdown():
+    _read_executor.shutdown(wait=True)
+    _write_executor.shutdown(wait=True)
+    # Executorlar to'xtagach ulanishlar hech bir oqimda ishlatilmaydi
+    db_connection.close_all()
+    logger.info("DB executorlari to'xtatildi.")
@@ -0,0 +1,111 @@
+import os
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+from config import DATA_PATH
+from converters import search_latin, search_cyrillic
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = os.path.join(DATA_PATH, "bot.db")
+
+# Har bir ulanish ochilganda bir marta bajariladigan sozlamalar
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",       # WAL rejimida xavfsiz va fsync kamroq
+    "PRAGMA cache_size=-20000",        # ~20 MB sahifa keshi
+    "PRAGMA mmap_size=268435456",      # 256 MB memory-mapped o'qish
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA foreign_keys=ON",
+)
+
+_local = threading.local()
+_connections = []
+_connections_lock = threading.Lock()
+_generation = 0
+
+
+def _connect():
+    os.makedirs(os.path.dirname(DB_PATH) or ".", exist_ok=True)
+    # isolation_level=None: tranzaksiyalarni transaction() o'zi boshqaradi.
+    # check_same_thread=False: ulanish faqat o'z oqimida ishlatiladi, boshqa oqimdan faqat close_all()
+    # yopadi (executorlar to'xtatilgandan keyin, hech qanday so'rov bajarilmayotganda).
+    conn = sqlite3.connect(DB_PATH, timeout=5, isolation_level=None, check_same_thread=False)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    # firms_fts triggerlari ishlatadigan funksiyalar (har bir ulanishda ro'yxatdan o'tishi shart)
+    conn.create_function("search_latin", 1, search_latin, deterministic=True)
+    conn.create_function("search_cyrillic", 1, search_cyrillic, deterministic=True)
+    with _connections_lock:
+        _connections.append(conn)
+    logger.info(f"SQLite ulanishi ochildi: thread={threading.current_thread().name}, db={DB_PATH}")
+    return conn
+
+
+def get_connection():
+    """Joriy oqim (thread) uchun doimiy ulanishni qaytaradi."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.generation != _generation:
+        conn = _connect()
+        _local.conn = conn
+        _local.depth = 0
+        _local.generation = _generation
+    return conn
+
+
+@contextmanager
+def transaction(immediate=False):
+    """Yozish amallari uchun tranzaksiya. Ichma-ich chaqiruvlar tashqi tranzaksiya ichida SAVEPOINT ochadi:
+    ichki blokda xato bo'lsa faqat uning o'zgarishlari bekor qilinadi, tashqi blok davom etishi mumkin."""
+    conn = get_connection()
+    depth = _local.depth
+    savepoint = f"sp_{depth}"
+    if depth == 0:
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    else:
+        conn.execute(f"SAVEPOINT {savepoint}")
+    _local.depth += 1
+    try:
+        yield conn
+    except BaseException:
+        _local.depth -= 1
+        if depth == 0:
+            conn.rollback()
+        else:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+            conn.execute(f"RELEASE {savepoint}")
+        raise
+    else:
+        _local.depth -= 1
+        if depth == 0:
+            conn.commit()
+        else:
+            conn.execute(f"RELEASE {savepoint}")
+
+
+def _reset_after_fork():
+    # Ota jarayonning ulanishlari bola jarayonda ishlatilmaydi (SQLite fork orqali ulashishni qo'llamaydi):
+    # ular yopilmasdan tashlab yuboriladi, bola jarayon kerak bo'lsa o'z ulanishlarini ochadi.
+    global _local, _connections_lock, _generation
+    _local = threading.local()
+    _connections_lock = threading.Lock()
+    _connections.clear()
+    _generation += 1
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def close_all():
+    """Barcha oqimlarning ulanishlarini yopadi. Faqat so'rovlar bajarilmayotganda (to'xtashda) chaqiriladi."""
+    global _generation
+    with _connections_lock:
+        _generation += 1
+        for conn in _connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.error(f"Ulanishni yopishda xato: {e}")
+        _connections.clear()
@@ -0,0 +1,147 @@
+import os
+import csv
+import codecs
+import logging
+from openpyxl import load_workbook
+from config import EXCEL_MAX_ROWS, EXCEL_MAX_FILE_SIZE
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_EVERY = 1000  # progress callback necha qatorda bir chaqiriladi
+SAMPLE_SIZE = 64 * 1024  # kodirovka va ajratuvchini aniqlash uchun o'qiladigan fayl boshi
+CSV_EXTENSIONS = ('.csv', '.tsv')
+TABLE_EXTENSIONS = ('.xlsx',) + CSV_EXTENSIONS
+
+
+class ExcelReadError(ValueError):
+    """Faylni o'qib bo'lmadi (varaq topilmadi va h.k.). Xabar foydalanuvchiga ko'rsatiladi."""
+
+
+class ExcelLimitError(ExcelReadError):
+    """Yuklangan fayl hajmi yoki qatorlar soni cheklovdan oshdi."""
+
+
+def _select_sheet(workbook, sheet_name):
+    """sheet_name: nom (bo'lmasa xato), nomlar ro'yxati (birinchi mavjudi, bo'lmasa faol varaq) yoki None (faol varaq)."""
+    if sheet_name is None:
+        return workbook.active
+    if isinstance(sheet_name, str):
+        if sheet_name not in workbook.sheetnames:
+            raise ExcelReadError(f"Varaq '{sheet_name}' topilmadi.")
+        return workbook[sheet_name]
+    for name in sheet_name:
+        if name in workbook.sheetnames:
+            return workbook[name]
+    return workbook.active
+
+
+def iter_excel_rows(file_path, sheet_name=None, width=None, min_row=2, max_rows=EXCEL_MAX_ROWS,
+                    max_size=EXCEL_MAX_FILE_SIZE, progress=None, numbered=False):
+    """Varaq qatorlarini read_only/values_only rejimida birma-bir qaytaradi (generator).
+
+    Kataklar obyektlari yaratilmaydi, xotira sarfi qatorlar soniga bog'liq emas. width berilsa, har bir qator
+    shu uzunlikka keltiriladi (ortiqcha ustunlar tashlanadi, yetmaganlari None). Bo'sh qatorlar o'tkazib yuboriladi.
+    numbered=True bo'lsa (Excel qator raqami, qator) juftliklari qaytariladi.
+    progress(rows) har PROGRESS_EVERY qatorda va oxirida chaqiriladi. Xatolar ExcelReadError sifatida ko'tariladi.
+    """
+    size = os.path.getsize(file_path)
+    if max_size and size > max_size:
+        raise ExcelLimitError(f"Fayl juda katta: {size // 1024 // 1024} MB (ruxsat etilgan: {max_size // 1024 // 1024} MB)")
+
+    # data_only: formulalar o'rniga Excel saqlagan qiymatlar o'qiladi
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    rows = 0
+    try:
+        sheet = _select_sheet(workbook, sheet_name)
+        # Ba'zi dasturlar o'lchamlarni (A1:A1) noto'g'ri yozadi; read_only rejimida bu qatorlarni kesib qo'yadi
+        sheet.reset_dimensions()
+        for number, row in enumerate(sheet.iter_rows(min_row=min_row, values_only=True), min_row):
+            if not any(cell is not None and cell != '' for cell in row):
+                continue
+            rows += 1
+            if max_rows and rows > max_rows:
+                raise ExcelLimitError(f"Faylda qatorlar juda ko'p (ruxsat etilgan: {max_rows})")
+            if progress and rows % PROGRESS_EVERY == 0:
+                progress(rows)
+            if width is not None and len(row) != width:
+                row = row[:width] + (None,) * (width - len(row))
+            yield (number, row) if numbered else row
+    finally:
+        workbook.close()
+    if progress:
+        progress(rows)
+    logger.info(f"Excel o'qildi: {file_path}, qatorlar={rows}")
+
+
+def is_table_file(file_name):
+    """Yuklash mumkin bo'lgan jadval fayli: .xlsx, .csv yoki .tsv."""
+    return os.path.splitext(file_name or '')[1].lower() in TABLE_EXTENSIONS
+
+
+def detect_encoding(path):
+    """Fayl boshini UTF-8 sifatida o'qib ko'radi, bo'lmasa cp1251 (Windows kirill) deb hisoblaydi."""
+    with open(path, 'rb') as f:
+        head = f.read(SAMPLE_SIZE)
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+        return 'utf-8-sig'
+    except UnicodeDecodeError:
+        return 'cp1251'
+
+
+def _csv_delimiter(file_path, sample):
+    """.tsv — tab; .csv — namunadan aniqlanadi (Excel ba'zi tillarda ';' bilan saqlaydi), aniqlanmasa ','."""
+    if file_path.lower().endswith('.tsv'):
+        return '\t'
+    # Namuna oxiridagi chala qator aniqlashni buzmasligi uchun tashlanadi
+    sample = sample[:sample.rfind('\n') + 1] or sample
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=',;\t').delimiter
+    except csv.Error:
+        return ','
+
+
+def iter_csv_rows(file_path, width=None, min_row=2, max_rows=EXCEL_MAX_ROWS, max_size=EXCEL_MAX_FILE_SIZE,
+                  progress=None, numbered=False):
+    """CSV/TSV qatorlarini oqimli o'qiydi; parametrlar va natija iter_excel_rows bilan bir xil.
+
+    Kodirovka (UTF-8 yoki cp1251) va ajratuvchi fayl boshidan aniqlanadi. Kataklar matn sifatida qaytadi,
+    bo'sh kataklar None ga aylantiriladi.
+    """
+    size = os.path.getsize(file_path)
+    if max_size and size > max_size:
+        raise ExcelLimitError(f"Fayl juda katta: {size // 1024 // 1024} MB (ruxsat etilgan: {max_size // 1024 // 1024} MB)")
+
+    encoding = detect_encoding(file_path)
+    rows = 0
+    with open(file_path, encoding=encoding, newline='') as f:
+        delimiter = _csv_delimiter(file_path, f.read(SAMPLE_SIZE))
+        f.seek(0)
+        reader = csv.reader(f, delimiter=delimiter)
+        try:
+            for number, row in enumerate(reader, 1):
+                if number < min_row or not any(row):
+                    continue
+                rows += 1
+                if max_rows and rows > max_rows:
+                    raise ExcelLimitError(f"Faylda qatorlar juda ko'p (ruxsat etilgan: {max_rows})")
+                if progress and rows % PROGRESS_EVERY == 0:
+                    progress(rows)
+                row = [cell or None for cell in row]
+                if width is not None and len(row) != width:
+                    row = row[:width] + [None] * (width - len(row))
+                yield (number, row) if numbered else row
+        except UnicodeDecodeError as e:
+            raise ExcelReadError(f"Fayl kodirovkasini aniqlab bo'lmadi ({encoding}): {e.reason}, {rows + 1}-qator atrofida")
+        except csv.Error as e:
+            raise ExcelReadError(f"CSV faylni o'qib bo'lmadi: {e}")
+    if progress:
+        progress(rows)
+    logger.info(f"CSV o'qildi: {file_path}, qatorlar={rows}, encoding={encoding}, ajratuvchi={delimiter!r}")
+
+
+def iter_table_rows(file_path, sheet_name=None, **kwargs):
+    """Kengaytmaga qarab .csv/.tsv yoki .xlsx qatorlari; kwargs iter_excel_rows parametrlari."""
+    if os.path.splitext(file_path)[1].lower() in CSV_EXTENSIONS:
+        return iter_csv_rows(file_path, **kwargs)
+    return iter_excel_rows(file_path, sheet_name, **kwargs)
@@ -0,0 +1,167 @@
+import os
+import shutil
+import logging
+import openpyxl
+from converters import transliterate_many
+from excel_reader import iter_csv_rows
+from lang import get_month_name
+from database import REPORT_TABLES
+
+logger = logging.getLogger(__name__)
+
+FIRMA_EXCEL_HEADERS = ["STIR", "Oy", "Firma nomi", "Xodim lavozimi", "Ism Familyasi", "Yil boshidan", "Shu Oy uchun oylik"]
+YAGONA_EXCEL_HEADERS = ["STIR", "Oy", "Firma nomi", "Raxbar", "Soliq turi yagona", "Yil boshidan aylanma", "Shu oy uchun aylanma"]
+
+
+def _firma_excel_rows(stir, oy, firma_nomi, xodimlar, lang):
+    """Sarlavha va xodimlar qatorlari; matnli ustunlar bitta transliterate_many chaqiruvida o'giriladi."""
+    texts = transliterate_many(
+        FIRMA_EXCEL_HEADERS + [firma_nomi] + [x['lavozim'] for x in xodimlar] + [x['ism'] for x in xodimlar],
+        lang
+    )
+    headers = texts[:len(FIRMA_EXCEL_HEADERS)]
+    firma_nomi = texts[len(FIRMA_EXCEL_HEADERS)]
+    lavozimlar = texts[len(FIRMA_EXCEL_HEADERS) + 1:len(FIRMA_EXCEL_HEADERS) + 1 + len(xodimlar)]
+    ismlar = texts[len(FIRMA_EXCEL_HEADERS) + 1 + len(xodimlar):]
+
+    rows = [headers]
+    for i, xodim in enumerate(xodimlar):
+        rows.append([
+            stir if i == 0 else "",
+            get_month_name(lang, oy) if i == 0 else "",
+            firma_nomi if i == 0 else "",
+            lavozimlar[i],
+            ismlar[i],
+            xodim['yil_boshidan'],
+            xodim['shu_oy']
+        ])
+    return rows
+
+
+def generate_firma_excel(stir, oy, firma_nomi, xodimlar, dest_path_latin, dest_path_cyrillic):
+    try:
+        # Lotin tilida fayl yaratish
+        workbook_latin = openpyxl.Workbook()
+        sheet_latin = workbook_latin.active
+        sheet_latin.title = "Sheet1"
+        for row in _firma_excel_rows(stir, oy, firma_nomi, xodimlar, 'uz_latin'):
+            sheet_latin.append(row)
+
+        os.makedirs(os.path.dirname(dest_path_latin), exist_ok=True)
+        workbook_latin.save(dest_path_latin)
+        logger.info(f"Yangi Excel fayli yaratildi (lotin): {dest_path_latin}")
+
+        # Kirill tilida fayl yaratish
+        workbook_cyrillic = openpyxl.Workbook()
+        sheet_cyrillic = workbook_cyrillic.active
+        sheet_cyrillic.title = "Лист1"
+        for row in _firma_excel_rows(stir, oy, firma_nomi, xodimlar, 'uz_cyrillic'):
+            sheet_cyrillic.append(row)
+
+        os.makedirs(os.path.dirname(dest_path_cyrillic), exist_ok=True)
+        workbook_cyrillic.save(dest_path_cyrillic)
+        logger.info(f"Yangi Excel fayli yaratildi (kirill): {dest_path_cyrillic}")
+
+        return True
+    except Exception as e:
+        logger.error(f"Excel faylini yaratishda xato: {e}")
+        return False
+
+
+def generate_yagona_excel(stir, oy, firma_nomi, rahbar, soliq_turi_yagona, yil_boshidan_aylanma, shu_oy_aylanma, dest_path_latin, dest_path_cyrillic):
+    try:
+        # Lotin tilida fayl yaratish
+        workbook_latin = openpyxl.Workbook()
+        sheet_latin = workbook_latin.active
+        sheet_latin.title = "Sheet1"
+        *headers_latin, firma_nomi_latin, rahbar_latin = transliterate_many(YAGONA_EXCEL_HEADERS + [firma_nomi, rahbar], 'uz_latin')
+        sheet_latin.append(headers_latin)
+        row = [
+            stir,
+            get_month_name('uz_latin', oy),
+            firma_nomi_latin,
+            rahbar_latin,
+            soliq_turi_yagona,
+            yil_boshidan_aylanma,
+            shu_oy_aylanma
+        ]
+        sheet_latin.append(row)
+
+        os.makedirs(os.path.dirname(dest_path_latin), exist_ok=True)
+        workbook_latin.save(dest_path_latin)
+        logger.info(f"Yagona Excel fayli yaratildi (lotin): {dest_path_latin}")
+
+        # Kirill tilida fayl yaratish
+        workbook_cyrillic = openpyxl.Workbook()
+        sheet_cyrillic = workbook_cyrillic.active
+        sheet_cyrillic.title = "Лист1"
+        *headers_cyrillic, firma_nomi_cyrillic, rahbar_cyrillic = transliterate_many(YAGONA_EXCEL_HEADERS + [firma_nomi, rahbar], 'uz_cyrillic')
+        sheet_cyrillic.append(headers_cyrillic)
+        row = [
+            stir,
+            get_month_name('uz_cyrillic', oy),
+            firma_nomi_cyrillic,
+            rahbar_cyrillic,
+            soliq_turi_yagona,
+            yil_boshidan_aylanma,
+            shu_oy_aylanma
+        ]
+        sheet_cyrillic.append(row)
+
+        os.makedirs(os.path.dirname(dest_path_cyrillic), exist_ok=True)
+        workbook_cyrillic.save(dest_path_cyrillic)
+        logger.info(f"Yagona Excel fayli yaratildi (kirill): {dest_path_cyrillic}")
+
+        return True
+    except Exception as e:
+        logger.error(f"Yagona Excel faylini yaratishda xato: {e}")
+        return False
+
+
+def _csv_cell(value):
+    # Raqamlar Excelda son bo'lib qolishi uchun; 0 bilan boshlanadigan kodlar matn sifatida saqlanadi
+    if value is not None and value.isdigit() and (value[0] != '0' or len(value) == 1):
+        return int(value)
+    return value
+
+
+def convert_csv_to_xlsx(src, dest_path_latin, dest_path_cyrillic):
+    """Yuklangan CSV/TSV faylni arxiv uchun .xlsx ga o'giradi (write_only rejimida, qatorma-qator).
+
+    Arxivdagi 1-Excel fayllar doim .xlsx bo'lib qoladi; ikkala yo'lga bir xil fayl yoziladi.
+    """
+    try:
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet("Sheet1")
+        for row in iter_csv_rows(src, min_row=1):
+            sheet.append([_csv_cell(value) for value in row])
+        os.makedirs(os.path.dirname(dest_path_latin), exist_ok=True)
+        workbook.save(dest_path_latin)
+        os.makedirs(os.path.dirname(dest_path_cyrillic), exist_ok=True)
+        shutil.copy(dest_path_latin, dest_path_cyrillic)
+        logger.info(f"CSV fayl Excelga o'girildi: {src} -> {dest_path_latin}, {dest_path_cyrillic}")
+        return True
+    except Exception as e:
+        logger.error(f"CSV faylni Excelga o'girishda xato: {e}, fayl: {src}")
+        return False
+
+
+def write_report_files(soliq_turi, items):
+    """Ommaviy yuklash: har bir firma-oy uchun lotin va kirill fayllarini yaratadi (worker jarayonida bajariladi).
+
+    items: [(yozuv, lotin yo'li, kirill yo'li), ...], yozuv — parser natijasidagi lug'at.
+    Natija: fayllari yaratilgan (stir, oy) kalitlari ro'yxati.
+    """
+    written = []
+    for firm, dest_path_latin, dest_path_cyrillic in items:
+        stir, oy = firm['stir'], firm['oy']
+        if soliq_turi == 'daromad':
+            ok = generate_firma_excel(stir, oy, firm['firma_nomi'], firm['xodimlar'], dest_path_latin, dest_path_cyrillic)
+        else:
+            # QQS fayllari ham yagona shablonida yoziladi (qo'lda kiritishdagidek)
+            _, stavka, yil_boshidan, shu_oy, _ = REPORT_TABLES[soliq_turi]
+            ok = generate_yagona_excel(stir, oy, firm['firma_nomi'], firm['rahbar'], firm[stavka], firm[yil_boshidan], firm[shu_oy],
+                                       dest_path_latin, dest_path_cyrillic)
+        if ok:
+            written.append((stir, oy))
+    return written
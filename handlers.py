@@ -5,11 +5,14 @@ from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters.state import State, StatesGroup
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from loader import dp, bot
-from database import get_firma_name, get_firma_info, check_firma, get_manual_report, check_file, get_user_language, set_user_language
+import db
+import workers
+from database import EMPLOYEE_LINE_RE
 from config import DATA_PATH
 from lang import get_text, get_month_name, translate_text
 from parser_yagona import generate_yagona_summary, generate_qqs_summary
 from converters import convert_to_cyrillic, convert_to_latin
+from translit_files import FILE_CONVERTERS, convert_file
 import logging
 
 logger = logging.getLogger(__name__)
@@ -40,7 +43,7 @@ async def process_language_selection(callback_query: types.CallbackQuery, state:
     await callback_query.answer()
     user_id = callback_query.from_user.id
     lang = callback_query.data.replace('set_lang_', '')  # uz_latin yoki uz_cyrillic
-    set_user_language(user_id, lang)
+    await db.set_user_language(user_id, lang)
     logger.info(f"Til o'zgartirildi: user_id={user_id}, lang={lang}")
     await callback_query.message.answer(get_text(lang, 'language_set'))
     await callback_query.message.answer(get_text(lang, 'welcome'))
@@ -49,21 +52,21 @@ async def process_language_selection(callback_query: types.CallbackQuery, state:
 @dp.message_handler(commands=['translate_latin'], state='*')
 async def translate_to_latin_command(message: types.Message, state: FSMContext):
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     await message.answer(get_text(lang, 'enter_cyrillic_text'))
     await TranslateState.waiting_for_cyrillic_text.set()
 
 @dp.message_handler(commands=['translate_cyrillic'], state='*')
 async def translate_to_cyrillic_command(message: types.Message, state: FSMContext):
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     await message.answer(get_text(lang, 'enter_latin_text'))
     await TranslateState.waiting_for_latin_text.set()
 
 @dp.message_handler(state=TranslateState.waiting_for_latin_text)
 async def process_latin_text(message: types.Message, state: FSMContext):
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     text = message.text.strip()
     translated_text = convert_to_cyrillic(text)
     await message.answer(get_text(lang, 'translated_text', text=translated_text))
@@ -72,21 +75,55 @@ async def process_latin_text(message: types.Message, state: FSMContext):
 @dp.message_handler(state=TranslateState.waiting_for_cyrillic_text)
 async def process_cyrillic_text(message: types.Message, state: FSMContext):
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     text = message.text.strip()
     translated_text = convert_to_latin(text)
     await message.answer(get_text(lang, 'translated_text', text=translated_text))
     await state.finish()
 
+@dp.message_handler(content_types=['document'], state=[TranslateState.waiting_for_latin_text, TranslateState.waiting_for_cyrillic_text])
+async def process_translate_document(message: types.Message, state: FSMContext):
+    user_id = message.from_user.id
+    lang = await db.get_user_language(user_id)
+    target = 'uz_cyrillic' if await state.get_state() == TranslateState.waiting_for_latin_text.state else 'uz_latin'
+    file_name = message.document.file_name or ''
+    name, ext = os.path.splitext(file_name)
+    ext = ext.lower()
+    if ext not in FILE_CONVERTERS:
+        await message.answer(get_text(lang, 'err_translit_file_type'))
+        return
+
+    src = os.path.join(DATA_PATH, "temp", f"translit_{user_id}_{message.message_id}{ext}")
+    dst = os.path.join(DATA_PATH, "temp", f"translit_{user_id}_{message.message_id}_{target}{ext}")
+    os.makedirs(os.path.dirname(src), exist_ok=True)
+    try:
+        await message.document.download(destination_file=src)
+        # Katta fayllar event loopni to'xtatmasligi uchun worker jarayonida o'giriladi
+        await workers.excel_pool.submit(convert_file, src, dst, target)
+        await message.answer_document(types.InputFile(dst, filename=f"{convert_file_name(name, target)}{ext}"))
+    except Exception as e:
+        logger.error(f"Faylni o'girishda xato: {e}, user_id={user_id}, file={file_name}")
+        await message.answer(get_text(lang, 'err_translit_file'))
+    finally:
+        for path in (src, dst):
+            if os.path.exists(path):
+                os.remove(path)
+    await state.finish()
+
+
+def convert_file_name(name, target):
+    return convert_to_cyrillic(name) if target == 'uz_cyrillic' else convert_to_latin(name)
+
+
 @dp.message_handler(lambda msg: re.match(r'^\d{9}$', msg.text.strip()))
 async def select_tax_type(message: types.Message):
     stir = message.text.strip()
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     logger.info(f"select_tax_type: user_id={user_id}, lang={lang}, stir={stir}")
 
     # Firma ma'lumotlarini olish
-    firma_info = get_firma_info(stir)
+    firma_info = await db.get_firma_info(stir)
     if not firma_info:
         await message.answer(get_text(lang, 'invalid_stir'), parse_mode='Markdown')
         logger.warning(f"Firma topilmadi: STIR={stir}")
@@ -103,26 +140,26 @@ async def select_tax_type(message: types.Message):
 
     # Tugmalarni qo‘shish (kichik harflarni tekshirish)
     if 'ds' in soliq_turlari:
-        keyboard.add(InlineKeyboardButton(translate_text("Daromad solig'i", lang), callback_data=f"soliq_daromad_{stir}"))
+        keyboard.add(InlineKeyboardButton(get_text(lang, 'tax_daromad'), callback_data=f"soliq_daromad_{stir}"))
     if 'ys' in soliq_turlari:
-        keyboard.add(InlineKeyboardButton(translate_text("Yagona soliq", lang), callback_data=f"soliq_yagona_{stir}"))
+        keyboard.add(InlineKeyboardButton(get_text(lang, 'tax_yagona'), callback_data=f"soliq_yagona_{stir}"))
     if 'qqs' in soliq_turlari:
-        keyboard.add(InlineKeyboardButton(translate_text("Qo‘shilgan qiymat solig‘i", lang), callback_data=f"soliq_qqs_{stir}"))
+        keyboard.add(InlineKeyboardButton(get_text(lang, 'tax_qqs'), callback_data=f"soliq_qqs_{stir}"))
 
     # Agar tugmalar qo‘shilmagan bo‘lsa, standart tugmalar
     if not keyboard.inline_keyboard:
         logger.warning(f"No buttons added for soliq_turi: {soliq_turi}, adding default buttons")
         keyboard.add(
-            InlineKeyboardButton(translate_text("Daromad solig'i", lang), callback_data=f"soliq_daromad_{stir}"),
-            InlineKeyboardButton(translate_text("Yagona soliq", lang), callback_data=f"soliq_yagona_{stir}")
+            InlineKeyboardButton(get_text(lang, 'tax_daromad'), callback_data=f"soliq_daromad_{stir}"),
+            InlineKeyboardButton(get_text(lang, 'tax_yagona'), callback_data=f"soliq_yagona_{stir}")
         )
 
     
 
     # Firma ma'lumotlarini ko'rsatish
     firma_nomi = translate_text(name, lang)
-    rahbar = translate_text(rahbar, lang) if rahbar else translate_text("Noma'lum", lang)
-    soliq_turi_text = translate_text(soliq_turi, lang) if soliq_turi else translate_text("Noma'lum", lang)
+    rahbar = translate_text(rahbar, lang) if rahbar else get_text(lang, 'label_unknown')
+    soliq_turi_text = translate_text(soliq_turi, lang) if soliq_turi else get_text(lang, 'label_unknown')
     ds_stavka = ds_stavka if ds_stavka else "Noma'lum"
     ys_stavka = ys_stavka if ys_stavka else "Noma'lum"
     qqs_stavka = qqs_stavka if qqs_stavka else "Noma'lum"
@@ -142,6 +179,27 @@ async def select_tax_type(message: types.Message):
     logger.info(f"Keyboard sent: {keyboard.inline_keyboard}")
 
 
+def format_xodimlar(employees, xodimlar_data, lang):
+    """Xodimlar ro'yxatini report_employees qatorlaridan chiqaradi; qatorlar bo'lmasa eski matnni qayta formatlaydi."""
+    bu_oy = get_text(lang, 'label_this_month')
+    yil_boshidan_label = get_text(lang, 'label_since_year_start')
+    som = get_text(lang, 'label_som')
+    if employees:
+        return "\n".join(
+            f"{tartib} ({lavozim}) – {ism}, {bu_oy}: {shu_oy:,} {som} ({yil_boshidan_label}: {yil_boshidan:,} {som})"
+            for tartib, lavozim, ism, shu_oy, yil_boshidan in employees
+        )
+    formatted_xodimlar_data = []
+    for line in (xodimlar_data or "").split("\n"):
+        match = EMPLOYEE_LINE_RE.match(line)
+        if match:
+            index, lavozim, ism, _, shu_oy, _, _, yil_boshidan, _ = match.groups()
+            formatted_xodimlar_data.append(f"{index} ({lavozim}) – {ism}, {bu_oy}: {shu_oy} {som} ({yil_boshidan_label}: {yil_boshidan} {som})")
+        else:
+            formatted_xodimlar_data.append(line)
+    return "\n".join(formatted_xodimlar_data)
+
+
 async def send_report_files_only(stir, soliq_turi, oy, user_id, lang):
     logger.info(f"send_report_files_only: user_id={user_id}, stir={stir}, soliq_turi={soliq_turi}, oy={oy}, lang={lang}")
     file_types = ['excel1', 'excel2', 'html']
@@ -151,7 +209,7 @@ async def send_report_files_only(stir, soliq_turi, oy, user_id, lang):
 
     for file_type in file_types:
         db_file_type = f"{file_type}_{preferred_lang}" if file_type != 'html' else 'html'
-        file_path = check_file(stir, soliq_turi, oy.lower(), db_file_type)
+        file_path = await db.check_file(stir, soliq_turi, oy.lower(), db_file_type)
         logger.info(f"Fayl qidirilmoqda: file_type={db_file_type}, file_path={file_path}")
 
         if file_path:
@@ -163,7 +221,7 @@ async def send_report_files_only(stir, soliq_turi, oy, user_id, lang):
                         await bot.send_document(
                             user_id,
                             f,
-                            caption=translate_text(f"{os.path.basename(normalized_path)} fayli", lang),
+                            caption=get_text(lang, 'file_caption', name=translate_text(os.path.basename(normalized_path), lang)),
                             parse_mode='HTML'
                         )
                     logger.info(f"Fayl yuborildi: {normalized_path}, user_id={user_id}")
@@ -172,21 +230,21 @@ async def send_report_files_only(stir, soliq_turi, oy, user_id, lang):
                     logger.error(f"Fayl yuborishda xato: file_path={normalized_path}, user_id={user_id}, xato={str(e)}")
                     await bot.send_message(
                         user_id,
-                        translate_text(f"❌ Fayl yuborishda xato: {os.path.basename(normalized_path)} - {str(e)}", lang),
+                        get_text(lang, 'err_file_send', name=translate_text(os.path.basename(normalized_path), lang), error=translate_text(str(e), lang)),
                         parse_mode='HTML'
                     )
             else:
                 logger.warning(f"Fayl diskda mavjud emas: {normalized_path}, file_type={db_file_type}")
                 await bot.send_message(
                     user_id,
-                    translate_text(f"❌ Fayl diskda topilmadi: {os.path.basename(normalized_path)}", lang),
+                    get_text(lang, 'err_file_missing_on_disk', name=translate_text(os.path.basename(normalized_path), lang)),
                     parse_mode='HTML'
                 )
         else:
             # Fallback faylni sinab ko'rish
             if file_type != 'html':
                 db_file_type = f"{file_type}_{fallback_lang}"
-                file_path = check_file(stir, soliq_turi, oy.lower(), db_file_type)
+                file_path = await db.check_file(stir, soliq_turi, oy.lower(), db_file_type)
                 logger.info(f"Fallback fayl qidirilmoqda: file_type={db_file_type}, file_path={file_path}")
                 if file_path:
                     normalized_path = os.path.normpath(file_path)
@@ -196,7 +254,7 @@ async def send_report_files_only(stir, soliq_turi, oy, user_id, lang):
                                 await bot.send_document(
                                     user_id,
                                     f,
-                                    caption=translate_text(f"{os.path.basename(normalized_path)} fayli", lang),
+                                    caption=get_text(lang, 'file_caption', name=translate_text(os.path.basename(normalized_path), lang)),
                                     parse_mode='HTML'
                                 )
                             logger.info(f"Fallback fayl yuborildi: {normalized_path}, user_id={user_id}")
@@ -205,28 +263,28 @@ async def send_report_files_only(stir, soliq_turi, oy, user_id, lang):
                             logger.error(f"Fallback fayl yuborishda xato: file_path={normalized_path}, user_id={user_id}, xato={str(e)}")
                             await bot.send_message(
                                 user_id,
-                                translate_text(f"❌ Fallback fayl yuborishda xato: {os.path.basename(normalized_path)} - {str(e)}", lang),
+                                get_text(lang, 'err_fallback_send', name=translate_text(os.path.basename(normalized_path), lang), error=translate_text(str(e), lang)),
                                 parse_mode='HTML'
                             )
                     else:
                         logger.warning(f"Fallback fayl diskda mavjud emas: {normalized_path}, file_type={db_file_type}")
                         await bot.send_message(
                             user_id,
-                            translate_text(f"❌ Fallback fayl diskda topilmadi: {os.path.basename(normalized_path)}", lang),
+                            get_text(lang, 'err_fallback_missing_on_disk', name=translate_text(os.path.basename(normalized_path), lang)),
                             parse_mode='HTML'
                         )
                 else:
                     logger.warning(f"Fallback fayl bazada topilmadi: file_type={db_file_type}, stir={stir}, soliq_turi={soliq_turi}, oy={oy}")
                     await bot.send_message(
                         user_id,
-                        translate_text(f"❌ {db_file_type} fayli ma'lumotlar bazasida topilmadi.", lang),
+                        get_text(lang, 'err_file_not_in_db', file_type=translate_text(db_file_type, lang)),
                         parse_mode='HTML'
                     )
 
     if not files_found:
         await bot.send_message(
             user_id,
-            translate_text(f"❌ {get_month_name(lang, oy)} uchun {soliq_turi} fayli topilmadi.", lang),
+            get_text(lang, 'err_month_file_not_found', oy=get_month_name(lang, oy), soliq_turi=translate_text(soliq_turi, lang)),
             parse_mode='HTML'
         )
         logger.error(f"Hech qanday fayl topilmadi: stir={stir}, soliq_turi={soliq_turi}, oy={oy}")
@@ -243,7 +301,7 @@ async def send_report_files(stir, soliq_turi, oy, user_id, lang):
 
     for file_type in file_types:
         db_file_type = f"{file_type}_{preferred_lang}" if file_type != 'html' else 'html'
-        file_path = check_file(stir, soliq_turi, oy.lower(), db_file_type)
+        file_path = await db.check_file(stir, soliq_turi, oy.lower(), db_file_type)
         logger.info(f"Fayl qidirilmoqda: file_type={db_file_type}, file_path={file_path}")
 
         if file_path:
@@ -255,7 +313,7 @@ async def send_report_files(stir, soliq_turi, oy, user_id, lang):
                         await bot.send_document(
                             user_id,
                             f,
-                            caption=translate_text(f"{os.path.basename(normalized_path)} fayli", lang),
+                            caption=get_text(lang, 'file_caption', name=translate_text(os.path.basename(normalized_path), lang)),
                             parse_mode='HTML'
                         )
                     logger.info(f"Fayl yuborildi: {normalized_path}, user_id={user_id}")
@@ -264,21 +322,21 @@ async def send_report_files(stir, soliq_turi, oy, user_id, lang):
                     logger.error(f"Fayl yuborishda xato: file_path={normalized_path}, user_id={user_id}, xato={str(e)}")
                     await bot.send_message(
                         user_id,
-                        translate_text(f"❌ Fayl yuborishda xato: {os.path.basename(normalized_path)} - {str(e)}", lang),
+                        get_text(lang, 'err_file_send', name=translate_text(os.path.basename(normalized_path), lang), error=translate_text(str(e), lang)),
                         parse_mode='HTML'
                     )
             else:
                 logger.warning(f"Fayl diskda mavjud emas: {normalized_path}, file_type={db_file_type}")
                 await bot.send_message(
                     user_id,
-                    translate_text(f"❌ Fayl diskda topilmadi: {os.path.basename(normalized_path)}", lang),
+                    get_text(lang, 'err_file_missing_on_disk', name=translate_text(os.path.basename(normalized_path), lang)),
                     parse_mode='HTML'
                 )
         else:
             # Fallback faylni sinab ko'rish
             if file_type != 'html':
                 db_file_type = f"{file_type}_{fallback_lang}"
-                file_path = check_file(stir, soliq_turi, oy.lower(), db_file_type)
+                file_path = await db.check_file(stir, soliq_turi, oy.lower(), db_file_type)
                 logger.info(f"Fallback fayl qidirilmoqda: file_type={db_file_type}, file_path={file_path}")
                 if file_path:
                     normalized_path = os.path.normpath(file_path)
@@ -288,7 +346,7 @@ async def send_report_files(stir, soliq_turi, oy, user_id, lang):
                                 await bot.send_document(
                                     user_id,
                                     f,
-                                    caption=translate_text(f"{os.path.basename(normalized_path)} fayli", lang),
+                                    caption=get_text(lang, 'file_caption', name=translate_text(os.path.basename(normalized_path), lang)),
                                     parse_mode='HTML'
                                 )
                             logger.info(f"Fallback fayl yuborildi: {normalized_path}, user_id={user_id}")
@@ -297,40 +355,31 @@ async def send_report_files(stir, soliq_turi, oy, user_id, lang):
                             logger.error(f"Fallback fayl yuborishda xato: file_path={normalized_path}, user_id={user_id}, xato={str(e)}")
                             await bot.send_message(
                                 user_id,
-                                translate_text(f"❌ Fallback fayl yuborishda xato: {os.path.basename(normalized_path)} - {str(e)}", lang),
+                                get_text(lang, 'err_fallback_send', name=translate_text(os.path.basename(normalized_path), lang), error=translate_text(str(e), lang)),
                                 parse_mode='HTML'
                             )
                     else:
                         logger.warning(f"Fallback fayl diskda mavjud emas: {normalized_path}, file_type={db_file_type}")
                         await bot.send_message(
                             user_id,
-                            translate_text(f"❌ Fallback fayl diskda topilmadi: {os.path.basename(normalized_path)}", lang),
+                            get_text(lang, 'err_fallback_missing_on_disk', name=translate_text(os.path.basename(normalized_path), lang)),
                             parse_mode='HTML'
                         )
                 else:
                     logger.warning(f"Fallback fayl bazada topilmadi: file_type={db_file_type}, stir={stir}, soliq_turi={soliq_turi}, oy={oy}")
                     await bot.send_message(
                         user_id,
-                        translate_text(f"❌ {db_file_type} fayli ma'lumotlar bazasida topilmadi.", lang),
+                        get_text(lang, 'err_file_not_in_db', file_type=translate_text(db_file_type, lang)),
                         parse_mode='HTML'
                     )
 
     # Matn ko‘rinishidagi hisobotni yuborish
     if soliq_turi == "daromad":
-        report = get_manual_report(stir, oy)
+        report = await db.get_manual_report(stir, oy)
         if report:
             _, _, _, firma_name, xodimlar_soni, xodimlar_data, hisobot_davri_oylik, jami_oylik, soliq = report
-            xodimlar_lines = xodimlar_data.split("\n")
-            formatted_xodimlar_data = []
-            for line in xodimlar_lines:
-                match = re.match(r'^(\d+) \((.*?)\) – (.*?), (.*?): ([\d,]+) (.*?)\s*\((.*?): ([\d,]+) (.*?)\)$', line)
-                if match:
-                    index, lavozim, ism, _, shu_oy, _, _, yil_boshidan, _ = match.groups()
-                    formatted_line = f"{index} ({lavozim}) – {ism}, {translate_text('bu_oy_uchun_hisobotda', lang)}: {shu_oy} {translate_text('so‘m', lang)} ({translate_text('yil_boshidan_hisobotda', lang)}: {yil_boshidan} {translate_text('so‘m', lang)})"
-                    formatted_xodimlar_data.append(formatted_line)
-                else:
-                    formatted_xodimlar_data.append(line)
-            xodimlar_data_translated = "\n".join(formatted_xodimlar_data)
+            employees = await db.get_report_employees(stir, oy)
+            xodimlar_data_translated = format_xodimlar(employees, xodimlar_data, lang)
             firma_name_translated = translate_text(firma_name, lang)
             result = get_text(lang, 'daromad_report',
                               firma_name=firma_name_translated,
@@ -344,16 +393,16 @@ async def send_report_files(stir, soliq_turi, oy, user_id, lang):
         else:
             await bot.send_message(user_id, get_text(lang, 'no_manual_report', oy=get_month_name(lang, oy)))
     elif soliq_turi == "yagona":
-        summary = generate_yagona_summary(stir, oy, lang)
+        summary = await db.run_read(generate_yagona_summary, stir, oy, lang)
         await bot.send_message(user_id, summary, parse_mode='Markdown')
     elif soliq_turi == "qqs":
-        summary = generate_qqs_summary(stir, oy, lang)
+        summary = await db.run_read(generate_qqs_summary, stir, oy, lang)
         await bot.send_message(user_id, summary, parse_mode='Markdown')
 
     if not files_found:
         await bot.send_message(
             user_id,
-            translate_text(f"❌ {get_month_name(lang, oy)} uchun {soliq_turi} fayli topilmadi.", lang),
+            get_text(lang, 'err_month_file_not_found', oy=get_month_name(lang, oy), soliq_turi=translate_text(soliq_turi, lang)),
             parse_mode='HTML'
         )
         logger.error(f"Hech qanday fayl topilmadi: stir={stir}, soliq_turi={soliq_turi}, oy={oy}")
@@ -366,7 +415,7 @@ async def send_report_files(stir, soliq_turi, oy, user_id, lang):
 @dp.callback_query_handler(lambda c: c.data.startswith("soliq_"))
 async def select_month_handler(callback_query: types.CallbackQuery):
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     _, soliq_turi, stir = callback_query.data.split("_")
 
     # Inline keyboard yaratish
@@ -396,7 +445,7 @@ async def select_month_handler(callback_query: types.CallbackQuery):
 async def process_report_files(callback_query: types.CallbackQuery):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     logger.info(f"process_report_files: user_id={user_id}, lang={lang}")
     _, soliq_turi, stir, oy = callback_query.data.split("_")
 
@@ -408,21 +457,12 @@ async def process_report_files(callback_query: types.CallbackQuery):
 
     # Soliq turiga qarab qo‘shimcha ma'lumotlar
     if soliq_turi == "daromad":
-        report = get_manual_report(stir, oy)
+        report = await db.get_manual_report(stir, oy)
         if report:
             _, _, _, firma_name, xodimlar_soni, xodimlar_data, hisobot_davri_oylik, jami_oylik, soliq = report
             # Xodimlar ma'lumotlarini qayta formatlash
-            xodimlar_lines = xodimlar_data.split("\n")
-            formatted_xodimlar_data = []
-            for line in xodimlar_lines:
-                match = re.match(r'^(\d+) \((.*?)\) – (.*?), (.*?): ([\d,]+) (.*?)\s*\((.*?): ([\d,]+) (.*?)\)$', line)
-                if match:
-                    index, lavozim, ism, _, shu_oy, _, _, yil_boshidan, _ = match.groups()
-                    formatted_line = f"{index} ({lavozim}) – {ism}, {translate_text('bu_oy_uchun_hisobotda', lang)}: {shu_oy} {translate_text('so‘m', lang)} ({translate_text('yil_boshidan_hisobotda', lang)}: {yil_boshidan} {translate_text('so‘m', lang)})"
-                    formatted_xodimlar_data.append(formatted_line)
-                else:
-                    formatted_xodimlar_data.append(line)
-            xodimlar_data_translated = "\n".join(formatted_xodimlar_data)
+            employees = await db.get_report_employees(stir, oy)
+            xodimlar_data_translated = format_xodimlar(employees, xodimlar_data, lang)
             firma_name_translated = translate_text(firma_name, lang)
             result = get_text(lang, 'daromad_report',
                               firma_name=firma_name_translated,
@@ -435,25 +475,25 @@ async def process_report_files(callback_query: types.CallbackQuery):
             await bot.send_message(callback_query.from_user.id, result)
         else:
             keyboard = InlineKeyboardMarkup(row_width=1)
-            keyboard.add(InlineKeyboardButton(translate_text("Admin panelda qo'lda kiritish", lang), callback_data="manual_input"))
+            keyboard.add(InlineKeyboardButton(get_text(lang, 'btn_manual_in_admin'), callback_data="manual_input"))
             await bot.send_message(
                 callback_query.from_user.id,
                 get_text(lang, 'no_manual_report', oy=get_month_name(lang, oy)),
                 reply_markup=keyboard
             )
     elif soliq_turi == "yagona":
-        firma_name = get_firma_name(stir)
-        summary = generate_yagona_summary(stir, oy, lang)
+        firma_name = await db.get_firma_name(stir)
+        summary = await db.run_read(generate_yagona_summary, stir, oy, lang)
         await bot.send_message(callback_query.from_user.id, summary)
     elif soliq_turi == "qqs":
-        firma_name = get_firma_name(stir)
-        summary = generate_qqs_summary(stir, oy, lang)
+        firma_name = await db.get_firma_name(stir)
+        summary = await db.run_read(generate_qqs_summary, stir, oy, lang)
         await bot.send_message(callback_query.from_user.id, summary)
 
     keyboard = InlineKeyboardMarkup(row_width=2)
     keyboard.add(
-        InlineKeyboardButton(translate_text("Soliq turini qayta tanlash", lang), callback_data=f"soliq_{soliq_turi}_{stir}"),
-        InlineKeyboardButton(translate_text("Boshqa firma tanlash", lang), callback_data="start")
+        InlineKeyboardButton(get_text(lang, 'btn_reselect_tax_type'), callback_data=f"soliq_{soliq_turi}_{stir}"),
+        InlineKeyboardButton(get_text(lang, 'btn_other_firma'), callback_data="start")
     )
     await bot.send_message(callback_query.from_user.id, get_text(lang, 'back_options'), reply_markup=keyboard)
 
@@ -462,34 +502,34 @@ async def process_report_files(callback_query: types.CallbackQuery):
 async def restart_handler(callback_query: types.CallbackQuery):
     await bot.answer_callback_query(callback_query.id)
     user_id = callback_query.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     logger.info(f"restart_handler: user_id={user_id}, lang={lang}")
     await bot.send_message(callback_query.from_user.id, get_text(lang, 'welcome'))
 
 @dp.message_handler(commands=['search_firma'])
 async def search_firma_command(message: types.Message):
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     logger.info(f"search_firma_command: user_id={user_id}, lang={lang}")
-    await message.answer(translate_text("Firma STIR raqamini kiriting (9 raqam, masalan: 123456789):", lang))
+    await message.answer(get_text(lang, 'prompt_stir'))
     await SearchFirma.waiting_for_stir.set()
 
 @dp.message_handler(state=SearchFirma.waiting_for_stir)
 async def process_firma_search(message: types.Message, state: FSMContext):
     user_id = message.from_user.id
-    lang = get_user_language(user_id)
+    lang = await db.get_user_language(user_id)
     stir = message.text.strip()
     logger.info(f"STIR kiritildi: '{stir}', uzunligi: {len(stir)}, faqat raqamlar: {stir.isdigit()}")
 
     if not stir.isdigit() or len(stir) != 9:
-        await message.answer(translate_text("❌ STIR 9 raqamdan iborat bo'lishi kerak.", lang))
+        await message.answer(get_text(lang, 'err_stir_digits'))
         logger.error(f"Noto'g'ri STIR formati: '{stir}'")
         await state.finish()
         return
 
-    firma_info = get_firma_info(stir)
+    firma_info = await db.get_firma_info(stir)
     if not firma_info:
-        await message.answer(translate_text("❌ Bu STIR bo'yicha firma topilmadi.", lang))
+        await message.answer(get_text(lang, 'err_stir_not_found'))
         logger.warning(f"Firma topilmadi: STIR={stir}")
         await state.finish()
         return
@@ -512,4 +552,4 @@ async def process_firma_search(message: types.Message, state: FSMContext):
                        ys_stavka=ys_stavka,
                        qqs_stavka=qqs_stavka)
     await message.answer(response)
-    await state.finish()
\ No newline at end of file
+    await state.finish()
@@ -1,4 +1,15 @@
-from converters import convert_to_cyrillic, convert_to_latin
+import logging
+from string import Formatter
+from converters import convert_to_cyrillic, convert_to_latin, reload_transliterators
+from cache import LRUCache, MISSING
+from config import TRANSLATE_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# (lang, text) -> natija; tugma matnlari, oy va firma nomlari qayta-qayta o'giriladi
+translate_cache = LRUCache("translate_text", maxsize=TRANSLATE_CACHE_SIZE)
+# Foydalanuvchi yuborgan uzun matnlar keshga yozilmaydi
+TRANSLATE_CACHE_MAX_LEN = 256
 
 LANGUAGES = {
     'uz_latin': {
@@ -147,26 +158,248 @@ LANGUAGES = {
     }
 }
 
+# Handlerlardagi o'zgarmas UI matnlari (lotin manbasi). Ikkala yozuvdagi shakli build_ui_catalog()
+# tomonidan ishga tushishda bir marta tayyorlanadi, so'rov vaqtida transliteratsiya qilinmaydi.
+UI_TEXTS = {
+    # Tugmalar
+    'btn_confirm': "Tasdiqlash",
+    'btn_edit': "Tahrirlash",
+    'btn_cancel': "Bekor qilish",
+    'btn_delete_yes': "Ha, o'chirish",
+    'btn_delete_no': "Yo'q, bekor qilish",
+    'btn_prev': "⬅️ Oldingi",
+    'btn_next': "Keyingi ➡️",
+    'btn_search': "🔍 Qidirish",
+    'btn_back': "🔙 Orqaga",
+    'btn_back_plain': "Orqaga",
+    'btn_back_to_admin': "Admin paneliga qaytish",
+    'btn_add_firma': "Yangi firma qo'shish",
+    'btn_add_firms_excel': "Excel orqali firmalar qo'shish",
+    'btn_edit_firma': "Firma tahrirlash",
+    'btn_upload_files': "Fayl yuklash",
+    'btn_bulk_upload': "Ommaviy hisobot yuklash",
+    'btn_manual_input': "Qo'lda hisobot kiritish",
+    'btn_delete_report': "Hisobot o'chirish",
+    'btn_list_firmas': "Firmalar ro'yxati",
+    'btn_excel_upload': "Excel fayl yuklash",
+    'btn_manual_entry': "Qo'lda kiritish",
+    'btn_manual_in_admin': "Admin panelda qo'lda kiritish",
+    'btn_other_firma': "Boshqa firma tanlash",
+    'btn_select_tax_type': "Soliq turini tanlang",
+    'btn_reselect_tax_type': "Soliq turini qayta tanlash",
+    'btn_message_text': "Xabar matni",
+    # Soliq turlari
+    'tax_daromad': "Daromad solig'i",
+    'tax_yagona': "Yagona soliq",
+    'tax_qqs': "Qo‘shilgan qiymat solig‘i",
+    # Hisobot yorliqlari
+    'label_som': "so‘m",
+    'label_this_month': "bu_oy_uchun_hisobotda",
+    'label_since_year_start': "yil_boshidan_hisobotda",
+    'label_page': "Sahifa",
+    'label_firms_list': "Firmalar ro‘yxati",
+    'label_unknown': "Noma'lum",
+    'cache_stats_title': "📊 Kesh statistikasi:",
+    'translit_reloaded': "✅ Transliteratsiya istisnolari qayta yuklandi.\nlotinga: {to_latin}, kirillga: {to_cyrillic}",
+    'upload_reading': "⏳ Fayl o'qilmoqda...",
+    'bulk_writing_files': "⏳ Hisobotlar saqlanmoqda...",
+    'bulk_summary': "✅ Ommaviy yuklash yakunlandi: {firms} ta firma, {months} ta oy, {reports} ta hisobot saqlandi, {files} ta fayl yaratildi.",
+    'bulk_skipped_rows': "⚠️ {count} ta qator o'tkazib yuborildi:\n{errors}",
+    'bulk_files_failed': "❌ Fayllari yaratilmadi (hisobot saqlandi): {names}",
+    'err_translit_reload': "❌ Istisnolarni yuklashda xato yuz berdi, eski qoidalar saqlandi.",
+    # Savollar va ko'rsatmalar
+    'prompt_confirm': "Tasdiqlaysizmi?",
+    'admin_welcome': "🔒 Admin paneliga xush kelibsiz!",
+    'prompt_new_stir': "Yangi firma STIR raqamini kiriting (9 raqam, masalan: 302824863):",
+    'prompt_stir': "Firma STIR raqamini kiriting (9 raqam, masalan: 123456789):",
+    'prompt_firma_name': "Firma nomini kiriting (kamida 3 belgi):",
+    'prompt_soliq_turi': "Soliq turini kiriting (ds-ys, ds-qqs):",
+    'prompt_search': "Firma STIR yoki nomini kiriting (qisman moslik uchun):",
+    'prompt_search_excel': "Excel faylidagi firma STIR yoki nomini kiriting (qisman moslik uchun):",
+    'prompt_upload_month': "Fayllarni qaysi oy uchun yuklamoqchisiz?",
+    'prompt_manual_month': "Qaysi oy uchun hisobot kiritmoqchisiz?",
+    'prompt_delete_month': "Qaysi oyning hisobotini o'chirishni xohlaysiz?",
+    'prompt_manual_tax_type': "Hisobot kiritish uchun soliq turini tanlang:",
+    'prompt_excel1': "1-Excel faylni yuklang (.xlsx, .csv yoki .tsv):",
+    'prompt_excel2': "✅ 1-Excel fayl yuklangan, endi 2-Excel faylni yuklang (.xlsx). Bekor qilish uchun /cancel bosing.",
+    'prompt_xlsx_upload': "xlsx, csv yoki tsv faylni yuklang yoki /cancel bosib amaliyotni bekor qilin",
+    'prompt_bulk_tax_type': "Ommaviy yuklash uchun soliq turini tanlang:",
+    'prompt_bulk_upload': "Ko'p firma va oylar uchun hisobot faylini yuklang (.xlsx, .csv yoki .tsv). Har bir qator STIR va oy bo'yicha o'z firmasiga yoziladi. Bekor qilish uchun /cancel bosing.",
+    'prompt_html_upload': "html_xlsx faylni yuklang yoki /cancel bosib amaliyotni bekor qilin",
+    # Natijalar
+    'operation_cancelled': "✅ Amaliyot bekor qilindi, admin paneldasiz.",
+    'delete_cancelled': "❌ O'chirish bekor qilindi.",
+    'manual_report_cancelled': "❌ Hisobot kiritish bekor qilindi.",
+    'report_saved_excel_failed': "⚠️ Hisobot saqlandi, lekin Excel fayllarini yaratishda xato yuz berdi.",
+    # Xatolar
+    'err_no_firms': "❌ Hozircha firmalar mavjud emas.",
+    'err_no_firms_now': "❌ Hozirda hech qanday firma mavjud emas.",
+    'err_only_xlsx': "❌ Faqat .xlsx fayllarni yuklang.",
+    'err_only_table': "❌ Faqat .xlsx, .csv yoki .tsv fayllarni yuklang.",
+    'err_only_html': "❌ Faqat .html fayllarni yuklang.",
+    'err_firma_name_short': "❌ Firma nomi kamida 3 ta belgidan iborat bo'lishi kerak.",
+    'err_stir_digits': "❌ STIR 9 raqamdan iborat bo'lishi kerak.",
+    'err_bad_month': "❌ Noto'g'ri oy formati. /admin orqali qayta boshlang.",
+    'err_bad_stir': "❌ Noto'g'ri STIR formati. /admin orqali qayta boshlang.",
+    'err_xodimlar_soni_number': "❌ Xodimlar soni raqam bo'lishi kerak.",
+    'err_xodimlar_soni_positive': "❌ Xodimlar soni 0 dan katta bo'lishi kerak.",
+    'err_restart_admin': "❌ Xatolik yuz berdi. /admin orqali qayta boshlang.",
+    'err_try_again': "❌ Xatolik yuz berdi, qayta urinib ko'ring.",
+    'err_bad_soliq_turi': "❌ Soliq turi 'ds-ys' yoki 'ds-qqs' bo'lishi kerak.",
+    'err_missing_upload_data': "❌ STIR, soliq turi, oy yoki user_id ma'lumotlari yo'q. Qayta boshlang.",
+    'err_missing_report_data': "❌ STIR, soliq turi yoki oy ma'lumotlari yo'q. Qayta boshlang.",
+    'err_missing_stir': "❌ STIR ma'lumoti yo'q. Iltimos, qayta boshlang.",
+    'err_search_not_found': "❌ Qidiruv bo'yicha firma topilmadi.",
+    'err_qqs_numbers': "❌ QQS summalari raqam bo'lishi kerak.",
+    'err_aylanma_numbers': "❌ Aylanma summalari raqam bo'lishi kerak.",
+    'err_bad_tax_type': "❌ Noto'g'ri soliq turi.",
+    'err_bad_tax_type_restart': "❌ Noto'g'ri soliq turi. Iltimos, qayta boshlang.",
+    'err_database': "❌ Ma'lumotlar bazasida xato yuz berdi.",
+    'err_firma_not_found': "❌ Firma topilmadi.",
+    'err_firma_name_not_found': "❌ Firma nomi topilmadi. Iltimos, qayta boshlang.",
+    'err_stir_not_found': "❌ Bu STIR bo'yicha firma topilmadi.",
+    'err_stir_exists': "❌ Bu STIR allaqachon mavjud.",
+    'err_translit_file_type': "❌ Faqat .txt yoki .xlsx fayllarni o'girish mumkin.",
+    'err_translit_file': "❌ Faylni o'girishda xato yuz berdi.",
+    # Shablonlar: {maydon}lar o'girilmaydi, qiymatlar get_text(lang, key, ...) orqali qo'yiladi
+    'prompt_edit_firma_page': "Tahrir qilmoqchi bo'lgan firmani tanlang (Sahifa {page}/{total_pages}):",
+    'prompt_upload_firma_page': "Fayl yuklash uchun firma tanlang (Sahifa {page}/{total_pages}):",
+    'prompt_delete_firma_page': "Hisobotni o'chirish uchun firma tanlang (Sahifa {page}/{total_pages}):",
+    'prompt_manual_firma_page': "Hisobot kiritish uchun firmani tanlang (Sahifa {page}/{total_pages}):",
+    'prompt_excel_firms_page': "Excel faylidan quyidagi firmalar topildi. Hisobot kiritish uchun birini tanlang (Sahifa {page}/{total_pages}):",
+    'search_results_page': "Qidiruv natijalari (Sahifa {page}/{total_pages}):",
+    'prompt_new_firma_name': "Hozirgi firma nomi: {firma_name}\nYangi nomni kiriting (kamida 3 belgi):",
+    'prompt_firma_name_current': "Firma nomi (hozirgi: {firma_name}, o'zgartirish uchun yangi nom kiriting yoki bo'sh qoldiring):",
+    'prompt_firma_name_missing': "Excel faylida {stir} uchun {oy} ma'lumotlari topilmadi.\nFirma nomi (hozirgi: {firma_name}, o'zgartirish uchun yangi nom kiriting yoki bo'sh qoldiring):",
+    'prompt_yagona_data_missing': "Excel faylida {stir} uchun {oy} ma'lumotlari topilmadi.\nYagona soliq ma'lumotlarini kiriting (soliq stavkasi %, yil boshidan aylanma, shu oy aylanma, masalan: 4%, 10000000, 5000000):",
+    'prompt_qqs_data_missing': "Excel faylida {stir} uchun {oy} ma'lumotlari topilmadi.\nQQS ma'lumotlarini kiriting (soliq stavkasi %, yil boshidan QQS, shu oy QQS, masalan: 15%, 20000000, 10000000):",
+    'prompt_yagona_data_again': "Yagona soliq ma'lumotlarini qayta kiriting (soliq stavkasi %, yil boshidan aylanma, shu oy aylanma, masalan: 4%, 10000000, 5000000):",
+    'prompt_qqs_data_again': "QQS ma'lumotlarini qayta kiriting (soliq stavkasi %, yil boshidan QQS, shu oy QQS, masalan: 15%, 20000000, 10000000):",
+    'prompt_manual_method': "{tax} hisobotini kiritish usulini tanlang:",
+    'prompt_xodimlar_soni': "Xodimlar sonini kiriting (raqam bilan, masalan: 2):",
+    'prompt_xodimlar_data': "Xodimlar ma'lumotlarini kiriting (har bir xodim uchun: raqam (lavozim) – shu oy summasi so'm (yil boshidan jami so'm), masalan:\n1 (Rahbar) – 0 so'm (5000000 so'm)\nHar bir xodimni alohida kiriting, 1-xodimdan boshlang:",
+    'prompt_next_xodim': "Keyingi xodim ma'lumotlarini kiriting ({index}/{total}):",
+    'prompt_delete_month_confirm': "{oy} oyi uchun hisobotni o'chirishni xohlaysizmi?",
+    'excel1_exists_month': "✅ {oy} uchun 1-Excel fayl allaqachon mavjud. Endi 2-Excel faylni yuklang (.xlsx):",
+    'excel1_missing_month': "📋 {oy} uchun 1-Excel fayl topilmadi. Iltimos, 2-Excel faylni yuklang (.xlsx):",
+    'firma_added': "✅ Firma qo'shildi: {name} ({stir})",
+    'firma_renamed': "✅ Firma nomi o'zgartirildi: {name} ({stir})",
+    'files_uploaded_month': "✅ {oy} uchun fayllar muvaffaqiyatli yuklandi!",
+    'report_deleted_month': "✅ {oy} oyi hisoboti o'chirildi.",
+    'report_saved_month': "✅ {oy} uchun hisobot saqlandi.",
+    'import_summary': "✅ Import yakunlandi: {inserted} ta qo'shildi, {updated} ta yangilandi, {skipped} ta o'zgarishsiz qoldi.",
+    'label_inserted': "Qo'shildi",
+    'label_updated': "Yangilandi",
+    'summary_more': " va yana {count} ta",
+    'err_send_message': "❌ Xabar yuborishda xato: {error}",
+    'err_file_read': "❌ Faylni o'qishda xato: {error}",
+    'err_file_read_failed': "❌ Faylni o'qishda xatolik yuz berdi: {error}",
+    'err_yagona_calc': "❌ Yagona soliq hisoblashda xato: {error}",
+    'err_qqs_calc': "❌ QQS soliq hisoblashda xato: {error}",
+    'err_report_save': "❌ Hisobotni saqlashda xato yuz berdi: {error}",
+    'err_yagona_format': "❌ Noto'g'ri format. Namuna: 4%, 10000000, 5000000\nKiritilgan matn: {text}",
+    'err_qqs_format': "❌ Noto'g'ri format. Namuna: 15%, 20000000, 10000000\nKiritilgan matn: {text}",
+    'err_xodim_format': "❌ Noto'g'ri format. Namuna: 1 (Rahbar) – Aliyev Valijon – 0 so'm (5000000 so'm)\nKiritilgan matn: {text}",
+    'err_xodim_index': "❌ Noto'g'ri tartib raqami. {index}-xodimni kiriting.",
+    'file_caption': "{name} fayli",
+    'err_file_send': "❌ Fayl yuborishda xato: {name} - {error}",
+    'err_file_missing_on_disk': "❌ Fayl diskda topilmadi: {name}",
+    'err_fallback_send': "❌ Fallback fayl yuborishda xato: {name} - {error}",
+    'err_fallback_missing_on_disk': "❌ Fallback fayl diskda topilmadi: {name}",
+    'err_file_not_in_db': "❌ {file_type} fayli ma'lumotlar bazasida topilmadi.",
+    'err_month_file_not_found': "❌ {oy} uchun {soliq_turi} fayli topilmadi.",
+    'err_yagona_data': "❌ Yagona hisoboti uchun ma'lumot topilmadi: {error}",
+    'err_yagona_month_not_found': "❌ {oy} uchun yagona hisoboti topilmadi.",
+    'err_qqs_data': "❌ QQS hisoboti uchun ma'lumot topilmadi: {error}",
+    'err_qqs_month_not_found': "❌ {oy} uchun QQS hisoboti topilmadi.",
+    'err_report_build': "❌ Hisobot yaratishda xato: {error}",
+}
+
+# lang -> {key: matn}: LANGUAGES va tayyorlangan UI_TEXTS birlashmasi
+_TEXTS = {}
+# lang -> {key: str.format}: formatlash shablonlari oldindan bog'langan
+_FORMATTERS = {}
+
+
+def _template_fields(text):
+    return {field for _, field, _, _ in Formatter().parse(text) if field}
+
+
+def _translate_template(text, lang):
+    """Shablonning faqat matn qismlari o'giriladi: {page} kabi maydon nomlari o'zgarmaydi."""
+    if not _template_fields(text):
+        return _translate(text, lang)
+    parts = []
+    for literal, field, spec, conversion in Formatter().parse(text):
+        parts.append(_translate(literal, lang).replace('{', '{{').replace('}', '}}'))
+        if field is not None:
+            parts.append('{' + field + (f'!{conversion}' if conversion else '') + (f':{spec}' if spec else '') + '}')
+    return ''.join(parts)
+
+
+def build_ui_catalog():
+    """UI_TEXTS ni har bir til uchun o'giradi va get_text jadvallarini qayta quradi."""
+    for lang, texts in LANGUAGES.items():
+        merged = {key: _translate_template(text, lang) for key, text in UI_TEXTS.items()}
+        merged.update(texts)
+        _FORMATTERS[lang] = {key: text.format for key, text in merged.items()}
+        _TEXTS[lang] = merged
+    # Tarjimalardagi shablon maydonlari lotin matni bilan bir xil bo'lishi kerak
+    for key, text in _TEXTS['uz_latin'].items():
+        fields = _template_fields(text)
+        for lang, texts in _TEXTS.items():
+            if key in texts and _template_fields(texts[key]) != fields:
+                logger.warning(f"Shablon maydonlari mos emas: key={key}, lang={lang}")
+    logger.info(f"UI katalogi tayyorlandi: {len(UI_TEXTS)} ta matn, tillar={len(_TEXTS)}")
+
+
+def reload_transliteration():
+    """Istisnolar faylini qayta yuklaydi, tarjima keshini tozalaydi va UI katalogini qayta quradi.
+
+    O'qilgan Excel jadvallari keshi (report_parser.workbook_cache) va worker jarayonlarini chaqiruvchi yangilaydi.
+    """
+    counts = reload_transliterators()
+    translate_cache.clear()
+    build_ui_catalog()
+    return counts
+
+
 def get_text(lang, key, **kwargs):
-    text = LANGUAGES.get(lang, LANGUAGES['uz_latin']).get(key, "Matn topilmadi")
-    return text.format(**kwargs) if kwargs else text
+    if kwargs:
+        formatter = _FORMATTERS.get(lang, _FORMATTERS['uz_latin']).get(key)
+        return formatter(**kwargs) if formatter else "Matn topilmadi"
+    return _TEXTS.get(lang, _TEXTS['uz_latin']).get(key, "Matn topilmadi")
 
-def get_month_name(lang, oy):
-    months = {
-        'uz_latin': {
-            'yanvar': 'Yanvar', 'fevral': 'Fevral', 'mart': 'Mart',
-            'aprel': 'Aprel', 'may': 'May', 'iyun': 'Iyun', 'iyul': 'Iyul'
-        },
-        'uz_cyrillic': {
-            'yanvar': 'Январ', 'fevral': 'Феврал', 'mart': 'Март',
-            'aprel': 'Апрел', 'may': 'Май', 'iyun': 'Июн', 'iyul': 'Июл'
-        }
+MONTH_NAMES = {
+    'uz_latin': {
+        'yanvar': 'Yanvar', 'fevral': 'Fevral', 'mart': 'Mart',
+        'aprel': 'Aprel', 'may': 'May', 'iyun': 'Iyun', 'iyul': 'Iyul'
+    },
+    'uz_cyrillic': {
+        'yanvar': 'Январ', 'fevral': 'Феврал', 'mart': 'Март',
+        'aprel': 'Апрел', 'may': 'Май', 'iyun': 'Июн', 'iyul': 'Июл'
     }
-    return months.get(lang, months['uz_latin']).get(oy, oy)
+}
+
+def get_month_name(lang, oy):
+    return MONTH_NAMES.get(lang, MONTH_NAMES['uz_latin']).get(oy, oy)
 
 def translate_text(text, lang):
+    if len(text) > TRANSLATE_CACHE_MAX_LEN:
+        return _translate(text, lang)
+    key = (lang, text)
+    result = translate_cache.get(key)
+    if result is MISSING:
+        result = _translate(text, lang)
+        translate_cache.set(key, result)
+    return result
+
+def _translate(text, lang):
     if lang == 'uz_cyrillic':
         return convert_to_cyrillic(text)
     elif lang == 'uz_latin':
         return convert_to_latin(text)
-    return text
\ No newline at end of file
+    return text
+
+
+build_ui_catalog()
@@ -1,12 +1,21 @@
-from aiogram import executor
-from loader import dp
-import handlers
-import admin
-from database import init_db
 import logging
 
 logging.basicConfig(level=logging.INFO, filename="bot.log", encoding="utf-8")
 
+# Bot modullari faqat asosiy jarayonda import qilinadi: excel workerlari spawn bilan yaratilib,
+# main.py ni qayta import qiladi va ularga aiogram kerak emas.
 if __name__ == '__main__':
-    init_db()  # Ma'lumotlar bazasini ishga tushirish
-    executor.start_polling(dp, skip_updates=True)
\ No newline at end of file
+    from aiogram import executor
+    from loader import dp
+    import handlers
+    import admin
+    from migrations import run_migrations
+    import db
+    import workers
+
+    async def on_shutdown(dispatcher):
+        workers.shutdown()
+        db.shutdown()
+
+    run_migrations()  # Ma'lumotlar bazasi sxemasini yangilash
+    executor.start_polling(dp, skip_updates=True, on_shutdown=on_shutdown)
\ No newline at end of file
@@ -0,0 +1,220 @@
+import sys
+import time
+import logging
+from datetime import datetime
+from db_connection import get_connection, transaction
+from database import parse_xodimlar_data, save_report_employees
+
+logger = logging.getLogger(__name__)
+
+# (versiya, nomi, funksiya) — versiyalar o'sish tartibida bajariladi
+MIGRATIONS = []
+
+
+def migration(version, name):
+    def decorator(func):
+        if any(v == version for v, _, _ in MIGRATIONS):
+            raise ValueError(f"Migratsiya versiyasi takrorlangan: {version}")
+        MIGRATIONS.append((version, name, func))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return func
+    return decorator
+
+
+@migration(1, "Boshlang'ich jadvallar")
+def _initial_tables(c):
+    c.execute('''CREATE TABLE IF NOT EXISTS users (
+        user_id INTEGER PRIMARY KEY,
+        language TEXT DEFAULT 'uz_latin'
+    )''')
+    c.execute('''CREATE TABLE IF NOT EXISTS firms (
+        stir TEXT PRIMARY KEY,
+        name TEXT,
+        rahbar TEXT,
+        soliq_turi TEXT,
+        ds_stavka TEXT,
+        ys_stavka TEXT,
+        qqs_stavka TEXT
+    )''')
+    c.execute('''CREATE TABLE IF NOT EXISTS reports (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        stir TEXT,
+        oy TEXT,
+        firma_name TEXT,
+        xodimlar_soni INTEGER,
+        xodimlar_data TEXT,
+        hisobot_davri_oylik INTEGER,
+        jami_oylik INTEGER,
+        soliq INTEGER
+    )''')
+    c.execute('''CREATE TABLE IF NOT EXISTS reports_yagona (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        stir TEXT,
+        oy TEXT,
+        firma_name TEXT,
+        rahbar TEXT,
+        soliq_turi_yagona TEXT,
+        yil_boshidan_aylanma INTEGER,
+        shu_oy_aylanma INTEGER,
+        yagona_soliq INTEGER
+    )''')
+    c.execute('''CREATE TABLE IF NOT EXISTS reports_qqs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        stir TEXT,
+        oy TEXT,
+        firma_name TEXT,
+        rahbar TEXT,
+        soliq_turi_qqs TEXT,
+        yil_boshidan_qqs INTEGER,
+        shu_oy_qqs INTEGER,
+        qqs_soliq INTEGER
+    )''')
+    c.execute('''CREATE TABLE IF NOT EXISTS files (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        stir TEXT,
+        soliq_turi TEXT,
+        oy TEXT,
+        file_type TEXT,
+        file_path TEXT
+    )''')
+
+
+# Har bir jadvaldagi tabiiy kalit: bir kalitga faqat bitta qator to'g'ri keladi
+NATURAL_KEYS = {
+    'files': ('stir', 'soliq_turi', 'oy', 'file_type'),
+    'reports': ('stir', 'oy'),
+    'reports_yagona': ('stir', 'oy'),
+    'reports_qqs': ('stir', 'oy'),
+}
+
+@migration(2, "Tabiiy kalitlar bo'yicha UNIQUE indekslar")
+def _natural_keys(c):
+    # Takroriy qatorlarni o'chirish (eng yangisi qoladi), keyin UNIQUE indeks
+    for table, columns in NATURAL_KEYS.items():
+        key = ", ".join(columns)
+        c.execute(f"DELETE FROM {table} WHERE id NOT IN (SELECT MAX(id) FROM {table} GROUP BY {key})")
+        if c.rowcount > 0:
+            logger.info(f"{table}: {c.rowcount} ta takroriy qator o'chirildi")
+        c.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{table}_{'_'.join(columns)} ON {table} ({key})")
+
+
+@migration(3, "Daromad hisobotlari uchun report_employees jadvali")
+def _report_employees(c):
+    c.execute('''CREATE TABLE IF NOT EXISTS report_employees (
+        stir TEXT,
+        oy TEXT,
+        tartib INTEGER,
+        lavozim TEXT,
+        ism TEXT,
+        shu_oy INTEGER,
+        yil_boshidan INTEGER,
+        PRIMARY KEY (stir, oy, tartib)
+    )''')
+    # Mavjud xodimlar_data matnlarini bir marta qatorlarga ajratish
+    migrated = 0
+    for stir, oy, xodimlar_data in c.execute("SELECT stir, oy, xodimlar_data FROM reports").fetchall():
+        xodimlar = parse_xodimlar_data(xodimlar_data)
+        save_report_employees(c, stir, oy, xodimlar)
+        migrated += len(xodimlar)
+    logger.info(f"report_employees: {migrated} ta xodim qatori ko'chirildi")
+
+
+@migration(4, "Firmalarni nom bo'yicha sahifalash indeksi")
+def _firms_name_index(c):
+    c.execute("CREATE INDEX IF NOT EXISTS ix_firms_name_stir ON firms (name, stir)")
+
+
+FIRMS_FTS_COLUMNS = "stir, name_lat, name_cyr, rahbar_lat, rahbar_cyr"
+FIRMS_FTS_VALUES = ("{p}.stir, search_latin({p}.name), search_cyrillic({p}.name), "
+                    "search_latin({p}.rahbar), search_cyrillic({p}.rahbar)")
+
+@migration(5, "Firmalar bo'yicha FTS5 qidiruv indeksi")
+def _firms_fts(c):
+    # Nom va rahbar lotin va kirill shakllarida indekslanadi, shuning uchun istalgan yozuvda qidirish mumkin
+    c.execute(f'''CREATE VIRTUAL TABLE IF NOT EXISTS firms_fts USING fts5(
+        {FIRMS_FTS_COLUMNS},
+        tokenize = "unicode61 remove_diacritics 0"
+    )''')
+    new_values = FIRMS_FTS_VALUES.format(p='new')
+    c.execute(f'''CREATE TRIGGER IF NOT EXISTS firms_fts_ai AFTER INSERT ON firms BEGIN
+        INSERT INTO firms_fts (rowid, {FIRMS_FTS_COLUMNS}) VALUES (new.rowid, {new_values});
+    END''')
+    c.execute(f'''CREATE TRIGGER IF NOT EXISTS firms_fts_au AFTER UPDATE OF stir, name, rahbar ON firms BEGIN
+        DELETE FROM firms_fts WHERE rowid = old.rowid;
+        INSERT INTO firms_fts (rowid, {FIRMS_FTS_COLUMNS}) VALUES (new.rowid, {new_values});
+    END''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS firms_fts_ad AFTER DELETE ON firms BEGIN
+        DELETE FROM firms_fts WHERE rowid = old.rowid;
+    END''')
+    c.execute("DELETE FROM firms_fts")
+    c.execute(f"INSERT INTO firms_fts (rowid, {FIRMS_FTS_COLUMNS}) SELECT rowid, {FIRMS_FTS_VALUES.format(p='firms')} FROM firms")
+
+
+def _ensure_version_table(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name TEXT,
+        applied_at TEXT,
+        duration_ms INTEGER
+    )''')
+
+
+def current_version():
+    conn = get_connection()
+    _ensure_version_table(conn)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def plan():
+    """Hali qo'llanmagan migratsiyalar ro'yxati: [(versiya, nomi), ...]"""
+    version = current_version()
+    return [(v, name) for v, name, _ in MIGRATIONS if v > version]
+
+
+def run_migrations(dry_run=False):
+    """Navbatdagi migratsiyalarni tartib bilan, har birini alohida tranzaksiyada bajaradi.
+
+    dry_run=True bo'lsa, barcha migratsiyalar bitta tranzaksiyada bajarib ko'riladi va bekor qilinadi.
+    """
+    version = current_version()
+    pending = [m for m in MIGRATIONS if m[0] > version]
+    if not pending:
+        logger.info(f"Ma'lumotlar bazasi sxemasi dolzarb: versiya={version}")
+        return []
+
+    applied = []
+    conn = get_connection()
+    if dry_run:
+        conn.execute("BEGIN IMMEDIATE")
+    try:
+        for v, name, func in pending:
+            started = time.perf_counter()
+            if dry_run:
+                func(conn.cursor())
+            else:
+                with transaction(immediate=True) as tx:
+                    func(tx.cursor())
+                    duration_ms = int((time.perf_counter() - started) * 1000)
+                    tx.execute("INSERT INTO schema_version (version, name, applied_at, duration_ms) VALUES (?, ?, ?, ?)",
+                               (v, name, datetime.now().isoformat(timespec='seconds'), duration_ms))
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            applied.append((v, name, duration_ms))
+            logger.info(f"Migratsiya {'sinab ko‘rildi' if dry_run else 'qo‘llandi'}: {v} ({name}), {duration_ms} ms")
+    except Exception as e:
+        logger.error(f"Migratsiya xatosi: {e}, versiya={v}")
+        raise
+    finally:
+        if dry_run:
+            conn.rollback()
+    return applied
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    if '--plan' in sys.argv:
+        for v, name in plan():
+            print(f"{v}: {name}")
+    else:
+        for v, name, duration_ms in run_migrations(dry_run='--dry-run' in sys.argv):
+            print(f"{v}: {name} ({duration_ms} ms)")
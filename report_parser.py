@@ -0,0 +1,383 @@
+import os
+import re
+import logging
+from functools import lru_cache
+from converters import TRANSLITERATORS, search_latin
+from excel_reader import iter_table_rows
+from cache import LRUCache, MISSING
+from config import WORKBOOK_CACHE_SIZE, WORKBOOK_CACHE_MAX_ROWS
+
+logger = logging.getLogger(__name__)
+
+# Yuklanadigan fayllar uchun yagona parser: har bir hisobot turi ustunlar sxemasi bilan beriladi,
+# ustunlar sarlavha bo'yicha (lotin yoki kirill) topiladi, barcha qatorlar bitta o'tishda tekshiriladi.
+
+STIR_RE = re.compile(r'\d{9}')
+AMOUNT_STRIP_RE = re.compile(r"[\s,']")
+HEADER_STRIP_RE = re.compile(r'[^a-z0-9]')
+MONTHS = frozenset(['yanvar', 'fevral', 'mart', 'aprel', 'may', 'iyun', 'iyul'])
+MAX_STORED_ERRORS = 1000
+
+# (sxema, fayl yo'li, til) -> (mtime_ns, hajm, ma'lumotlar); og'irligi — qatorlar soni
+workbook_cache = LRUCache("workbooks", maxsize=WORKBOOK_CACHE_SIZE, maxweight=WORKBOOK_CACHE_MAX_ROWS,
+                          weigh=lambda item: len(item[2]))
+
+
+class RowError(ValueError):
+    """Qator tekshiruvdan o'tmadi; xabar qator raqami bilan birga foydalanuvchiga ko'rsatiladi."""
+
+
+def normalize_header(text):
+    """Sarlavhani yozuvdan qat'i nazar solishtirish uchun: "Раҳбар", "Raxbar", "Rahbar" -> "raxbar"."""
+    return HEADER_STRIP_RE.sub('', search_latin(str(text)).replace('h', 'x'))
+
+
+def parse_text(value):
+    return str(value).strip()
+
+
+def parse_stir(value):
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    stir = str(value).strip()
+    if not STIR_RE.fullmatch(stir):
+        raise RowError(f"Noto'g'ri STIR: {value}")
+    return stir
+
+
+@lru_cache(maxsize=256)
+def _month_key(text):
+    return search_latin(text).strip()
+
+
+def parse_month(value):
+    """Lotin yoki kirill oy nomi ("May", "Январь") -> "may"."""
+    oy = _month_key(str(value))
+    if oy not in MONTHS:
+        raise RowError(f"Noto'g'ri oy: {value}")
+    return oy
+
+
+def parse_amount(value):
+    if isinstance(value, bool):
+        raise RowError(f"Noto'g'ri summa: {value}")
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        # CSV kataklari matn: oddiy butun son regexsiz o'qiladi
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return int(float(AMOUNT_STRIP_RE.sub('', str(value))))
+    except ValueError:
+        raise RowError(f"Noto'g'ri summa: {value}")
+
+
+def parse_percent(value):
+    """Stavka "4%" ko'rinishida. Excel foiz formatidagi katak 0.04 bo'lib keladi."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if 0 < value < 1:
+            value = round(value * 100, 6)
+        return f"{value:g}%"
+    text = str(value).strip()
+    try:
+        float(text.rstrip('%').strip().replace(',', '.'))
+    except ValueError:
+        raise RowError(f"Noto'g'ri stavka: {value}")
+    return text if text.endswith('%') else f"{text}%"
+
+
+def parse_soliq_turi(value):
+    soliq_turi = str(value).strip().lower()
+    return soliq_turi if soliq_turi in ('ds-ys', 'ds-qqs') else 'ds-ys'
+
+
+class Column:
+    """Sxema ustuni.
+
+    aliases — sarlavha variantlari (normalize_header orqali solishtiriladi); parse — qiymatni tekshirib
+    o'giradi yoki RowError ko'taradi; fill_down — bo'sh katak oldingi to'g'ri qatordan olinadi;
+    translit — qiymat foydalanuvchi tiliga o'giriladi.
+    """
+
+    def __init__(self, key, aliases=(), parse=parse_text, required=True, default=None, fill_down=False, translit=False):
+        self.key = key
+        self.aliases = {normalize_header(alias) for alias in (key, *aliases)}
+        self.parse = parse
+        self.required = required
+        self.default = default
+        self.fill_down = fill_down
+        self.translit = translit
+
+
+class Schema:
+    def __init__(self, name, title, columns, build, result=dict, sheet_names=('Лист1', 'Sheet1'), known_stirs_only=True):
+        self.name = name
+        self.title = title
+        self.columns = columns
+        self.build = build
+        self.result = result
+        self.sheet_names = sheet_names
+        self.known_stirs_only = known_stirs_only
+
+    def column_indexes(self, header):
+        """Sarlavha qatoridan ustun indekslari. Majburiy ustun topilmasa eski tartib (sxemadagi o'rin) ishlatiladi."""
+        positions = {}
+        for index, cell in enumerate(header):
+            if cell is not None:
+                positions.setdefault(normalize_header(cell), index)
+        indexes = {}
+        for column in self.columns:
+            found = [positions[alias] for alias in column.aliases if alias in positions]
+            if found:
+                indexes[column.key] = min(found)
+            elif column.required:
+                logger.warning(f"{self.title}: '{column.key}' ustuni sarlavhada topilmadi, ustunlar tartibi bo'yicha o'qiladi")
+                return {column.key: i for i, column in enumerate(self.columns)}
+        return indexes
+
+
+class ParseResult:
+    def __init__(self, result, errors, error_count, rows):
+        self.result = result
+        self.errors = errors            # [(qator raqami, xabar), ...], ko'pi bilan MAX_STORED_ERRORS ta
+        self.error_count = error_count
+        self.rows = rows
+
+    def error_summary(self, limit=5):
+        lines = [f"{number}-qator: {message}" for number, message in self.errors[:limit]]
+        if self.error_count > limit:
+            lines.append(f"... va yana {self.error_count - limit} ta xato")
+        return "\n".join(lines)
+
+
+def parse_rows(schema, rows, lang='uz_latin', known_stirs=None):
+    """rows: (qator raqami, qiymatlar) juftliklari, birinchisi sarlavha. Barcha qatorlar bitta o'tishda tekshiriladi.
+
+    Matnli ustunlar tsikldan keyin bitta convert_many chaqiruvida o'giriladi.
+    """
+    rows = iter(rows)
+    result = schema.result()
+    first = next(rows, None)
+    if first is None:
+        return ParseResult(result, [], 0, 0)
+
+    indexes = schema.column_indexes(first[1])
+    # Tsikl ichida atributlarga murojaat qilmaslik uchun ustunlar oddiy kortejlarga yoyiladi
+    columns = [
+        (column.key, indexes[column.key], column.parse, column.required, column.default, column.fill_down)
+        for column in schema.columns if column.key in indexes
+    ]
+    defaults = {column.key: column.default for column in schema.columns if column.key not in indexes}
+    fill_down = [column.key for column in schema.columns if column.fill_down]
+    check_stirs = schema.known_stirs_only and known_stirs is not None
+    previous = {}
+    records = []
+    errors = []
+    error_count = 0
+    count = 0
+
+    for number, row in rows:
+        count += 1
+        record = dict(defaults) if defaults else {}
+        width = len(row)
+        try:
+            for key, index, parse, required, default, down in columns:
+                value = row[index] if index < width else None
+                if value.__class__ is str:
+                    value = value.strip()
+                if value is None or value == '':
+                    if down and key in previous:
+                        value = previous[key]
+                    elif required:
+                        raise RowError(f"'{key}' ustuni bo'sh")
+                    else:
+                        value = default
+                elif parse is not None:
+                    value = parse(value)
+                record[key] = value
+            if check_stirs and record['stir'] not in known_stirs:
+                raise RowError(f"STIR ma'lumotlar bazasida yo'q: {record['stir']}")
+        except RowError as e:
+            error_count += 1
+            if len(errors) < MAX_STORED_ERRORS:
+                errors.append((number, str(e)))
+            continue
+        for key in fill_down:
+            previous[key] = record[key]
+        records.append(record)
+
+    translit = [column.key for column in schema.columns if column.translit]
+    transliterator = TRANSLITERATORS.get(lang)
+    if translit and transliterator is not None and records:
+        texts = list({record[key] for record in records for key in translit})
+        converted = dict(zip(texts, transliterator.convert_many(texts)))
+        for record in records:
+            for key in translit:
+                record[key] = converted[record[key]]
+
+    build = schema.build
+    for record in records:
+        build(result, record)
+
+    if error_count:
+        logger.warning(f"{schema.title}: {error_count} ta qator o'tkazib yuborildi, masalan: {errors[0][0]}-qator: {errors[0][1]}")
+    return ParseResult(result, errors, error_count, count)
+
+
+def parse_report_file(schema, file_path, lang='uz_latin', known_stirs=None, progress=None, check_stirs=True):
+    """Excel (.xlsx) yoki CSV/TSV faylni sxema bo'yicha o'qiydi. Natija: ParseResult; o'qib bo'lmasa istisno ko'tariladi.
+
+    CSV kataklari matn bo'lib keladi va Excel qiymatlari bilan bir xil tekshiruvdan o'tadi.
+    check_stirs=False bo'lsa STIRlar bazadagi firmalar bilan solishtirilmaydi. Worker jarayonlarida known_stirs
+    doim chaqiruvchi tomonidan beriladi; bazadan o'qish faqat shu jarayonda chaqirilganda ishlatiladi.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Fayl topilmadi: {file_path}")
+    if not check_stirs:
+        known_stirs = None
+    elif schema.known_stirs_only and known_stirs is None:
+        from database import get_all_stirs
+        known_stirs = get_all_stirs()
+    rows = iter_table_rows(file_path, schema.sheet_names, min_row=1, progress=progress, numbered=True)
+    return parse_rows(schema, rows, lang, known_stirs)
+
+
+def parse_report_result(schema, file_path, lang='uz_latin', known_stirs=None, progress=None, check_stirs=True):
+    """parse_report_file, lekin istisno o'rniga (ParseResult, xato matni) qaytaradi; bo'sh natija ham xato."""
+    try:
+        parsed = parse_report_file(schema, file_path, lang, known_stirs, progress, check_stirs)
+    except Exception as e:
+        logger.error(f"{schema.title} Excel parsing xatosi: {e}, fayl: {file_path}")
+        return None, f"{schema.title} Excel faylni o‘qishda xato: {str(e)}"
+    if not parsed.result:
+        logger.warning(f"Faylda ma'lumot topilmadi: {file_path}")
+        message = f"Faylda {schema.title} ma'lumotlari topilmadi."
+        if parsed.error_count:
+            message += "\n" + parsed.error_summary()
+        return None, message
+    return parsed, None
+
+
+def parse_report(schema, file_path, lang='uz_latin', known_stirs=None, progress=None, check_stirs=True):
+    """Eski parserlar bilan bir xil natija: (ma'lumotlar, xato matni)."""
+    parsed, error = parse_report_result(schema, file_path, lang, known_stirs, progress, check_stirs)
+    return (parsed.result, None) if parsed else (None, error)
+
+
+def parse_report_cached(schema, file_path, lang='uz_latin'):
+    """parse_report, lekin fayl o'zgarmagan bo'lsa (yo'l, mtime, hajm bir xil) natija keshdan olinadi.
+
+    Saqlangan fayllarni ko'rsatish uchun: STIRlar bazaga solishtirilmaydi, chunki kesh firmalar
+    ro'yxati o'zgarganda eskirib qolmasligi kerak. Xatolar keshlanmaydi.
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None, f"Fayl topilmadi: {file_path}"
+    key = (schema.name, os.path.abspath(file_path), lang)
+    cached = workbook_cache.get(key)
+    if cached is not MISSING and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2], None
+    # stat o'qishdan oldin olinadi: o'qish paytida fayl almashsa, keyingi murojaatda qayta o'qiladi
+    result, error = parse_report(schema, file_path, lang, check_stirs=False)
+    if result is not None:
+        workbook_cache.set(key, (stat.st_mtime_ns, stat.st_size, result))
+    return result, error
+
+
+def invalidate_workbook(file_path):
+    """Fayl qayta yozilganda chaqiriladi: shu yo'l uchun barcha sxema va tillardagi yozuvlar o'chiriladi."""
+    path = os.path.abspath(file_path)
+    workbook_cache.invalidate(*[(name, path, lang) for name in SCHEMAS for lang in TRANSLITERATORS])
+
+
+def _build_daromad(result, record):
+    key = (record['stir'], record['oy'])
+    firm = result.get(key)
+    if firm is None:
+        firm = result[key] = {'stir': record['stir'], 'oy': record['oy'], 'firma_nomi': record['firma_nomi'], 'xodimlar': []}
+    firm['xodimlar'].append({
+        'lavozim': record['lavozim'],
+        'ism': record['ism'],
+        'yil_boshidan': record['yil_boshidan'],
+        'shu_oy': record['shu_oy'],
+    })
+
+
+def _build_by_month(result, record):
+    result[(record['stir'], record['oy'])] = record
+
+
+def _build_list(result, record):
+    result.append(record)
+
+
+STIR = ("INN",)
+OY = ("Month", "Hisobot oyi")
+FIRMA_NOMI = ("Firma", "Korxona nomi", "Tashkilot nomi")
+RAHBAR = ("Direktor", "Rahbar F.I.Sh")
+
+DAROMAD_SCHEMA = Schema('daromad', "Daromad", [
+    Column('stir', STIR + ("STIR",), parse=parse_stir, fill_down=True),
+    Column('oy', OY + ("Oy",), parse=parse_month, fill_down=True),
+    Column('firma_nomi', FIRMA_NOMI + ("Firma nomi",), fill_down=True, translit=True),
+    Column('lavozim', ("Xodim lavozimi", "Lavozim"), translit=True),
+    Column('ism', ("Ism Familyasi", "Ism familiyasi", "F.I.Sh", "Xodim"), translit=True),
+    Column('yil_boshidan', ("Yil boshidan",), parse=parse_amount),
+    Column('shu_oy', ("Shu Oy uchun oylik", "Shu oy"), parse=parse_amount),
+], _build_daromad, sheet_names=None)
+
+YAGONA_SCHEMA = Schema('yagona', "Yagona", [
+    Column('stir', STIR + ("STIR",), parse=parse_stir),
+    Column('oy', OY + ("Oy",), parse=parse_month),
+    Column('firma_nomi', FIRMA_NOMI + ("Firma nomi",), translit=True),
+    Column('rahbar', RAHBAR + ("Raxbar",), translit=True),
+    Column('soliq_turi_yagona', ("Soliq turi yagona", "Soliq turi", "Stavka"), parse=parse_percent),
+    Column('yil_boshidan_aylanma', ("Yil boshidan aylanma", "Yil boshidan"), parse=parse_amount),
+    Column('shu_oy_aylanma', ("Shu oy uchun aylanma", "Shu oy aylanma", "Shu oy"), parse=parse_amount),
+], _build_by_month)
+
+QQS_SCHEMA = Schema('qqs', "QQS", [
+    Column('stir', STIR + ("STIR",), parse=parse_stir),
+    Column('oy', OY + ("Oy",), parse=parse_month),
+    Column('firma_nomi', FIRMA_NOMI + ("Firma nomi",), translit=True),
+    Column('rahbar', RAHBAR + ("Raxbar",), translit=True),
+    Column('soliq_turi_qqs', ("Soliq turi qqs", "Soliq turi", "Stavka"), parse=parse_percent),
+    Column('yil_boshidan_qqs', ("Yil boshidan qqs", "Yil boshidan"), parse=parse_amount),
+    Column('shu_oy_qqs', ("Shu oy uchun qqs", "Shu oy qqs", "Shu oy"), parse=parse_amount),
+], _build_by_month)
+
+FIRMS_SCHEMA = Schema('firms', "Firmalar", [
+    Column('stir', STIR + ("STIR",), parse=parse_stir),
+    Column('firma_nomi', FIRMA_NOMI + ("Firma nomi",)),
+    Column('rahbar', RAHBAR + ("Raxbar",)),
+    Column('soliq_turi', ("Soliq turi",), parse=parse_soliq_turi),
+    Column('ds_stavka', ("DS stavka", "DS"), required=False, default="Noma'lum"),
+    Column('ys_stavka', ("YS stavka", "YaS stavka", "YS"), required=False, default="Noma'lum"),
+    Column('qqs_stavka', ("QQS stavka", "QQS"), required=False, default="Noma'lum"),
+], _build_list, result=list, known_stirs_only=False)
+
+SCHEMAS = {schema.name: schema for schema in (DAROMAD_SCHEMA, YAGONA_SCHEMA, QQS_SCHEMA, FIRMS_SCHEMA)}
+
+
+def parse_excel_file(file_path, lang='uz_latin', known_stirs=None, progress=None):
+    return parse_report(DAROMAD_SCHEMA, file_path, lang, known_stirs, progress)
+
+
+def parse_yagona_excel(file_path, lang='uz_latin', known_stirs=None, progress=None):
+    return parse_report(YAGONA_SCHEMA, file_path, lang, known_stirs, progress)
+
+
+def parse_qqs_excel(file_path, lang='uz_latin', known_stirs=None, progress=None):
+    return parse_report(QQS_SCHEMA, file_path, lang, known_stirs, progress)
+
+
+def parse_bulk_report(file_path, lang='uz_latin', known_stirs=None, progress=None, soliq_turi='daromad'):
+    """Ko'p firma va oylik ommaviy yuklash: natija (ParseResult, xato matni), o'tkazib yuborilgan qatorlar bilan."""
+    return parse_report_result(SCHEMAS[soliq_turi], file_path, lang, known_stirs, progress)
+
+
+def parse_firms_excel(file_path, lang='uz_latin', progress=None):
+    return parse_report(FIRMS_SCHEMA, file_path, lang, progress=progress)
@@ -0,0 +1,56 @@
+import os
+import logging
+from openpyxl import load_workbook, Workbook
+from converters import transliterate_many, transliterate_stream
+from excel_reader import detect_encoding
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+
+def convert_text_file(src, dst, target):
+    """.txt faylni bo'laklab o'giradi: xotira sarfi fayl hajmiga bog'liq emas. Natija UTF-8 da yoziladi."""
+    encoding = detect_encoding(src)
+
+    with open(src, encoding=encoding, errors='replace', newline='') as f_in, \
+            open(dst, 'w', encoding='utf-8', newline='') as f_out:
+        chunks = iter(lambda: f_in.read(CHUNK_SIZE), '')
+        for part in transliterate_stream(chunks, target):
+            f_out.write(part)
+    logger.info(f"Matnli fayl o'girildi: {src} -> {dst}, encoding={encoding}, target={target}")
+
+
+def convert_xlsx_file(src, dst, target):
+    """.xlsx faylning barcha varaqlaridagi matnli kataklarni qatorma-qator o'giradi (read_only/write_only rejimida).
+
+    Formulalar (= bilan boshlanadigan) o'zgarmaydi; katak formatlari saqlanmaydi.
+    """
+    workbook = load_workbook(src, read_only=True)
+    result = Workbook(write_only=True)
+    rows = 0
+    try:
+        for sheet in workbook.worksheets:
+            title = transliterate_many([sheet.title], target)[0][:31]
+            sheet_out = result.create_sheet(title=title)
+            for row in sheet.iter_rows(values_only=True):
+                converted = transliterate_many(row, target)
+                sheet_out.append([
+                    value if isinstance(value, str) and value.startswith('=') else new
+                    for value, new in zip(row, converted)
+                ])
+                rows += 1
+        result.save(dst)
+    finally:
+        workbook.close()
+    logger.info(f"Excel fayl o'girildi: {src} -> {dst}, qatorlar={rows}, target={target}")
+
+
+FILE_CONVERTERS = {
+    '.txt': convert_text_file,
+    '.xlsx': convert_xlsx_file,
+}
+
+
+def convert_file(src, dst, target):
+    FILE_CONVERTERS[os.path.splitext(src)[1].lower()](src, dst, target)
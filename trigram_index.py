@@ -0,0 +1,94 @@
+import threading
+from collections import defaultdict, Counter
+from converters import search_latin
+
+
+def trigrams(text):
+    """Matndagi har bir so'z uchun chetlari to'ldirilgan trigrammalar to'plami (lotin shaklida)."""
+    grams = set()
+    for word in search_latin(text).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Firma nomlari bo'yicha xotiradagi trigram indeksi: xato yozilgan nomlarni o'xshashlik bo'yicha topadi.
+
+    Indeks birinchi qidiruvda loader() orqali to'liq quriladi, keyin add()/remove() bilan yangilanadi.
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._postings = defaultdict(set)   # trigram -> {stir, ...}
+        self._grams = {}                    # stir -> trigrammalar
+        self._names = {}                    # stir -> nom
+        self._lock = threading.Lock()
+        self.built = False
+
+    def _add(self, stir, name):
+        self._remove(stir)
+        grams = trigrams(name)
+        self._grams[stir] = grams
+        self._names[stir] = name
+        for gram in grams:
+            self._postings[gram].add(stir)
+
+    def _remove(self, stir):
+        for gram in self._grams.pop(stir, ()):
+            postings = self._postings[gram]
+            postings.discard(stir)
+            if not postings:
+                del self._postings[gram]
+        self._names.pop(stir, None)
+
+    def build(self):
+        with self._lock:
+            if self.built:
+                return
+            for stir, name in self._loader():
+                self._add(stir, name or '')
+            self.built = True
+
+    def add(self, stir, name):
+        """Firma qo'shilganda yoki nomi o'zgarganda chaqiriladi. Indeks hali qurilmagan bo'lsa hech narsa qilmaydi."""
+        with self._lock:
+            if self.built:
+                self._add(stir, name or '')
+
+    def remove(self, stir):
+        with self._lock:
+            if self.built:
+                self._remove(stir)
+
+    def clear(self):
+        with self._lock:
+            self._postings.clear()
+            self._grams.clear()
+            self._names.clear()
+            self.built = False
+
+    def search(self, query, limit=10, min_score=0.3):
+        """[(stir, name, score), ...] o'xshashlik kamayishi tartibida.
+
+        score — so'rov trigrammalarining nomda uchragan ulushi; tenglikda Jaccard o'xshashligi ustun.
+        """
+        self.build()
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+        with self._lock:
+            counts = Counter()
+            for gram in query_grams:
+                counts.update(self._postings.get(gram, ()))
+            scored = []
+            for stir, common in counts.items():
+                score = common / len(query_grams)
+                if score >= min_score:
+                    jaccard = common / (len(query_grams) + len(self._grams[stir]) - common)
+                    scored.append((score, jaccard, stir))
+            scored.sort(key=lambda item: (-item[0], -item[1], item[2]))
+            return [(stir, self._names[stir], round(score, 3)) for score, _, stir in scored[:limit]]
+
+    def __len__(self):
+        return len(self._names)
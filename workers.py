@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from config import WORKER_PROCESSES, WORKER_TIMEOUT, WORKER_MAX_QUEUE
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_POLL = 1.0  # worker hisoblagichi necha soniyada bir o'qiladi
+# Jarayonlar fork emas, spawn bilan yaratiladi: asosiy jarayonda asyncio va DB oqimlari ishlaydi,
+# fork ularning qulf va ulanishlarini bola jarayonga nusxalaydi. Worker bazaga ulanmaydi.
+START_METHOD = "spawn"
+
+
+class WorkerError(Exception):
+    """Ishni bajarib bo'lmadi (navbat to'la, vaqt tugadi, jarayon yiqildi). Xabar foydalanuvchiga ko'rsatiladi."""
+
+
+class WorkerBusyError(WorkerError):
+    """Navbatdagi ishlar soni WORKER_MAX_QUEUE dan oshdi."""
+
+
+class WorkerTimeoutError(WorkerError):
+    """Ish belgilangan vaqtda tugamadi."""
+
+
+class ProgressCounter:
+    """Worker jarayonidagi progress(rows) chaqiruvlarini umumiy hisoblagichga yozadi (pickle qilinadi)."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def __call__(self, rows):
+        self.value.value = rows
+
+
+def _invoke(func, args, kwargs):
+    # Worker jarayonida bajariladi: navbatda kutish vaqtini hisoblash uchun boshlanish vaqti qaytariladi
+    started = time.time()
+    return started, func(*args, **kwargs)
+
+
+class WorkerPool:
+    """Excel o'qish/yozish kabi CPU ishlari uchun jarayonlar havzasi.
+
+    Ishlar event loopni band qilmaydi: submit() natijani kutadi, vaqt tugasa yoki vazifa bekor qilinsa
+    navbatdagi ish bekor qilinadi, boshlangan ish esa jarayonlar qayta ishga tushirilishi bilan to'xtatiladi.
+    Jarayonlar START_METHOD bilan yaratiladi: modullar bola jarayonda qaytadan import qilinadi.
+    """
+
+    def __init__(self, name, max_workers=WORKER_PROCESSES, timeout=WORKER_TIMEOUT, max_queue=WORKER_MAX_QUEUE):
+        self.name = name
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_queue = max_queue
+        self._context = multiprocessing.get_context(START_METHOD)
+        self._executor = None
+        self._manager = None
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.restarts = 0
+        self.wait_time = 0.0
+        self.run_time = 0.0
+
+    def _get_executor(self):
+        # Jarayonlar birinchi ishda yaratiladi: import paytida fork qilinmaydi
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=self._context)
+            logger.info(f"Worker havzasi ishga tushdi: {self.name}, jarayonlar={self.max_workers}")
+        return self._executor
+
+    def _progress_value(self):
+        if self._manager is None:
+            self._manager = self._context.Manager()
+        return self._manager.Value('i', 0)
+
+    @property
+    def queued(self):
+        """Bo'sh jarayon kutayotgan ishlar soni."""
+        return max(0, self.in_flight - self.max_workers)
+
+    async def submit(self, func, *args, timeout=None, progress=None, **kwargs):
+        """func(*args, **kwargs) ni worker jarayonida bajaradi va natijasini qaytaradi.
+
+        func va argumentlar pickle qilinadigan bo'lishi kerak (modul darajasidagi funksiyalar).
+        progress berilsa, func ga progress(rows) hisoblagichi uzatiladi va progress event loopda
+        PROGRESS_POLL soniyada bir chaqiriladi. Xatolar: WorkerBusyError, WorkerTimeoutError, WorkerError;
+        func ichidagi istisnolar o'zgarishsiz ko'tariladi.
+        """
+        if self.in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            logger.warning(f"Worker navbati to'la: {self.name}, ishlar={self.in_flight}")
+            raise WorkerBusyError("Server band, birozdan keyin qayta urinib ko'ring.")
+
+        loop = asyncio.get_running_loop()
+        value = None
+        if progress is not None:
+            value = await loop.run_in_executor(None, self._progress_value)
+            kwargs['progress'] = ProgressCounter(value)
+        executor = self._get_executor()
+        submitted = time.time()
+        concurrent_future = executor.submit(_invoke, func, args, kwargs)
+        future = asyncio.wrap_future(concurrent_future)
+        self.submitted += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        watcher = loop.create_task(self._watch_progress(value, progress)) if value is not None else None
+        try:
+            started, result = await asyncio.wait_for(future, timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.error(f"Worker ishi vaqtida tugamadi: {self.name}, {func.__name__}, {timeout or self.timeout} s")
+            # Navbatdagi ish shunchaki bekor qilinadi; boshlangan ishni to'xtatishning yagona yo'li —
+            # jarayonlarni qayta ishga tushirish (shu jarayonlardagi boshqa ishlar WorkerError oladi)
+            if not concurrent_future.cancel():
+                self.restart(terminate=True, executor=executor)
+            raise WorkerTimeoutError("Faylni qayta ishlash juda uzoq davom etdi.")
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            logger.info(f"Worker ishi bekor qilindi: {self.name}, {func.__name__}")
+            raise
+        except BrokenProcessPool as e:
+            self.failed += 1
+            logger.error(f"Worker jarayoni yiqildi: {self.name}, {func.__name__}: {e}")
+            self.restart(executor=executor)
+            raise WorkerError("Faylni qayta ishlashda ichki xato yuz berdi.") from e
+        except Exception:
+            self.failed += 1
+            raise
+        else:
+            finished = time.time()
+            self.completed += 1
+            self.wait_time += max(0.0, started - submitted)
+            self.run_time += max(0.0, finished - started)
+            return result
+        finally:
+            self.in_flight -= 1
+            if watcher is not None:
+                watcher.cancel()
+                progress(value.value)
+
+    async def _watch_progress(self, value, progress):
+        last = 0
+        while True:
+            await asyncio.sleep(PROGRESS_POLL)
+            rows = value.value
+            if rows != last:
+                last = rows
+                progress(rows)
+
+    def restart(self, terminate=False, executor=None):
+        """Yangi ishlar yangi jarayonlarga tushadi. terminate=True bo'lsa eski jarayonlar to'xtatiladi.
+
+        Jarayonlar transliteratsiya istisnolarini ishga tushishda fayldan o'qiydi, shuning uchun qoidalar qayta
+        yuklanganda ham chaqiriladi. executor berilsa va u allaqachon almashtirilgan bo'lsa, hech narsa qilinmaydi.
+        """
+        old = self._executor
+        if old is None or (executor is not None and executor is not old):
+            return
+        self._executor = None
+        self.restarts += 1
+        if terminate:
+            for process in list((old._processes or {}).values()):
+                process.terminate()
+        old.shutdown(wait=False, cancel_futures=terminate)
+        logger.info(f"Worker havzasi qayta ishga tushiriladi: {self.name}, to'xtatildi={terminate}")
+
+    def stats(self):
+        done = self.completed or 1
+        return {
+            'name': self.name,
+            'workers': self.max_workers,
+            'in_flight': self.in_flight,
+            'queued': self.queued,
+            'max_in_flight': self.max_in_flight,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'timeouts': self.timeouts,
+            'cancelled': self.cancelled,
+            'rejected': self.rejected,
+            'restarts': self.restarts,
+            'avg_wait': self.wait_time / done,
+            'avg_run': self.run_time / done,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+        logger.info(f"Worker havzasi to'xtatildi: {self.name}")
+
+
+# Excel fayllarni o'qish va yaratish
+excel_pool = WorkerPool("excel")
+
+
+def shutdown():
+    excel_pool.shutdown()